@@ -0,0 +1,224 @@
+"""Apply a commander command to files, without gedit.
+
+Usage: python -m commander.batch [options] <command> [args] -- files...
+
+Each file is loaded in a headless document, the command is run on it like
+it would be in the editor, and the file is replaced when its text changed.
+The state commander saves, like the module manifest, is kept in a temporary
+directory unless --state-dir is given."""
+import os
+import sys
+import shutil
+import optparse
+import tempfile
+
+# Run against the headless stand-ins, this is not running inside gedit. They
+# are not part of the plugin, but live next to it in the source tree
+try:
+	import headless
+except ImportError:
+	sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+	try:
+		import headless
+	except ImportError:
+		print >>sys.stderr, 'commander.batch needs the headless stand-ins, put the headless directory of the commander sources next to commander'
+		sys.exit(1)
+
+headless.install()
+
+import glib
+import gedit
+
+import commander.config as config
+import commander.commands as commands
+import commander.commands.completion
+import commander.commands.exceptions
+
+_job = None
+
+class Job:
+	def __init__(self, command, args, answers):
+		self.command = command
+		self.args = args
+		self.answers = answers
+		self.view = None
+
+	def prepare(self, dirs):
+		commands.Commands().set_dirs(dirs)
+
+		cmd = commander.commands.completion.single_command([self.command], 0)
+
+		if not cmd:
+			raise commands.exceptions.Execute('Could not find command: ' + self.command)
+
+		# Import the module of the command once, before the files are
+		# spread over the workers
+		self.command = cmd.real()
+		self.flush()
+
+	def flush(self):
+		# Run what is pending on the main loop, like saving the manifest
+		context = glib.main_context_default()
+
+		while context.pending():
+			context.iteration(False)
+
+	def ensure_view(self):
+		if not self.view:
+			window = gedit.app_get_default().create_window()
+			window.create_tab(True)
+
+			self.view = window.get_active_view()
+
+		return self.view
+
+	def load(self, filename):
+		f = file(filename, 'rb')
+		text = f.read()
+		f.close()
+
+		doc = self.ensure_view().get_buffer()
+		doc.set_uri('file://' + os.path.abspath(filename))
+
+		doc.begin_not_undoable_action()
+		doc.set_text(text)
+		doc.end_not_undoable_action()
+
+		doc.place_cursor(doc.get_start_iter())
+		return text
+
+	def run(self, filename):
+		# Returns whether the file was changed
+		text = self.load(filename)
+
+		commands.Commands().script(self.view, self.command, self.args, None, self.answers)
+
+		doc = self.view.get_buffer()
+		ret = doc.get_text(*doc.get_bounds())
+
+		if ret == text:
+			return False
+
+		write(filename, ret)
+		return True
+
+def write(filename, text):
+	# Write to a temporary file next to the file and move it in place, so
+	# that the file is either fully written or left alone
+	dirname = os.path.dirname(os.path.abspath(filename))
+	fd, tmp = tempfile.mkstemp(dir=dirname, prefix='.' + os.path.basename(filename))
+
+	try:
+		f = os.fdopen(fd, 'wb')
+		f.write(text)
+		f.close()
+
+		os.chmod(tmp, os.stat(filename).st_mode & 07777)
+		os.rename(tmp, filename)
+	except:
+		os.unlink(tmp)
+		raise
+
+def process(filename):
+	try:
+		return filename, _job.run(filename), None
+	except Exception, e:
+		return filename, False, str(e)
+
+def default_dirs():
+	return [
+		os.path.expanduser('~/.gnome2/gedit/commander/modules'),
+		os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'modules')
+	]
+
+def _parser():
+	parser = optparse.OptionParser(prog='commander.batch', usage='python -m commander.batch [options] <command> [args] -- files...')
+	parser.disable_interspersed_args()
+
+	parser.add_option('-j', '--jobs', type='int', default=0, help='number of processes (default: number of CPUs)')
+	parser.add_option('-m', '--modules', action='append', default=[], metavar='DIR', help='load modules from DIR instead of the default directories')
+	parser.add_option('-a', '--answer', action='append', default=[], metavar='TEXT', help='answer to give when the command prompts, in order')
+	parser.add_option('-s', '--state-dir', metavar='DIR', help='keep the module manifest in DIR (default: a temporary directory)')
+	parser.add_option('-q', '--quiet', action='store_true', default=False, help='only report errors')
+
+	return parser
+
+def main(argv):
+	parser = _parser()
+	options, rest = parser.parse_args(argv)
+
+	if not '--' in rest or rest.index('--') == 0:
+		parser.error('expected a command and files, separated by --')
+
+	idx = rest.index('--')
+	files = rest[idx + 1:]
+
+	# Leave the config and state of commander in gedit alone
+	if options.state_dir:
+		config.set_directory(options.state_dir)
+		return run(parser, options, rest[0], rest[1:idx], files)
+
+	state = tempfile.mkdtemp(prefix='commander-batch-')
+	config.set_directory(state)
+
+	try:
+		return run(parser, options, rest[0], rest[1:idx], files)
+	finally:
+		shutil.rmtree(state, True)
+
+def run(parser, options, command, args, files):
+	global _job
+
+	_job = Job(command, args, options.answer)
+
+	try:
+		_job.prepare(options.modules or default_dirs())
+	except commands.exceptions.Execute, e:
+		parser.error(str(e))
+
+	jobs = options.jobs
+
+	if jobs <= 0:
+		try:
+			import multiprocessing
+			jobs = multiprocessing.cpu_count()
+		except (ImportError, NotImplementedError):
+			jobs = 1
+
+	jobs = min(jobs, len(files))
+
+	if jobs > 1:
+		import multiprocessing
+
+		# Workers are forked, so they share the loaded modules
+		pool = multiprocessing.Pool(jobs)
+		results = pool.imap_unordered(process, files)
+	else:
+		pool = None
+		results = map(process, files)
+
+	failed = 0
+	changed = 0
+
+	for filename, didchange, error in results:
+		if error:
+			failed += 1
+			print >>sys.stderr, '%s: %s' % (filename, error)
+		elif didchange:
+			changed += 1
+
+			if not options.quiet:
+				print filename
+
+	if pool:
+		pool.close()
+		pool.join()
+
+	if not options.quiet:
+		print '%d of %d files changed, %d failed' % (changed, len(files), failed)
+
+	return failed and 1 or 0
+
+if __name__ == '__main__':
+	sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,90 @@
+import bisect
+
+class Edit:
+	def __init__(self, offset, length, text):
+		# Text in buffers is utf-8, offsets and lengths are in characters
+		if isinstance(text, unicode):
+			text = text.encode('utf-8')
+
+		self.offset = offset
+		self.length = length
+		self.text = text
+
+	def end(self):
+		return self.offset + self.length
+
+	def __cmp__(self, other):
+		# An insert goes before a replacement at the same offset
+		return cmp((self.offset, self.length), (other.offset, other.length))
+
+class ChangeSet:
+	# Collects edits to a buffer and applies them in one go. Edits are given
+	# as (character offset, length, replacement) in terms of the buffer as it
+	# was before any of them are applied, and must not overlap.
+	#
+	# Edits are applied from the back to the front, so that the offsets of
+	# the remaining edits stay valid. Each edit is a separate change to the
+	# buffer, so marks of the user and other plugins stay where they belong
+
+	def __init__(self, buf):
+		self.buf = buf
+		self.edits = []
+
+	def __len__(self):
+		return len(self.edits)
+
+	def replace(self, offset, length, text):
+		if length == 0 and not text:
+			return
+
+		bisect.insort(self.edits, Edit(offset, length, text))
+
+	def insert(self, offset, text):
+		self.replace(offset, 0, text)
+
+	def delete(self, offset, length):
+		self.replace(offset, length, '')
+
+	def replace_range(self, start, end, text):
+		self.replace(start.get_offset(), end.get_offset() - start.get_offset(), text)
+
+	def delete_range(self, start, end):
+		self.replace_range(start, end, '')
+
+	def _check(self):
+		for i in xrange(1, len(self.edits)):
+			if self.edits[i].offset < self.edits[i - 1].end():
+				raise ValueError('Overlapping edits at offset %d' % (self.edits[i].offset,))
+
+	def _apply(self):
+		buf = self.buf
+
+		for edit in reversed(self.edits):
+			start = buf.get_iter_at_offset(edit.offset)
+
+			if edit.length:
+				end = buf.get_iter_at_offset(edit.end())
+				buf.delete(start, end)
+
+			if edit.text:
+				buf.insert(start, edit.text)
+
+	def commit(self):
+		# Apply the edits as a single user action
+		if not self.edits:
+			return 0
+
+		self._check()
+
+		buf = self.buf
+		buf.begin_user_action()
+
+		try:
+			self._apply()
+		finally:
+			buf.end_user_action()
+
+		ret = len(self.edits)
+		self.edits = []
+
+		return ret
@@ -1,5 +1,4 @@
 import os
-import gio
 import sys
 import bisect
 import types
@@ -8,10 +7,26 @@ import glib
 import re
 import os
 
+import commander.config as config
+
 import module
 import method
 import result
 import exceptions
+import manifest
+import trie
+import watcher
+import importer
+import bundle
+import timing
+import metrics
+import workers
+import processes
+import tracing
+import watchdog
+import pipe
+import macro
+import scripted
 
 __all__ = ['is_commander_module', 'Commands']
 
@@ -65,27 +80,78 @@ class Commands(Singleton):
 
 	class State:
 		def __init__(self):
+			self.call = None
 			self.clear()
 		
 		def clear(self):
+			if self.call:
+				# The command was cancelled while it prompted or was
+				# suspended
+				self.call.finish(self.steps, cancelled=True)
+
 			self.stack = []
+			self.steps = 0
+			self.call = None
+			self.pipeline = None
+
+			# The macro step of the command, and whether it prompted
+			self.recorded = None
+			self.prompted = False
 
 		def top(self):
 			return self.stack[0]
 		
-		def run(self, ret):
+		def _step(self, func, *args):
 			ct = self.top()
+			self.steps += 1
+
+			if self.call:
+				watchdog.push(self.call.name)
+			else:
+				watchdog.push(ct.generator.gi_code.co_name)
+
+			try:
+				if not tracing.enabled():
+					ct.retval = func(*args)
+					return ct.retval
+
+				start = tracing.now()
+
+				try:
+					ct.retval = func(*args)
+				finally:
+					info = {'step': self.steps, 'depth': len(self.stack)}
+
+					if self.call:
+						info['command'] = self.call.name
+
+					tracing.complete(ct.generator.gi_code.co_name, 'step', start, info)
+
+				return ct.retval
+			finally:
+				watchdog.pop()
+		
+		def run(self, ret):
+			gen = self.top().generator
 			
 			if ret:
-				ct.retval = ct.generator.send(ret)
+				return self._step(gen.send, ret)
 			else:
-				ct.retval = ct.generator.next()
-			
-			return ct.retval
+				return self._step(gen.next)
+
+		def throw(self, e):
+			return self._step(self.top().generator.throw, type(e), e)
 
 		def push(self, gen):
 			self.stack.insert(0, Commands.Continuated(gen))
 
+		def detach(self):
+			# Take the top most generator off the stack, without closing it
+			ret = self.stack[0].generator
+			del self.stack[0]
+
+			return ret
+
 		def pop(self):
 			if not self.stack:
 				return
@@ -105,48 +171,72 @@ class Commands(Singleton):
 
 	def __init_once__(self):
 		self._modules = None
+		self._index = None
 		self._dirs = []
-		self._monitors = []
-		
-		self._timeouts = {}
+		self._watcher = watcher.Watcher(self.on_module_changed)
 		
 		self._stack = []
+
+		self._manifest = manifest.Manifest(config.filename('manifest'))
+		self._manifest_paths = None
+		self._manifest_save = 0
 	
 	def set_dirs(self, dirs):
 		self._dirs = dirs
+
+	def get_dirs(self):
+		return list(self._dirs)
 	
 	def stop(self):
-		for mon in self._monitors:
-			mon.cancel()
-		
-		self._monitors = []
+		self._watcher.stop()
+		workers.stop()
+		processes.stop()
+
+		# Unload the imported modules, so that they can be imported again
+		# when the plugin is activated again
+		for mod in self._modules or []:
+			if isinstance(mod, module.Module):
+				mod.unload()
+
 		self._modules = None
-		
-		for k in self._timeouts:
-			glib.source_remove(self._timeouts[k])
-		
-		self._timeouts = {}
+		self._index = None
+
+		if self._manifest_save:
+			glib.source_remove(self._manifest_save)
+			self._manifest_save = 0
+
+		self._manifest.save()
+		importer.instance().uninstall()
 	
 	def modules(self):
 		self.ensure()
 		return list(self._modules)
-	
-	def add_monitor(self, d):
-		gfile = gio.File(d)
-		monitor = None
-		
-		try:
-			monitor = gfile.monitor_directory(gio.FILE_MONITOR_NONE, None)
-		except gio.Error, e:
-			# Could not create monitor, this happens on systems where file monitoring is
-			# not supported, but we don't really care
-			pass
 
-		if monitor:
-			monitor.connect('changed', self.on_monitor_changed)
-			self._monitors.append(monitor)
+	def index(self):
+		self.ensure()
+		return self._index
+
+	def _insert(self, cmd):
+		bisect.insort(self._modules, cmd)
+		self._index.add(cmd)
+
+	def _remove(self, cmd):
+		# Remove by identity, a root can have the same name as a module
+		for i in xrange(len(self._modules)):
+			if self._modules[i] is cmd:
+				del self._modules[i]
+				break
+
+		self._index.remove(cmd)
 	
 	def scan(self, d):
+		timing.call('scan', d, self._scan, d)
+
+	def _scan(self, d):
+		if bundle.is_bundle(d):
+			self.scan_bundle(d)
+			return
+
 		files = []
 		
 		try:
@@ -158,20 +248,62 @@ class Commands(Singleton):
 			full = os.path.join(d, f)
 
 			# Test for python files or modules
-			if is_commander_module(full):
+			if bundle.is_bundle(full):
+				self.scan_bundle(full)
+			elif is_commander_module(full):
 				if self.add_module(full) and os.path.isdir(full):
-					# Add monitor on the module directory if module was 
-					# successfully added. TODO: recursively add monitors
-					self.add_monitor(full)
+					# Watch the whole package if the module was
+					# successfully added
+					self._watcher.add(full, True)
 		
-		# Add a monitor on the scanned directory itself
-		self.add_monitor(d)
+		# Watch the scanned directory itself
+		self._watcher.add(d)
 		
+	def scan_bundle(self, filename):
+		# The index of the bundle lists its modules and their roots, so
+		# only the index needs to be read. The modules are imported from
+		# the bundle when their commands are used
+		index = bundle.read_index(filename)
+
+		if index == None:
+			print 'Failed to read bundle:', filename
+			return
+
+		for entry in index:
+			if entry['name'] in self._modules:
+				continue
+
+			mod = self._create_module(os.path.join(filename, entry['name']))
+			self._insert(mod)
+
+			if entry['roots'] == None:
+				# The roots could not be found when packing the bundle
+				print 'Could not find the roots of module %s without importing it' % (entry['name'],)
+				self.load_module(mod)
+				continue
+
+			mod.restore_deferred(entry['default'], entry['roots'])
+
+			for r in mod.roots():
+				self._insert(r)
+
+	def remove_bundle(self, filename):
+		for mod in list(self._modules):
+			if isinstance(mod, module.Module) and mod.bundled() and bundle.archive(mod.path()) == filename:
+				mod.unload()
+				self.remove_module_root(mod)
+				self._remove(mod)
+
+		bundle.forget(filename)
+
 	def module_name(self, filename):
 		# Module name is the basename without the .py
 		return os.path.basename(os.path.splitext(filename)[0])
 		
 	def add_module(self, filename):
+		return timing.call('add', self.module_name(filename), self._add_module, filename)
+
+	def _add_module(self, filename):
 		base = self.module_name(filename)
 		
 		# Check if module already exists
@@ -179,12 +311,41 @@ class Commands(Singleton):
 			return
 		
 		# Create new 'empty' module
-		mod = module.Module(base, os.path.dirname(filename))
-		bisect.insort_right(self._modules, mod)
-		
-		# Reload the module
-		self.reload_module(mod)
+		mod = self._create_module(filename)
+		self._insert(mod)
+
+		if self._manifest_paths != None:
+			self._manifest_paths.append(filename)
+
+		entry = self._manifest.lookup(filename)
+
+		if entry:
+			# Restore the module from the manifest, it will be imported
+			# when one of its commands is executed
+			self._manifest.restore(mod, entry)
+		elif not mod.defer():
+			# Load the module
+			self.load_module(mod)
+			return True
+
+		for r in mod.roots():
+			self._insert(r)
+
 		return True
+
+	def _create_module(self, filename):
+		return module.Module(self.module_name(filename), os.path.dirname(filename), loaded=self.on_module_loaded)
+
+	def on_module_loaded(self, mod, roots):
+		# A cached or deferred module was imported on demand, replace the
+		# placeholder roots with the real ones
+		self._remove_roots(roots)
+
+		for r in mod.roots():
+			self._insert(r)
+
+		self._manifest.update(mod.path(), mod)
+		self.save_manifest()
 		
 	def ensure(self):
 		# Ensure that modules have been scanned
@@ -192,78 +353,239 @@ class Commands(Singleton):
 			return
 
 		self._modules = []
+		self._index = trie.Trie()
+		self._manifest_paths = []
 		
 		for d in self._dirs:
 			self.scan(d)
 
+		# Forget about modules which no longer exist
+		self._manifest.prune(self._manifest_paths)
+		self._manifest_paths = None
+
+		self.save_manifest()
+		timing.mark('ready')
+
+	def save_manifest(self):
+		if not self._manifest_save:
+			self._manifest_save = glib.idle_add(self.on_idle_save_manifest)
+
+	def on_idle_save_manifest(self):
+		self._manifest_save = 0
+		self._manifest.save()
+
+		return False
+
 	def _run_generator(self, state, ret=None):
-		try:
-			# Determine first use
-			retval = state.run(ret)
+		# Resume the top most generator with ret
+		return self._trampoline(state, ret, True)
 
-			if not retval or (isinstance(retval, result.Result) and (retval == result.DONE or retval == result.HIDE)):
+	def run(self, state, ret):
+		# Handle a value returned by a command
+		return self._trampoline(state, ret, False)
+
+	def _trampoline(self, state, value, resume):
+		# Generators can ask and suspend execution of commands, for instance
+		# to prompt for some more information, or they can yield other
+		# generators whose value is sent back to them. Instead of recursing
+		# for each of those, the stack of generators in state is driven from
+		# this loop, so the python stack does not grow with nesting
+		error = None
+
+		while True:
+			if resume:
+				try:
+					if error:
+						retval = state.throw(error)
+						error = None
+					else:
+						retval = state.run(value)
+				except StopIteration:
+					# Continue with the parent
+					state.pop()
+
+					if not state:
+						return None
+
+					value = None
+					continue
+				except Exception, e:
+					# Something error like, we throw on the parent generator
+					state.pop()
+
+					if not state:
+						# Re raise it for the top most to show the error
+						raise
+
+					error = e
+					continue
+
+				if not retval or (isinstance(retval, result.Result) and (retval == result.DONE or retval == result.HIDE)):
+					state.pop()
+
+					if state:
+						value = None
+						continue
+
+					return retval
+
+				value = retval
+				resume = False
+
+			if type(value) == types.GeneratorType:
+				state.push(value)
+
+				value = None
+				resume = True
+			elif not isinstance(value, result.Result) and len(state) > 1:
+				# Send the value to the parent
 				state.pop()
-				 
-				if state:
-					return self._run_generator(state)
+				resume = True
+			else:
+				return value
 
-			return self.run(state, retval)
-			
-		except StopIteration:
-			state.pop()
+	def execute(self, state, argstr, words, wordsstr, entry, modifier):
+		self.ensure()
+		
+		if state:
+			if state.recorded and state.prompted:
+				state.recorded.answers.append(argstr)
 
-			if state:
-				return self.run(state)
-		except Exception, e:
-			# Something error like, we throw on the parent generator
-			state.pop()
-			
-			if state:
-				state.top().generator.throw(type(e), e)
+			ret = self._finish(state, lambda: self._run_pipeline(state, lambda: self._run_generator(state, [argstr, words, modifier])))
+			state.prompted = (ret == result.Result.PROMPT)
+
+			return ret
+
+		stages = []
+
+		for start, end in pipe.split(words, wordsstr, completion.exact_command):
+			cmd = completion.single_command(wordsstr, start)
+
+			if not cmd:
+				raise exceptions.Execute('Could not find command: ' + wordsstr[start])
+
+			if end > start + 1:
+				cmdargs = argstr[words[start + 1].start(0):words[end - 1].end(0)]
 			else:
-				# Re raise it for the top most to show the error
-				raise e
+				cmdargs = ''
 
-		return None	
-	
-	def run(self, state, ret):
-		if type(ret) == types.GeneratorType:
-			# Ok, this is cool stuff, generators can ask and susped execution
-			# of commands, for instance to prompt for some more information
-			state.push(ret)
-			
-			return self._run_generator(state)
-		elif not isinstance(ret, result.Result) and len(state) > 1:
-			# Basicly, send it to the previous?
-			state.pop()
+			stages.append([cmd, cmdargs, wordsstr[start + 1:end]])
+
+		state.steps = 0
+		state.call = metrics.Call(' | '.join(map(lambda x: x[0].qualified_name(), stages)))
+		state.recorded = None
+
+		if len(stages) == 1:
+			cmd, argstr, args = stages[0]
+
+			# Execute command
+			ret = self._finish(state, lambda: self.run(state, cmd.execute(argstr, args, entry, modifier)))
+
+			state.recorded = macro.add(cmd, wordsstr[0], args, argstr)
+			state.prompted = (ret == result.Result.PROMPT)
 
-			return self._run_generator(state, ret)
-		else:
 			return ret
-	
-	def execute(self, state, argstr, words, wordsstr, entry, modifier):
+
+		state.pipeline = pipe.Pipeline(stages, entry, modifier)
+		return self._finish(state, lambda: self._run_pipeline(state, lambda: self.run(state, state.pipeline.next())))
+
+	def resume(self, state, value=None):
+		# Continue the command on state with value, instead of with what was
+		# typed in the entry. This is used when the command waited for
+		# something other than input, like the stream it yielded
 		self.ensure()
-		
-		if state:			
-			return self._run_generator(state, [argstr, words, modifier])
+		return self._finish(state, lambda: self._run_pipeline(state, lambda: self._run_generator(state, value)))
 
-		cmd = completion.single_command(wordsstr, 0)
-		
-		if not cmd:
-			raise exceptions.Execute('Could not find command: ' + wordsstr[0])
+	def _run_pipeline(self, state, func):
+		# Run func, which runs the current stage of a pipeline, and start the
+		# next stage each time a stage has finished. A stage which prompts or
+		# is suspended leaves its generators on the state, and the pipeline
+		# continues when they are done
+		try:
+			ret = func()
 
-		if len(words) > 1:
-			argstr = argstr[words[1].start(0):]
-		else:
-			argstr = ''
-		
-		# Execute command
-		return self.run(state, cmd.execute(argstr, wordsstr[1:], entry, modifier))
+			while state.pipeline:
+				if state:
+					if isinstance(ret, result.Result) or ret == None:
+						return ret
+
+					# A value yielded by the stage is its output. The stage
+					# may yield more lines, which are read when the next stage
+					# reads its input
+					ret = pipe.generated(ret, state.detach())
+
+					while state:
+						state.pop()
+
+				state.pipeline.finish(ret)
+				ret = self.run(state, state.pipeline.next())
+		except:
+			state.pipeline = None
+			raise
+
+		# The last stage is running or done
+		state.pipeline = None
+		return ret
+
+	def _finish(self, state, func, *args):
+		# Record the metrics of the command once it no longer waits for
+		# input or for being resumed
+		call = state.call
+
+		try:
+			ret = func(*args)
+		except:
+			if call:
+				state.call = None
+				call.finish(state.steps, True)
+
+			raise
+
+		if call:
+			call.result()
+
+			if not state or not (ret == result.Result.PROMPT or ret == result.Result.SUSPEND):
+				state.call = None
+				call.finish(state.steps)
+
+		return ret
 	
-	def invoke(self, entry, modifier, command, args, argstr=None):
+	def invoke(self, entry, modifier, command, args, argstr=None, answers=None):
+		# Execute a command from code. Commands that yield are driven until
+		# they are done, prompts are answered from answers, which is a list
+		# or a callback taking the prompt
+		return self._invoke(entry, modifier, command, args, argstr, scripted.Answers(answers), Commands.State())
+
+	def script(self, view, command, args=[], argstr=None, answers=None, modifier=0):
+		# Like invoke, but without a commander entry. Returns a
+		# scripted.Result with the value the command finished with, the
+		# prompts it asked and the info it showed
+		entry = scripted.Entry(view)
+		answers = scripted.Answers(answers)
+		state = Commands.State()
+
+		ret = self._invoke(entry, modifier, command, args, argstr, answers, state)
+		return scripted.Result(ret, answers.prompts, entry.info, state.steps)
+
+	def driver(self, entry, modifier, command, args, argstr=None, answers=None):
+		# Like invoke, but instead of running the main loop while the command
+		# is suspended, the returned scripted.Driver yields the suspends, for
+		# tasks which wait for them in their own way
+		ret = self._start(entry, modifier, command, args, argstr)
+		return scripted.Driver(self, Commands.State(), ret, entry, scripted.Answers(answers), modifier)
+
+	def _invoke(self, entry, modifier, command, args, argstr, answers, state):
+		ret = self._start(entry, modifier, command, args, argstr)
+		return scripted.drive(self, state, ret, entry, answers, modifier)
+
+	def _start(self, entry, modifier, command, args, argstr):
 		self.ensure()
-		
-		cmd = completion.single_command([command], 0)
+
+		if isinstance(command, method.Method):
+			# Already resolved
+			cmd = command
+		else:
+			cmd = completion.single_command([command], 0)
 		
 		if not cmd:
 			raise exceptions.Execute('Could not find command: ' + command)
@@ -271,31 +593,57 @@ class Commands(Singleton):
 		if argstr == None:
 			argstr = ' '.join(args)
 
-		ret = cmd.execute(argstr, args, entry, modifier)
-		
-		if type(ret) == types.GeneratorType:
-			raise exceptions.Execute('Cannot invoke commands that yield (yet)')
-		else:
-			return ret
+		return cmd.execute(argstr, args, entry, modifier)
 	
-	def resolve_module(self, path, load=True):
-		if not self._modules or not is_commander_module(path):
-			return None
+	def play(self, script, entry, modifier, times=1):
+		# Replay a macro as a single undoable action. Info shown by the
+		# commands is shown when all of them are done. This generator yields
+		# the suspends of the commands, the command playing the macro yields
+		# them on so that the entry waits for them
+		batch = macro.Entry(entry)
+		buf = entry.view().get_buffer()
 
+		buf.begin_user_action()
+
+		try:
+			for i in xrange(times):
+				for step in script.steps:
+					driver = self.driver(batch, modifier, step.name, step.args, step.argstr, step.answers)
+
+					try:
+						for suspend in driver:
+							yield suspend
+					finally:
+						driver.close()
+		finally:
+			buf.end_user_action()
+			batch.flush()
+
+	def _lookup_module(self, path):
 		# Strip off __init__.py for module kind of modules
 		if path.endswith('__init__.py'):
 			path = os.path.dirname(path)
 
 		base = self.module_name(path)
 
-		# Find module
+		# Find module, skipping roots which have the same name
 		idx = bisect.bisect_left(self._modules, base)
-		mod = None
-		
-		if idx < len(self._modules):
-			mod = self._modules[idx]
 
-		if not mod or mod.name != base:
+		while idx < len(self._modules) and self._modules[idx].name == base:
+			if isinstance(self._modules[idx], module.Module):
+				return self._modules[idx]
+
+			idx += 1
+
+		return None
+
+	def resolve_module(self, path, load=True):
+		if not self._modules or not is_commander_module(path):
+			return None
+
+		mod = self._lookup_module(path)
+
+		if not mod:
 			if load:
 				self.add_module(path)
 
@@ -303,70 +651,124 @@ class Commands(Singleton):
 		
 		return mod
 
+	def _remove_roots(self, roots):
+		for r in roots:
+			self._remove(r)
+
 	def remove_module_root(self, mod):
-		for r in mod.roots():
-			if r in self._modules:
-				self._modules.remove(r)
+		self._remove_roots(mod.roots())
 	
+	def load_module(self, mod):
+		# Import a newly added module, if that fails the module is removed
+		try:
+			mod.reload()
+		except Exception, e:
+			print 'Failed to load module:', e
+
+			self._remove(mod)
+			self._manifest.remove(mod.path())
+			return
+
+		# Insert roots
+		for r in mod.roots():
+			self._insert(r)
+
+		# Update the manifest with the new commands of the module
+		self._manifest.update(mod.path(), mod)
+		self.save_manifest()
+
 	def reload_module(self, mod):
 		if isinstance(mod, basestring):
 			mod = self.resolve_module(mod)
 		
 		if not mod or not self._modules:
-			return
+			return False
 
-		# Remove roots
-		self.remove_module_root(mod)
+		# Submodules are reloaded with the file they are defined in
+		while mod.path() == None and isinstance(mod.parent, module.Module):
+			mod = mod.parent
+
+		if mod.path() == None:
+			return False
+
+		# Load the new version on the side, the old version is only replaced
+		# when that succeeds, so a broken edit keeps the module working
+		new = self._create_module(mod.path())
 
-		# Now, try to reload the module
 		try:
-			mod.reload()
+			new.compile()
+
+			if mod.cached():
+				# Keep the module deferred if it was not imported yet
+				entry = self._manifest.lookup(new.path())
+
+				if entry:
+					self._manifest.restore(new, entry)
+				else:
+					new.defer()
+
+			if not new.cached():
+				stash = mod.stash()
+
+				try:
+					new.reload()
+				except:
+					mod.unstash(stash)
+					raise
 		except Exception, e:
-			# Reload failed, we remove the module
 			print 'Failed to reload module:', e
+			return False
 
-			self._modules.remove(mod)
-			return
+		# Swap the new version in
+		self.remove_module_root(mod)
+		self._remove(mod)
 
-		# Insert roots
-		for r in mod.roots():
-			bisect.insort(self._modules, r)
+		self._insert(new)
+
+		for r in new.roots():
+			self._insert(r)
+
+		if not new.cached():
+			self._manifest.update(new.path(), new)
+			self.save_manifest()
+
+		return True
+
+	def remove_module(self, mod, path=None):
+		if path == None:
+			path = mod.path()
 
-	def on_timeout_delete(self, path, mod):
-		if not path in self._timeouts:
-			return False
-		
-		# Remove the module
 		mod.unload()
 		self.remove_module_root(mod)
-		self._modules.remove(mod)
+		self._remove(mod)
 
-		return False
+		self._watcher.remove(path)
+		self._manifest.remove(path)
+		self.save_manifest()
 
-	def on_monitor_changed(self, monitor, gfile1, gfile2, evnt):
-		if evnt == gio.FILE_MONITOR_EVENT_CHANGED:
-			# Reload the module
-			self.reload_module(gfile1.get_path())
-		elif evnt == gio.FILE_MONITOR_EVENT_DELETED:
-			path = gfile1.get_path()
-			mod = self.resolve_module(path, False)
-			
-			if not mod:
-				return
+	def on_module_changed(self, path):
+		if self._modules == None:
+			return
 
-			if path in self._timeouts:
-				glib.source_remove(self._timeouts[path])
-			
-			# We add a timeout because a common save strategy causes a
-			# DELETE/CREATE event chain
-			self._timeouts[path] = glib.timeout_add(500, self.on_timeout_delete, path, mod)
-		elif evnt == gio.FILE_MONITOR_EVENT_CREATED:
-			path = gfile1.get_path()
-			
-			# Check if this CREATE followed a previous DELETE
-			if path in self._timeouts:
-				glib.source_remove(self._timeouts[path])
-				del self._timeouts[path]
-			
-			# Reload the module
-			self.reload_module(path)
+		if bundle.is_bundle(path):
+			# Bundles are replaced as a whole
+			self.remove_bundle(path)
+
+			if os.path.isfile(path):
+				self.scan_bundle(path)
+
+			return
+
+		# Only python files and packages can be modules
+		if not os.path.splitext(path)[1] in ('', '.py'):
+			return
+
+		mod = self._lookup_module(path)
+
+		if os.path.exists(path) and is_commander_module(path):
+			if mod:
+				self.reload_module(mod)
+			elif self.add_module(path) and os.path.isdir(path):
+				self._watcher.add(path, True)
+		elif mod:
+			self.remove_module(mod, path)
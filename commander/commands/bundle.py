@@ -0,0 +1,118 @@
+import os
+import zipfile
+import zipimport
+import cPickle
+
+import module
+
+# Name of the index in a bundle, it lists the modules in the bundle together
+# with their roots, so that registering them needs only the index to be read
+INDEX = '__commander_index__'
+VERSION = 1
+
+def is_bundle(path):
+	return path.endswith('.zip')
+
+def archive(path):
+	# The bundle containing path, if any
+	if is_bundle(path):
+		return path
+
+	idx = path.find('.zip' + os.sep)
+
+	if idx == -1:
+		return None
+	else:
+		return path[:idx + 4]
+
+def read_index(path):
+	try:
+		z = zipfile.ZipFile(path, 'r')
+
+		try:
+			data = cPickle.loads(z.read(INDEX))
+		finally:
+			z.close()
+	except Exception:
+		return None
+
+	if type(data) != dict or data.get('version') != VERSION:
+		return None
+
+	return data['modules']
+
+def _sources(dirname, name):
+	full = os.path.join(dirname, name)
+
+	if name.endswith('.py') and os.path.isfile(full):
+		return name[:-3], full, [(full, name)]
+
+	init = os.path.join(full, '__init__.py')
+
+	if not os.path.isfile(init):
+		return None, None, []
+
+	ret = []
+
+	for dirpath, dirnames, filenames in os.walk(full):
+		dirnames.sort()
+		filenames.sort()
+
+		for f in filenames:
+			if f.endswith('.py'):
+				path = os.path.join(dirpath, f)
+				ret.append((path, path[len(dirname):].lstrip(os.sep)))
+
+	return name, init, ret
+
+def pack(dirname, output):
+	# Pack all the commander modules in dirname into the bundle output, and
+	# return the index of the bundle
+	index = []
+	tmp = output + '.tmp'
+
+	z = zipfile.ZipFile(tmp, 'w', zipfile.ZIP_DEFLATED)
+
+	try:
+		try:
+			names = os.listdir(dirname)
+			names.sort()
+
+			for name in names:
+				base, init, files = _sources(dirname, name)
+
+				if not files:
+					continue
+
+				f = file(init, 'r')
+				info = module.scan_source(f.read())
+				f.close()
+
+				if info == None:
+					continue
+
+				for filename, arcname in files:
+					z.write(filename, arcname)
+
+				index.append({'name': base, 'default': info[0], 'roots': info[1]})
+
+			z.writestr(INDEX, cPickle.dumps({'version': VERSION, 'modules': index}, 2))
+		finally:
+			z.close()
+
+		os.rename(tmp, output)
+	except:
+		if os.path.exists(tmp):
+			os.unlink(tmp)
+
+		raise
+
+	return index
+
+def forget(path):
+	# zipimport caches the directory of archives, which is wrong once the
+	# bundle has been rewritten
+	try:
+		del zipimport._zip_directory_cache[path]
+	except KeyError:
+		pass
@@ -1,5 +1,4 @@
 import commander.commands as commands
-import bisect
 import sys
 import os
 import re
@@ -51,46 +50,25 @@ def common_prefix(args, sep=None):
 
 	return common_prefix(args, sep)
 
-def _expand_commands(cmds):
-	if not cmds:
-		cmds.extend(commands.Commands().modules())
-		return
+def _filter_commands(cmds, subs):
+	if cmds == None:
+		return commands.Commands().index().find(subs)
 
-	old = list(cmds)
-	del cmds[:]
+	# Find the matching child commands of each of the parents
+	ret = []
 
-	# Expand 'commands' to all the respective subcommands
-	
-	for cmd in old:
-		for c in cmd.commands():
-			bisect.insort(cmds, c)
+	for cmd in cmds:
+		try:
+			index = cmd.index()
+		except Exception, e:
+			# Importing a deferred module can fail
+			print 'Failed to load module:', e
+			continue
 
-def _filter_command(cmd, subs):
-	parts = cmd.name.split('-')
-	
-	if len(subs) > len(parts):
-		return False
-	
-	for i in xrange(0, len(subs)):
-		if not parts[i].startswith(subs[i]):
-			return False
-	
-	return True
+		if index:
+			ret.extend(index.find(subs))
 
-def _filter_commands(cmds, subs):
-	# See what parts of cmds still match the parts in subs
-	idx = bisect.bisect_left(cmds, subs[0])
-	ret = []
-	
-	while idx < len(cmds):
-		if not cmds[idx].name.startswith(subs[0]):
-			break
-		
-		if _filter_command(cmds[idx], subs):
-			ret.append(cmds[idx])
-		
-		idx += 1
-	
+	ret.sort()
 	return ret
 
 def single_command(words, idx):
@@ -106,6 +84,22 @@ def single_command(words, idx):
 	
 	return ret[0][0]
 
+def exact_command(words, idx):
+	# Like single_command, but only when the word is the full (dotted) name
+	# of the command, not a prefix of it
+	ret = command(words, idx)
+
+	if not ret or ret[1] != words[idx].strip():
+		return None
+
+	name = ret[1].split('.')[-1]
+	ret = filter(lambda x: x.method and x.name == name, ret[0])
+
+	if not ret:
+		return None
+
+	return ret[0]
+
 def command(words, idx):
 	s = words[idx].strip()
 	
@@ -113,15 +107,9 @@ def command(words, idx):
 		return None
 	
 	parts = s.split('.')
-	cmds = []
+	cmds = None
 
 	for i in parts:
-		# Expand all the parents to their child commands
-		_expand_commands(cmds)
-
-		if not cmds:
-			return None
-		
 		subs = i.split('-')	
 		cmds = _filter_commands(cmds, subs)
 
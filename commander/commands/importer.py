@@ -0,0 +1,230 @@
+import sys
+import os
+import imp
+import types
+import zipimport
+
+import bundle
+import timing
+
+def signature(filename):
+	try:
+		st = os.stat(filename)
+	except OSError:
+		return [filename, None]
+
+	return [filename, (st.st_mtime, st.st_size)]
+
+class Loader:
+	def __init__(self, importer, info):
+		self._importer = importer
+		self._info = info
+
+	def signature(self):
+		f, pathname, description = self._info
+
+		if description[2] == imp.PKG_DIRECTORY:
+			pathname = os.path.join(pathname, '__init__.py')
+
+		return signature(pathname)
+
+	def load(self, fullname):
+		f = self._info[0]
+
+		try:
+			return imp.load_module(fullname, *self._info)
+		finally:
+			if f:
+				f.close()
+
+	def load_module(self, fullname):
+		return self._importer.load(fullname, self)
+
+class ZipLoader(Loader):
+	def signature(self):
+		# Modules in a bundle change when the bundle changes
+		return signature(self._info.archive)
+
+	def load(self, fullname):
+		return self._info.load_module(fullname)
+
+# Importer installed in sys.meta_path which keeps track of the python modules
+# making up commander modules, and of which of those import which. Only
+# imports made while importing a commander module, and imports of submodules
+# of tracked packages are handled, everything else goes the normal route
+class Importer:
+	def __init__(self):
+		self._dirs = []
+		self._stack = []
+		self._modules = {}
+		self._deps = {}
+
+	def install(self):
+		if not self in sys.meta_path:
+			sys.meta_path.insert(0, self)
+
+	def uninstall(self):
+		if self in sys.meta_path:
+			sys.meta_path.remove(self)
+
+	def find_module(self, fullname, path=None):
+		parts = fullname.rsplit('.', 1)
+
+		if len(parts) == 1:
+			# Top level modules are looked up in the directory of the commander
+			# module being imported
+			if not self._dirs:
+				return None
+
+			path = self._dirs[-1:]
+		elif not parts[0] in self._modules:
+			return None
+
+		return self._find(parts[-1], path)
+
+	def _find(self, name, path):
+		for entry in path:
+			if bundle.archive(entry):
+				try:
+					zipimp = zipimport.zipimporter(entry)
+				except zipimport.ZipImportError:
+					continue
+
+				if zipimp.find_module(name):
+					return ZipLoader(self, zipimp)
+			else:
+				try:
+					return Loader(self, imp.find_module(name, [entry]))
+				except ImportError:
+					pass
+
+		return None
+
+	def _depend(self, name, dep):
+		if name in self._deps and not dep in self._deps[name]:
+			self._deps[name].append(dep)
+
+	def load(self, fullname, loader):
+		if self._stack:
+			self._depend(self._stack[-1], fullname)
+
+		self._modules[fullname] = loader.signature()
+		self._deps[fullname] = []
+		self._stack.append(fullname)
+
+		try:
+			try:
+				mod = timing.call('import', fullname, loader.load, fullname)
+			except:
+				del self._modules[fullname]
+				del self._deps[fullname]
+				raise
+		finally:
+			self._stack.pop()
+
+		# Imports of modules which were already loaded do not pass through
+		# the importer, find those in the namespace of the module
+		for value in mod.__dict__.values():
+			if type(value) == types.ModuleType and value.__name__ in self._modules and value is not mod:
+				self._depend(fullname, value.__name__)
+
+		return mod
+
+	def import_module(self, name, dirname):
+		self.install()
+
+		imp.acquire_lock()
+		self._dirs.append(dirname)
+
+		try:
+			loader = self._find(name, [dirname])
+
+			if not loader:
+				raise ImportError('No module named ' + name)
+
+			return loader.load_module(name)
+		finally:
+			self._dirs.pop()
+			imp.release_lock()
+
+	def closure(self, name):
+		# All the tracked modules imported by name, directly or indirectly
+		ret = []
+		queue = [name]
+
+		while queue:
+			item = queue.pop()
+
+			if item in ret or not item in self._modules:
+				continue
+
+			ret.append(item)
+			queue.extend(self._deps[item])
+
+		return ret
+
+	def changed(self, name):
+		filename, sig = self._modules[name]
+		return signature(filename)[1] != sig
+
+	def invalidated(self, name):
+		# The modules of name which changed on disk, and all the modules of
+		# name which depend on those. The module itself is always included
+		mods = self.closure(name)
+		ret = filter(lambda x: x == name or self.changed(x), mods)
+
+		added = True
+
+		while added:
+			added = False
+
+			for item in mods:
+				if item in ret:
+					continue
+
+				for dep in self._deps[item]:
+					if dep in ret:
+						ret.append(item)
+						added = True
+						break
+
+		return ret
+
+	def _take(self, names):
+		ret = {}
+
+		for name in names:
+			ret[name] = [sys.modules.get(name), self._modules.get(name), self._deps.get(name)]
+
+			for d in (sys.modules, self._modules, self._deps):
+				if name in d:
+					del d[name]
+
+		return ret
+
+	def stash(self, name):
+		# Take the invalidated modules of name out, so that a new version can
+		# be imported next to the old one. The modules which did not change
+		# are shared with the new version
+		return self._take(self.invalidated(name))
+
+	def unstash(self, stash):
+		self._take(stash.keys())
+
+		for name in stash:
+			for d, value in zip((sys.modules, self._modules, self._deps), stash[name]):
+				if value != None:
+					d[name] = value
+
+	def unload(self, name):
+		self._take(self.closure(name))
+
+_instance = None
+
+def instance():
+	global _instance
+
+	if _instance == None:
+		_instance = Importer()
+
+	return _instance
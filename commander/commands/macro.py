@@ -0,0 +1,139 @@
+import exceptions
+import pipe
+import commander.utils as utils
+
+# Macros are sequences of commands which were recorded or read from a script,
+# so they can be replayed without going through the entry again. Commands are
+# kept by the name they were executed with and looked up again when the macro
+# is played, so that a reloaded module plays its new version. The answers
+# given to the prompts of a command are recorded with it
+
+_recording = None
+_last = None
+
+class Step:
+	def __init__(self, name, args, argstr):
+		self.name = name
+		self.args = args
+		self.argstr = argstr
+		self.answers = []
+
+	def __str__(self):
+		if self.argstr:
+			return '%s %s' % (self.name, self.argstr)
+		else:
+			return self.name
+
+class Macro:
+	def __init__(self):
+		self.steps = []
+
+	def add(self, name, args, argstr):
+		step = Step(name, args, argstr)
+		self.steps.append(step)
+
+		return step
+
+	def __len__(self):
+		return len(self.steps)
+
+class Entry:
+	# The entry given to the commands of a macro. Info shown by the commands
+	# is collected and shown at once when the macro is done
+	def __init__(self, entry):
+		self._entry = entry
+		self._info = []
+
+	def __getattr__(self, name):
+		return getattr(self._entry, name)
+
+	def info_show(self, text='', use_markup=False):
+		self._info.append((text, use_markup))
+
+	def flush(self):
+		if not self._info:
+			return
+
+		if len(filter(lambda x: x[1], self._info)) == len(self._info):
+			self._entry.info_show("\n".join(map(lambda x: x[0], self._info)), True)
+		else:
+			for text, use_markup in self._info:
+				self._entry.info_show(text, use_markup)
+
+		self._info = []
+
+def split(line):
+	# Split a command line in words, the same way as the entry does
+	words = list(utils.re_words.finditer(line))
+	wordsstr = []
+
+	for word in words:
+		for i in (3, 2, 0):
+			if word.group(i) != None:
+				wordsstr.append(word.group(i))
+				break
+
+	return words, wordsstr
+
+def parse(text, resolve):
+	# Parse a script of commands, one on each line. resolve looks up the
+	# command for the word at an index of a list of words
+	# completion imports the commands package, which imports this module
+	import completion
+
+	ret = Macro()
+	lineno = 0
+
+	for line in text.splitlines():
+		lineno += 1
+		line = line.strip()
+
+		if not line or line.startswith('#'):
+			continue
+
+		words, wordsstr = split(line)
+
+		if len(pipe.split(words, wordsstr, completion.exact_command)) > 1:
+			raise exceptions.Execute('Line %d: pipelines cannot be used in scripts' % (lineno,))
+
+		if not resolve(wordsstr, 0):
+			raise exceptions.Execute('Line %d: could not find command: %s' % (lineno, wordsstr[0]))
+
+		if len(words) > 1:
+			argstr = line[words[1].start(0):]
+		else:
+			argstr = ''
+
+		ret.add(wordsstr[0], wordsstr[1:], argstr)
+
+	return ret
+
+def record():
+	global _recording
+	_recording = Macro()
+
+def recording():
+	return _recording != None
+
+def stop():
+	global _recording, _last
+
+	ret = _recording
+	_recording = None
+
+	if ret:
+		_last = ret
+
+	return ret
+
+def last():
+	return _last
+
+def add(cmd, name, args, argstr):
+	# Record an executed command, executed with name, unless it is marked to
+	# be left out of macros. Returns the recorded step, to add the answers to
+	# its prompts
+	if _recording == None or not getattr(cmd.real().method, 'macro', True):
+		return None
+
+	return _recording.add(name, args, argstr)
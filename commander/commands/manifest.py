@@ -0,0 +1,152 @@
+import os
+import cPickle
+
+import module
+
+def describe(cmd):
+	ret = {
+		'name': cmd.name,
+		'doc': cmd.doc(),
+		'method': bool(cmd.method),
+		'args': None,
+		'varargs': None,
+		'defaults': 0,
+		'autocomplete': [],
+		'commands': None
+	}
+
+	if cmd.method:
+		fp = cmd.func_props()
+
+		ret['args'] = list(fp.args)
+		ret['varargs'] = fp.varargs
+
+		if fp.defaults:
+			ret['defaults'] = len(fp.defaults)
+
+		complete = cmd.autocomplete_func()
+
+		if complete:
+			ret['autocomplete'] = complete.keys()
+
+	if isinstance(cmd, module.Module):
+		ret['commands'] = map(describe, cmd.commands())
+
+	return ret
+
+def signature(path):
+	# The signature of a module is the modification time and size of all
+	# python files making up the module
+	if os.path.isdir(path):
+		files = []
+
+		for dirpath, dirnames, filenames in os.walk(path):
+			for f in filenames:
+				if f.endswith('.py'):
+					files.append(os.path.join(dirpath, f))
+
+		files.sort()
+	else:
+		files = [path]
+
+	ret = []
+
+	for f in files:
+		try:
+			st = os.stat(f)
+		except OSError:
+			return None
+
+		ret.append((f[len(path):], st.st_mtime, st.st_size))
+
+	return ret
+
+class Manifest:
+	VERSION = 1
+
+	def __init__(self, filename):
+		self._filename = filename
+		self._entries = {}
+		self._dirty = False
+
+		self.load()
+
+	def load(self):
+		try:
+			f = file(self._filename, 'rb')
+			data = cPickle.load(f)
+			f.close()
+		except Exception:
+			return
+
+		if data.get('version') == Manifest.VERSION:
+			self._entries = data['modules']
+
+	def save(self):
+		if not self._dirty:
+			return
+
+		try:
+			os.makedirs(os.path.dirname(self._filename))
+		except OSError:
+			pass
+
+		# Write to a temporary file first so that a crash never leaves a
+		# truncated manifest behind
+		tmp = self._filename + '.tmp'
+
+		try:
+			f = file(tmp, 'wb')
+			cPickle.dump({'version': Manifest.VERSION, 'modules': self._entries}, f, 2)
+			f.close()
+
+			os.rename(tmp, self._filename)
+		except (IOError, OSError):
+			return
+
+		self._dirty = False
+
+	def lookup(self, path):
+		if not path in self._entries:
+			return None
+
+		entry = self._entries[path]
+
+		if entry['signature'] != signature(path):
+			return None
+
+		return entry
+
+	def restore(self, mod, entry):
+		roots = map(lambda x: module.restore_command(x, mod, True), entry['roots'])
+		commands = map(lambda x: module.restore_command(x, mod), entry['command']['commands'])
+
+		mod.restore(entry['command'], roots, commands)
+
+	def update(self, path, mod):
+		if not path:
+			return
+
+		sig = signature(path)
+
+		if sig == None:
+			return
+
+		self._entries[path] = {
+			'signature': sig,
+			'command': describe(mod),
+			'roots': map(describe, mod.roots())
+		}
+
+		self._dirty = True
+
+	def remove(self, path):
+		if path in self._entries:
+			del self._entries[path]
+			self._dirty = True
+
+	def prune(self, paths):
+		for path in self._entries.keys():
+			if not path in paths:
+				del self._entries[path]
+				self._dirty = True
@@ -3,6 +3,94 @@ import types
 import inspect
 import sys
 import commander.utils as utils
+import pipe
+import watchdog
+
+# Arguments which are provided by commander instead of being taken from the
+# words typed after the command
+_system_args = {
+	'argstr': lambda argstr, words, entry, modifier: argstr,
+	'args': lambda argstr, words, entry, modifier: words,
+	'entry': lambda argstr, words, entry, modifier: entry,
+	'view': lambda argstr, words, entry, modifier: entry.view(),
+	'modifier': lambda argstr, words, entry, modifier: modifier,
+	'window': lambda argstr, words, entry, modifier: entry.view().get_toplevel(),
+	'input': lambda argstr, words, entry, modifier: pipe.input(entry)
+}
+
+# The system arguments a function taking **kwargs gets without naming them.
+# Others, like input, are only passed to functions which ask for them
+_keyword_args = ['argstr', 'args', 'entry', 'view', 'modifier', 'window']
+
+class Binder:
+	# Maps the arguments of a command function to slots once, so that
+	# executing the command only needs to fill them in
+	def __init__(self, fp):
+		if fp.defaults:
+			firstdef = len(fp.args) - len(fp.defaults)
+		else:
+			firstdef = len(fp.args)
+
+		self.slots = []
+		self.needs = []
+
+		for i in range(len(fp.args)):
+			k = fp.args[i]
+
+			if k in _system_args:
+				self.slots.append((k, _system_args[k]))
+			else:
+				self.slots.append((k, None))
+
+				# The argument that is reported when there are not enough words
+				if i < firstdef:
+					self.needs.append(k)
+				else:
+					self.needs.append(None)
+
+		self.varargs = bool(fp.varargs)
+
+		# System arguments which are only passed through **kwargs
+		if fp.keywords:
+			self.keywords = filter(lambda x: not x in fp.args, _keyword_args)
+		else:
+			self.keywords = []
+
+	def bind(self, argstr, words, entry, modifier):
+		numwords = len(words)
+
+		if numwords < len(self.needs) and self.needs[numwords]:
+			raise exceptions.Execute('Invalid number of arguments (need %s)' % (self.needs[numwords],))
+
+		args = []
+		kwargs = {}
+		idx = 0
+		missing = False
+
+		for k, getter in self.slots:
+			if getter:
+				val = getter(argstr, words, entry, modifier)
+
+				# Positional arguments were left to their defaults, pass the
+				# remaining system arguments by name
+				if missing:
+					kwargs[k] = val
+				else:
+					args.append(val)
+			elif idx < numwords:
+				args.append(words[idx])
+				idx += 1
+			else:
+				missing = True
+
+		# Append the rest if it can handle varargs
+		if self.varargs and idx < numwords:
+			args.extend(words[idx:])
+
+		for k in self.keywords:
+			kwargs[k] = _system_args[k](argstr, words, entry, modifier)
+
+		return args, kwargs
 
 class Method:
 	def __init__(self, method, name, parent):
@@ -10,10 +98,17 @@ class Method:
 		self.name = name.replace('_', '-')
 		self.parent = parent
 		self._func_props = None
+		self._binder = None
 	
 	def __str__(self):
 		return self.name
 
+	def qualified_name(self):
+		if self.parent:
+			return self.parent.qualified_name() + '.' + self.name
+		else:
+			return self.name
+
 	def autocomplete_func(self):
 		if hasattr(self.method, 'autocomplete'):
 			return getattr(self.method, 'autocomplete')
@@ -34,6 +129,12 @@ class Method:
 	
 	def commands(self):
 		return []
+
+	def real(self):
+		return self
+
+	def index(self):
+		return None
 	
 	def cancel(self, view):
 		if self.parent:
@@ -52,40 +153,20 @@ class Method:
 	def oneline_doc(self):
 		return self.doc().split("\n")[0]
 	
-	def execute(self, argstr, words, entry, modifier):
-		fp = self.func_props()
-		
-		kwargs = {'argstr': argstr, 'args': words, 'entry': entry, 'view': entry.view(), 'modifier': modifier, 'window': entry.view().get_toplevel()}
-		oargs = list(fp.args)
-		args = []
-		idx = 0
-		
-		if fp.defaults:
-			numdef = len(fp.defaults)
-		else:
-			numdef = 0
-		
-		for k in fp.args:
-			if k in kwargs:
-				args.append(kwargs[k])
-				oargs.remove(k)
-				del kwargs[k]
-			elif idx >= len(words):
-				if numdef < len(oargs):
-					raise exceptions.Execute('Invalid number of arguments (need %s)' % (oargs[0],))
-			else:
-				args.append(words[idx])
-				oargs.remove(k)
-				idx += 1
+	def binder(self):
+		if not self._binder:
+			self._binder = Binder(self.func_props())
 
-		# Append the rest if it can handle varargs
-		if fp.varargs and idx < len(words):
-			args.extend(words[idx:])
+		return self._binder
 
-		if not fp.keywords:
-			kwargs = {}
+	def execute(self, argstr, words, entry, modifier):
+		args, kwargs = self.binder().bind(argstr, words, entry, modifier)
+		watchdog.push(self.qualified_name())
 
-		return self.method(*args, **kwargs)
+		try:
+			return self.method(*args, **kwargs)
+		finally:
+			watchdog.pop()
 
 	def __cmp__(self, other):
 		if isinstance(other, Method):
@@ -93,3 +174,56 @@ class Method:
 		else:
 			return cmp(self.name, other)
 
+
+class CachedMethod(Method):
+	def __init__(self, entry, parent, root=False):
+		Method.__init__(self, entry['method'], entry['name'], parent)
+
+		self._entry = entry
+		self._root = root
+
+	def real(self):
+		# Resolve the real command, this imports the module if needed
+		parent = self.parent.real()
+
+		if self._root:
+			cmds = parent.roots()
+		else:
+			cmds = parent.commands()
+
+		for cmd in cmds:
+			if cmd.name == self.name:
+				return cmd
+
+		raise exceptions.Execute('Could not find command: ' + self.name)
+
+	def doc(self):
+		if self._entry['doc'] == None:
+			return self.real().doc()
+
+		return self._entry['doc']
+
+	def oneline_doc(self):
+		# Do not import a deferred module just to list it
+		if self._entry['doc'] == None:
+			return ''
+
+		return Method.oneline_doc(self)
+
+	def args(self):
+		if self._entry['args'] == None and self._entry['method']:
+			return self.real().args()
+
+		return self._entry['args'] or [], self._entry['varargs']
+
+	def func_props(self):
+		return self.real().func_props()
+
+	def autocomplete_func(self):
+		if self._entry['autocomplete'] != None and not self._entry['autocomplete']:
+			return None
+
+		return self.real().autocomplete_func()
+
+	def execute(self, argstr, words, entry, modifier):
+		return self.real().execute(argstr, words, entry, modifier)
@@ -0,0 +1,125 @@
+import math
+import time
+
+# Registry of histograms, recording how long commands and completions take
+# in everyday use. Histograms use exponentially growing buckets so that they
+# have a fixed size, percentiles are accurate up to the bucket ratio
+RATIO = 1.2
+
+# Maximum number of commands to keep statistics for. A pipeline is recorded
+# under the joined names of its stages, so there can be many
+LIMIT = 500
+
+class Histogram:
+	def __init__(self, minimum=0.0001):
+		self.minimum = minimum
+		self.count = 0
+		self.total = 0
+		self.max = 0
+
+		self._buckets = {}
+
+	def _bucket(self, value):
+		if value <= self.minimum:
+			return 0
+
+		return int(math.ceil(math.log(value / self.minimum, RATIO)))
+
+	def add(self, value):
+		self.count += 1
+		self.total += value
+		self.max = max(self.max, value)
+
+		idx = self._bucket(value)
+		self._buckets[idx] = self._buckets.get(idx, 0) + 1
+
+	def mean(self):
+		if not self.count:
+			return 0
+
+		return self.total / float(self.count)
+
+	def percentile(self, p):
+		if not self.count:
+			return 0
+
+		rank = p / 100.0 * self.count
+		seen = 0
+
+		keys = self._buckets.keys()
+		keys.sort()
+
+		for idx in keys:
+			seen += self._buckets[idx]
+
+			if seen >= rank:
+				return min(self.minimum * RATIO ** idx, self.max)
+
+		return self.max
+
+class Command:
+	def __init__(self):
+		self.first = Histogram()
+		self.total = Histogram()
+		self.steps = Histogram(1)
+		self.failed = 0
+		self.cancelled = 0
+
+class Call:
+	# A single execution of a command, which can span several calls to
+	# Commands.execute when the command prompts or suspends
+	def __init__(self, name):
+		self.name = name
+		self.start = time.time()
+		self.first = None
+
+	def result(self):
+		if self.first == None:
+			self.first = time.time() - self.start
+
+	def finish(self, steps, failed=False, cancelled=False):
+		self.result()
+
+		cmd = command(self.name)
+		cmd.first.add(self.first)
+		cmd.total.add(time.time() - self.start)
+		cmd.steps.add(steps)
+
+		if failed:
+			cmd.failed += 1
+
+		if cancelled:
+			cmd.cancelled += 1
+
+_commands = {}
+_completions = {}
+
+def command(name):
+	if not name in _commands:
+		if len(_commands) >= LIMIT:
+			# Make room by forgetting the least used command
+			least = min(_commands, key=lambda x: _commands[x].total.count)
+			del _commands[least]
+
+		_commands[name] = Command()
+
+	return _commands[name]
+
+def commands():
+	return dict(_commands)
+
+def completion(func, elapsed):
+	name = getattr(func, '__module__', None) or ''
+	name += '.' + getattr(func, '__name__', str(func))
+
+	if not name in _completions:
+		_completions[name] = Histogram()
+
+	_completions[name].add(elapsed)
+
+def completions():
+	return dict(_completions)
+
+def clear():
+	_commands.clear()
+	_completions.clear()
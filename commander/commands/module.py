@@ -2,19 +2,105 @@ import sys
 import os
 import types
 import bisect
+import re
+import ast
 
 import utils
 import exceptions
 import method
-import rollbackimporter
+import importer
+import trie
+import bundle
+import timing
+import tracing
+
+_re_commander = re.compile('^__commander_module__\\s*=', re.M)
+_re_default = re.compile('^(?:def\\s+__default__\\b|__default__\\s*=)', re.M)
+
+def _deferred_entry(name, default):
+	return {
+		'name': name,
+		'doc': None,
+		'method': default,
+		'args': None,
+		'varargs': None,
+		'defaults': 0,
+		'autocomplete': None,
+		'commands': None
+	}
+
+def _is_root(node):
+	return isinstance(node, ast.Name) and node.id == '__root__'
+
+def scan_roots(source):
+	# Find the roots of a module from its source. Only a single assignment of
+	# a literal list of names is understood, for anything else, like a
+	# computed __root__ or one which is imported or changed later on, None is
+	# returned and the module has to be imported to find out
+	if not '__root__' in source:
+		return []
+
+	try:
+		tree = ast.parse(source.replace('\r\n', '\n') + '\n')
+	except SyntaxError:
+		return None
+
+	target = None
+
+	for node in tree.body:
+		if isinstance(node, ast.Assign) and len(node.targets) == 1 and _is_root(node.targets[0]):
+			if target != None:
+				return None
+
+			target = node.targets[0]
+			value = node.value
+
+	# The assignment must be the only place where __root__ is used
+	for node in ast.walk(tree):
+		if _is_root(node) and not node is target:
+			return None
+
+		if isinstance(node, (ast.Import, ast.ImportFrom)):
+			for alias in node.names:
+				if (alias.asname or alias.name) == '__root__':
+					return None
+
+		if isinstance(node, ast.Global) and '__root__' in node.names:
+			return None
+
+	if target == None:
+		return []
+
+	try:
+		roots = ast.literal_eval(value)
+	except ValueError:
+		return None
+
+	if not isinstance(roots, (list, tuple)) or filter(lambda x: not isinstance(x, basestring), roots):
+		return None
+
+	return list(roots)
+
+def scan_source(source):
+	# Find out whether source is a commander module, whether it has a default
+	# command and what its roots are, without executing it. The roots are
+	# None when they cannot be found without importing the module
+	if not _re_commander.search(source):
+		return None
+
+	return _re_default.search(source) != None, scan_roots(source)
 
 class Module(method.Method):
-	def __init__(self, base, mod, parent=None):
+	def __init__(self, base, mod, parent=None, loaded=None):
 		method.Method.__init__(self, None, base, parent)
 
 		self._commands = None
+		self._index = None
 		self._dirname = None
 		self._roots = None
+		self._cache = None
+		self._base = base
+		self._loaded = loaded
 
 		if type(mod) == types.ModuleType:
 			self.mod = mod
@@ -26,16 +112,144 @@ class Module(method.Method):
 		else:
 			self.mod = None
 			self._dirname = mod
-			self._rollback = rollbackimporter.RollbackImporter()
 	
 	def commands(self):
+		if self._commands == None:
+			self.ensure()
+
 		if self._commands == None:
 			self.scan_commands()
 
 		return self._commands
 
+	def index(self):
+		commands = self.commands()
+
+		if self._index == None:
+			self._index = trie.Trie(commands)
+
+		return self._index
+
 	def clear(self):
 		self._commands = None
+		self._index = None
+
+	def path(self):
+		if not self._dirname:
+			return None
+
+		path = os.path.join(self._dirname, self._base)
+
+		if os.path.isdir(path) or self.bundled():
+			return path
+		else:
+			return path + '.py'
+
+	def restore(self, cache, roots, commands):
+		# Restore the module from a manifest entry, without importing it
+		self.mod = None
+		self._cache = cache
+		self._roots = roots
+		self._commands = commands
+		self._index = None
+
+		self.method = cache['method']
+
+	def defer(self):
+		# Register the module without importing it. Only the roots and
+		# whether there is a default command are found by looking at the
+		# source. The module is imported when its commands are expanded,
+		# executed or documented
+		path = self.path()
+
+		if os.path.isdir(path):
+			path = os.path.join(path, '__init__.py')
+
+		try:
+			f = file(path, 'r')
+			source = f.read()
+			f.close()
+		except IOError:
+			return False
+
+		info = scan_source(source)
+
+		if info == None:
+			return False
+
+		if info[1] == None:
+			print 'Could not find the roots of module %s without importing it' % (self._base,)
+			return False
+
+		self.restore_deferred(*info)
+		return True
+
+	def restore_deferred(self, default, roots):
+		cache = _deferred_entry(self.name, default)
+		roots = map(lambda x: method.CachedMethod(_deferred_entry(x, True), self, True), roots)
+
+		self.restore(cache, roots, None)
+
+	def cached(self):
+		return self.mod == None and self._cache != None
+
+	def deferred(self):
+		return self.cached() and self._commands == None
+
+	def ensure(self):
+		if not self.cached():
+			return
+
+		cache = [self._cache, self._roots, self._commands]
+
+		try:
+			self.reload()
+		except:
+			self.restore(*cache)
+			raise
+
+		if self._loaded:
+			self._loaded(self, cache[1])
+
+	def real(self):
+		self.ensure()
+		return self
+
+	def doc(self):
+		if self.cached() and self._cache['doc'] != None:
+			return self._cache['doc']
+
+		self.ensure()
+		return method.Method.doc(self)
+
+	def oneline_doc(self):
+		# Do not import a deferred module just to list it
+		if self.cached() and self._cache['doc'] == None:
+			return ''
+
+		return method.Method.oneline_doc(self)
+
+	def args(self):
+		if self.cached() and (self._cache['args'] != None or not self.method):
+			return self._cache['args'] or [], self._cache['varargs']
+
+		self.ensure()
+		return method.Method.args(self)
+
+	def func_props(self):
+		self.ensure()
+		return method.Method.func_props(self)
+
+	def autocomplete_func(self):
+		if self.cached() and self._cache['autocomplete'] != None and not self._cache['autocomplete']:
+			return None
+
+		self.ensure()
+		return method.Method.autocomplete_func(self)
+
+	def execute(self, argstr, words, entry, modifier):
+		self.ensure()
+		return method.Method.execute(self, argstr, words, entry, modifier)
 	
 	def roots(self):
 		if self._roots == None:
@@ -50,12 +264,13 @@ class Module(method.Method):
 				root = []
 		
 			root = filter(lambda x: x in dic and type(dic[x]) == types.FunctionType, root)
-			self._roots = map(lambda x: method.Method(dic[x], x, self.mod), root)
+			self._roots = map(lambda x: method.Method(dic[x], x, self), root)
 		
 		return self._roots
 	
 	def scan_commands(self):
 		self._commands = []
+		self._index = None
 		
 		if self.mod == None:
 			return
@@ -81,34 +296,87 @@ class Module(method.Method):
 				
 				# Insert root functions into this module
 				for r in mod.roots():
-					bisect.insert(self._commands, r)
+					bisect.insort(self._commands, r)
 	
 	def unload(self):
 		self._commands = None
+		self._index = None
+		self._roots = None
+		self._cache = None
+		self._func_props = None
+		self._binder = None
 
 		if not self._dirname:
 			return False
 		
-		self._rollback.uninstall()
+		if self.mod:
+			importer.instance().unload(self._base)
+
 		self.mod = None
 
 		return True
 	
+	def bundled(self):
+		return self._dirname != None and bundle.archive(self._dirname) != None
+
+	def sources(self):
+		path = self.path()
+
+		if self.bundled():
+			return []
+
+		if not os.path.isdir(path):
+			return [path]
+
+		ret = []
+
+		for dirpath, dirnames, filenames in os.walk(path):
+			for f in filenames:
+				if f.endswith('.py'):
+					ret.append(os.path.join(dirpath, f))
+
+		return ret
+
+	def compile(self):
+		# Compile all the sources of the module without importing anything,
+		# this catches syntax errors before any of the module is replaced
+		for filename in self.sources():
+			f = file(filename, 'r')
+			source = f.read()
+			f.close()
+
+			compile(source.replace('\r\n', '\n') + '\n', filename, 'exec')
+
+	def stash(self):
+		# Take the changed python modules of this module out of sys.modules,
+		# so that a new version of the module can be imported next to it
+		if not self.mod:
+			return {}
+
+		return importer.instance().stash(self._base)
+
+	def unstash(self, stash):
+		importer.instance().unstash(stash)
+
 	def reload(self):
+		start = tracing.now()
+
+		try:
+			timing.call('load', self._base, self._reload)
+		finally:
+			tracing.complete('reload', 'module', start, {'module': self._base})
+
+	def _reload(self):
 		if not self.unload():
 			return
 
-		if self.name in sys.modules:
+		if self._base in sys.modules:
 			raise Exception('Module already exists...')
 
-		oldpath = list(sys.path)
+		tracker = importer.instance()
 
 		try:
-			sys.path.insert(0, self._dirname)
-			
-			self._rollback.monitor()
-			self.mod = __import__(self.name, globals(), locals(), [], 0)
-			self._rollback.cancel()
+			self.mod = tracker.import_module(self._base, self._dirname)
 			
 			if not utils.is_commander_module(self.mod):
 				raise Exception('Module is not a commander module...')
@@ -118,12 +386,29 @@ class Module(method.Method):
 			else:
 				self.method = None
 		except:
-			sys.path = oldpath
-			self._rollback.uninstall()
-			
-			if self.name in sys.modules:
-				del sys.modules[self.name]
+			tracker.unload(self._base)
+			self.mod = None
 			raise
-		
-		sys.path = oldpath
 
+class CachedModule(method.CachedMethod, Module):
+	def __init__(self, entry, parent, root=False):
+		Module.__init__(self, entry['name'], None, parent)
+		method.CachedMethod.__init__(self, entry, parent, root)
+
+	def roots(self):
+		return []
+
+	def index(self):
+		return Module.index(self)
+
+	def commands(self):
+		if self._commands == None:
+			self._commands = map(lambda x: restore_command(x, self), self._entry['commands'])
+
+		return self._commands
+
+def restore_command(entry, parent, root=False):
+	if entry['commands'] != None:
+		return CachedModule(entry, parent, root)
+	else:
+		return method.CachedMethod(entry, parent, root)
@@ -0,0 +1,214 @@
+import re
+import types
+import itertools
+
+from xml.sax import saxutils
+
+import result
+
+_re_markup = re.compile('<[^>]*>')
+
+def is_separator(word):
+	# Only an unquoted | separates commands
+	return word != None and word.group(0) == '|'
+
+def split(words, wordsstr, resolve):
+	# Split the words of a command line in stages at each |. A | only
+	# separates stages when the word after it is the full name of a command,
+	# so that shell pipes like '! ls | sort' keep working. resolve looks up
+	# the command named in full by the word at an index of wordsstr. Returns
+	# a list of (start, end) word indices
+	ret = []
+	start = 0
+
+	for i in xrange(1, len(words) - 1):
+		if is_separator(words[i]) and resolve(wordsstr, i + 1):
+			ret.append((start, i))
+			start = i + 1
+
+	ret.append((start, len(words)))
+	return ret
+
+def offset(words, idx):
+	# The index of the first word of the stage containing word idx
+	for i in xrange(idx - 1, -1, -1):
+		if is_separator(words[i]):
+			return i + 1
+
+	return 0
+
+def strip_markup(text):
+	return saxutils.unescape(_re_markup.sub('', text))
+
+def lines(text):
+	# Iterate over the lines in text, without splitting it all at once
+	start = 0
+
+	while start < len(text):
+		end = text.find("\n", start)
+
+		if end == -1:
+			yield text[start:]
+			break
+
+		yield text[start:end]
+		start = end + 1
+
+class Stream:
+	# Info shown by a pipeline stage. The next stage only starts when the
+	# stage is done, so all of it is kept until then, in the chunks it was
+	# written in. It is only split in lines when read
+	def __init__(self):
+		self._chunks = []
+
+	def write(self, text):
+		if text:
+			self._chunks.append(text)
+
+	def __nonzero__(self):
+		return len(self._chunks) != 0
+
+	def __iter__(self):
+		while self._chunks:
+			chunk = self._chunks.pop(0)
+
+			for line in lines(chunk):
+				yield line
+
+class Selection:
+	# The selection of a view as input, read line by line from the buffer
+	def __init__(self, buf, bounds):
+		self._buf = buf
+		self._start = buf.create_mark(None, bounds[0], True)
+		self._end = buf.create_mark(None, bounds[1], False)
+
+	def __iter__(self):
+		buf = self._buf
+		piter = buf.get_iter_at_mark(self._start)
+		end = buf.get_iter_at_mark(self._end)
+
+		while piter.compare(end) < 0:
+			nxt = piter.copy()
+
+			if not nxt.ends_line():
+				nxt.forward_to_line_end()
+
+			if nxt.compare(end) > 0:
+				nxt = end
+
+			yield piter.get_text(nxt)
+
+			piter = nxt
+			piter.forward_line()
+
+			# Iters become invalid when the buffer is changed
+			buf.move_mark(self._start, piter)
+			end = buf.get_iter_at_mark(self._end)
+
+		buf.delete_mark(self._start)
+		buf.delete_mark(self._end)
+
+def _iterate(value):
+	if isinstance(value, basestring):
+		return lines(value)
+	else:
+		return iter(value)
+
+def generated(first, gen):
+	# The output of a stage which yields its lines: the value it yielded
+	# first, and then what it yields while the next stage reads its input
+	value = first
+
+	try:
+		while not isinstance(value, result.Result) and value != None:
+			for line in _iterate(value):
+				yield line
+
+			value = gen.next()
+	except StopIteration:
+		pass
+	finally:
+		gen.close()
+
+class Entry:
+	# The entry given to a command running in a pipeline. It provides the
+	# output of the previous stage as input, and collects the info shown by
+	# the command as output for the next stage, unless it is the last stage
+	def __init__(self, entry, input, capture):
+		self._entry = entry
+		self._input = input
+		self._output = None
+
+		if capture:
+			self._output = Stream()
+
+	def __getattr__(self, name):
+		return getattr(self._entry, name)
+
+	def pipe_input(self):
+		return self._input
+
+	def info_show(self, text='', use_markup=False):
+		if self._output == None:
+			self._entry.info_show(text, use_markup)
+			return
+
+		if use_markup:
+			text = strip_markup(text)
+
+		self._output.write(text + "\n")
+
+	def output(self, ret):
+		# What the command passes on to the next stage: the value or stream it
+		# returned, the info it showed, or else the selection it made
+		if isinstance(ret, result.Stream):
+			if ret.use_markup:
+				return itertools.imap(strip_markup, ret)
+			else:
+				return iter(ret)
+
+		if ret != None and not isinstance(ret, result.Result):
+			return _iterate(ret)
+
+		if self._output:
+			return iter(self._output)
+
+		buf = self._entry.view().get_buffer()
+		bounds = buf.get_selection_bounds()
+
+		if bounds:
+			return iter(Selection(buf, bounds))
+
+		return iter([])
+
+def input(entry):
+	if isinstance(entry, Entry):
+		return entry.pipe_input()
+	else:
+		return None
+
+class Pipeline:
+	def __init__(self, stages, entry, modifier):
+		# stages is a list of [cmd, argstr, words]
+		self.stages = stages
+		self.entry = entry
+		self.modifier = modifier
+
+		self._current = None
+		self._input = None
+
+	def __len__(self):
+		return len(self.stages)
+
+	def next(self):
+		# Execute the next stage and return what it returned
+		cmd, argstr, words = self.stages.pop(0)
+		self._current = Entry(self.entry, self._input, len(self.stages) != 0)
+
+		return cmd.execute(argstr, words, self._current, self.modifier)
+
+	def finish(self, ret):
+		# The current stage finished with ret, its output is the input of the
+		# next stage
+		self._input = self._current.output(ret)
+		self._current = None
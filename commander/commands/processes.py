@@ -0,0 +1,315 @@
+import os
+import sys
+import threading
+import subprocess
+import cPickle
+import Queue
+import glib
+
+import commander.config as config
+
+import result
+import exceptions
+
+# CPU bound transforms of large texts run in a few helper processes, so that
+# they do not block the main loop and can use more than one core (threads
+# do not help there, python code holds the interpreter lock). The helpers are
+# separate python interpreters running transformer, not forks of gedit. The
+# text is sent to them with a transform (see transforms), and the edits come
+# back, to be made on the main loop:
+#
+#   job = processes.transform(transforms.Case('upper'), text)
+#
+#   if job.running():
+#       yield job
+#
+#   for offset, length, text in job.result():
+#       ...
+
+# Number of helper processes, at most one per cpu
+PROCESSES = 2
+
+# Transform texts shorter than this right away
+THRESHOLD = 128 * 1024
+
+# Split texts of chunked transforms in parts of about this many characters
+CHUNK = 512 * 1024
+
+def split(text, size):
+	# Split text in (offset, part), at line ends
+	ret = []
+	start = 0
+
+	while start < len(text):
+		end = text.find("\n", start + size)
+
+		if end == -1:
+			end = len(text)
+		else:
+			end += 1
+
+		ret.append((start, text[start:end]))
+		start = end
+
+	return ret
+
+def _run(func, offset, text):
+	# Errors are passed back as text, like they come from the helpers
+	try:
+		return offset, map(lambda x: (x[0] + offset, x[1], x[2]), func(text)), None
+	except Exception, e:
+		return offset, None, str(e)
+
+class Error(exceptions.Execute):
+	pass
+
+class Job(result.Suspend):
+	def __init__(self, func, text):
+		result.Suspend.__init__(self)
+
+		self.func = func
+		self.text = text
+
+		self.error = None
+		self.cancelled = False
+
+		self._parts = {}
+		self._pending = 0
+		self._running = False
+
+	def running(self):
+		return self._running
+
+	def start(self):
+		if len(self.text) < THRESHOLD:
+			try:
+				self._parts[0] = self.func(self.text)
+			except Exception, e:
+				self.error = Error(str(e))
+
+			return
+
+		if getattr(self.func, 'chunked', False):
+			parts = split(self.text, CHUNK)
+		else:
+			parts = [(0, self.text)]
+
+		self._running = True
+		self._pending = len(parts)
+
+		pool = instance()
+
+		for offset, text in parts:
+			pool.submit(self, offset, text)
+
+		# The text is not needed anymore
+		self.text = None
+
+	def _finish_part(self, offset, edits, error):
+		if not self._running:
+			return False
+
+		if error != None:
+			self.error = Error(error)
+		else:
+			self._parts[offset] = edits
+
+		self._pending -= 1
+
+		if self._pending == 0 or self.error != None:
+			self._running = False
+			self.resume()
+
+		return False
+
+	def cancel(self):
+		# Parts which are waiting are not sent to the helpers, and the
+		# helpers finish their part, but the results are dropped
+		if not self._running:
+			return
+
+		self.cancelled = True
+		self._running = False
+		self._parts = {}
+
+		self.resume()
+
+	def result(self):
+		# The edits, in order, raises when the transform failed
+		if self.error != None:
+			raise self.error
+
+		ret = []
+
+		for offset in sorted(self._parts.keys()):
+			ret.extend(self._parts[offset])
+
+		return ret
+
+class Helper:
+	# A helper process, started when it is first needed. A helper which can
+	# not be started, or exits before its first answer (for instance because
+	# the python it runs is not python 2), is not available and the work is
+	# done on the thread instead
+	def __init__(self):
+		self.process = None
+		self.available = True
+
+		self._answered = False
+
+	def _start(self):
+		filename = os.path.join(os.path.dirname(__file__), 'transformer.py')
+
+		self.process = subprocess.Popen([_python(), '-E', filename],
+		                                stdin=subprocess.PIPE,
+		                                stdout=subprocess.PIPE,
+		                                close_fds=True)
+
+	def run(self, func, offset, text):
+		# Returns None when the helper is not available
+		if not self.available:
+			return None
+
+		if self.process == None:
+			try:
+				self._start()
+			except OSError:
+				self.available = False
+				return None
+
+		process = self.process
+
+		try:
+			cPickle.dump((func.__class__.__name__, func.__dict__, offset, text), process.stdin, cPickle.HIGHEST_PROTOCOL)
+			process.stdin.flush()
+
+			ret = cPickle.load(process.stdout)
+		except (IOError, EOFError, cPickle.UnpicklingError):
+			self.stop()
+
+			if not self._answered:
+				self.available = False
+				return None
+
+			# Start a new one for the next part
+			return offset, None, 'The transform process exited'
+
+		self._answered = True
+		return ret
+
+	def stop(self):
+		if self.process == None:
+			return
+
+		try:
+			self.process.stdin.close()
+			self.process.terminate()
+			self.process.wait()
+		except (IOError, OSError):
+			pass
+
+		self.process = None
+
+class Pool:
+	def __init__(self, processes=PROCESSES):
+		self.size = min(processes, _cpus())
+
+		self._queue = Queue.Queue()
+		self._threads = []
+		self._helpers = []
+
+		# Each helper is served by a thread, which only runs while the main
+		# loop waits when glib knows about threads
+		glib.threads_init()
+
+	def submit(self, job, offset, text):
+		self._queue.put((job, offset, text))
+
+		# Helpers are started when there is work for them
+		if len(self._threads) < self.size:
+			helper = Helper()
+
+			thread = threading.Thread(target=self._work, args=(helper,), name='commander-transform')
+			thread.setDaemon(True)
+			thread.start()
+
+			self._threads.append(thread)
+			self._helpers.append(helper)
+
+	def _work(self, helper):
+		while True:
+			item = self._queue.get()
+
+			if item == None:
+				break
+
+			job, offset, text = item
+
+			# Parts of cancelled jobs are dropped
+			if not job.running():
+				continue
+
+			ret = helper.run(job.func, offset, text)
+
+			if ret == None:
+				ret = _run(job.func, offset, text)
+
+			glib.idle_add(job._finish_part, *ret)
+
+	def stop(self):
+		while True:
+			try:
+				self._queue.get_nowait()
+			except Queue.Empty:
+				break
+
+		for thread in self._threads:
+			self._queue.put(None)
+
+		for helper in self._helpers:
+			helper.stop()
+
+		self._threads = []
+		self._helpers = []
+
+def _python():
+	# The python 2 to run the helpers with, which can be set with python in
+	# the config. Inside gedit, sys.executable is gedit itself
+	python = config.get_string('python')
+
+	if python:
+		return python
+	elif os.path.basename(sys.executable).startswith('python'):
+		return sys.executable
+	else:
+		return 'python2'
+
+def _cpus():
+	try:
+		return max(1, os.sysconf('SC_NPROCESSORS_ONLN'))
+	except (AttributeError, ValueError, OSError):
+		return 1
+
+_instance = None
+
+def instance():
+	global _instance
+
+	if _instance == None:
+		_instance = Pool()
+
+	return _instance
+
+def transform(func, text):
+	# Start transforming text, short texts are transformed right away
+	job = Job(func, text)
+	job.start()
+
+	return job
+
+def stop():
+	global _instance
+
+	if _instance != None:
+		_instance.stop()
+		_instance = None
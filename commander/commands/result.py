@@ -3,6 +3,7 @@ class Result(object):
 	DONE = 2
 	PROMPT = 3
 	SUSPEND = 4
+	STREAM = 5
 
 	def __init__(self, value):
 		self._value = value
@@ -31,11 +32,52 @@ class Suspend(Result):
 	def __init__(self):
 		Result.__init__(self, Result.SUSPEND)
 		self._callbacks = []
+		self._resumed = False
 	
 	def register(self, cb, *args):
 		self._callbacks.append([cb, args])
 	
 	def resume(self):
+		self._resumed = True
+
 		for cb in self._callbacks:
 			args = cb[1]
 			cb[0](*args)
+
+	def resumed(self):
+		# Whether it was resumed, which can happen before anyone waits
+		return self._resumed
+
+	def cancel(self):
+		# Stop waiting, the command continues as if it was done
+		self.resume()
+
+class Stream(Result):
+	# Output produced while it is shown. The entry takes lines (or chunks of
+	# lines) from the iterable when idle, until it is exhausted or cancelled
+	def __init__(self, iterable, use_markup=False):
+		Result.__init__(self, Result.STREAM)
+
+		self.use_markup = use_markup
+		self._iter = iter(iterable)
+
+	def __iter__(self):
+		return self._iter
+
+	def take(self, count):
+		# Take up to count items, returns None when there are no more
+		ret = []
+
+		try:
+			for i in xrange(count):
+				ret.append(self._iter.next())
+		except StopIteration:
+			if not ret:
+				return None
+
+		return ret
+
+	def cancel(self):
+		# Lets a generator producing the output clean up
+		if hasattr(self._iter, 'close'):
+			self._iter.close()
@@ -0,0 +1,196 @@
+import glib
+
+import result
+import exceptions
+import macro
+
+# Running commands from scripts, without the commander entry. Prompts are
+# answered from a list or a callback. Suspended commands are waited for by
+# running the main loop, or, from code which itself runs on the main loop,
+# continued when they are resumed (see run)
+
+class Entry:
+	# Stands in for the commander entry of a view. Info shown by commands
+	# is collected instead of being shown
+	def __init__(self, view):
+		self._view = view
+		self.info = []
+
+	def view(self):
+		return self._view
+
+	def info_show(self, text='', use_markup=False):
+		self.info.append(text)
+
+	def info_status(self, text):
+		pass
+
+	def info_add_action(self, stock, callback, data=None):
+		return None
+
+class Result:
+	# The outcome of a scripted command: the value it finished with, the
+	# prompts it asked, the info it showed and the number of generator steps
+	def __init__(self, value, prompts, info, steps):
+		self.value = value
+		self.prompts = prompts
+		self.info = info
+		self.steps = steps
+
+class Answers:
+	def __init__(self, answers):
+		if answers == None:
+			answers = []
+
+		if callable(answers):
+			self._func = answers
+		else:
+			self._answers = list(answers)
+			self._func = self._next
+
+		self.prompts = []
+
+	def _next(self, prompt):
+		if self._answers:
+			return self._answers.pop(0)
+		else:
+			return None
+
+	def __call__(self, prompt):
+		self.prompts.append(prompt.prompt)
+		ret = self._func(prompt.prompt)
+
+		if ret == None:
+			raise exceptions.Execute('No answer for prompt: ' + prompt.prompt)
+
+		return ret
+
+def wait(suspend):
+	# Run the main loop until a suspended command is resumed. Work which
+	# is done quickly may have resumed it already
+	if suspend.resumed():
+		return
+
+	# A nested main loop would run idle handlers, reloads and tasks in the
+	# middle of whatever dispatched the caller
+	if glib.main_depth() > 0:
+		raise exceptions.Execute('Cannot wait for a suspended command from the main loop')
+
+	resumed = []
+	suspend.register(lambda: resumed.append(True))
+
+	context = glib.main_context_default()
+
+	while not resumed:
+		context.iteration(True)
+
+class Driver:
+	# Drives the generators of a command until it no longer prompts or
+	# waits. Prompts are answered by calling answers with the prompt,
+	# streamed output is shown on entry. Iterating yields the suspends the
+	# command waits for, the command continues when the next one is asked
+	# for. The value the command finished with is kept in value
+	def __init__(self, commands, state, ret, entry, answers, modifier=0):
+		self.commands = commands
+		self.state = state
+		self.entry = entry
+		self.answers = answers
+		self.modifier = modifier
+
+		self.value = ret
+		self._steps = self._drive()
+
+	def __iter__(self):
+		return self._steps
+
+	def next(self):
+		return self._steps.next()
+
+	def close(self):
+		self._steps.close()
+
+	def _drive(self):
+		commands = self.commands
+		state = self.state
+		modifier = self.modifier
+
+		try:
+			ret = commands.run(state, self.value)
+
+			while True:
+				if ret == result.Result.STREAM:
+					for line in ret:
+						self.entry.info_show(line, ret.use_markup)
+
+					if not state:
+						ret = None
+						break
+
+					ret = commands._run_generator(state, ['', [], modifier])
+					continue
+
+				if not state:
+					break
+
+				if ret == result.Result.PROMPT:
+					text = self.answers(ret)
+					words, wordsstr = macro.split(text)
+
+					ret = commands._run_generator(state, [text, words, modifier])
+				elif ret == result.Result.SUSPEND:
+					yield ret
+
+					# Like the entry, resume with an empty line
+					ret = commands._run_generator(state, ['', [], modifier])
+				else:
+					break
+
+			self.value = ret
+		finally:
+			# Close what is left, so that commands can clean up
+			while state:
+				state.pop()
+
+def run(driver, finished):
+	# Drive a command from the main loop without waiting for it: it is
+	# continued when the suspends it waits for are resumed. finished is
+	# called with the exception the command raised, or None, when it is done
+	waiting = []
+
+	def on_resumed(suspend):
+		# A suspend can be resumed more than once, only continue once
+		if waiting and waiting[0] is suspend:
+			del waiting[:]
+			step()
+
+	def step():
+		while True:
+			try:
+				suspend = driver.next()
+			except StopIteration:
+				finished(None)
+				return
+			except Exception, e:
+				driver.close()
+				finished(e)
+				return
+
+			if not suspend.resumed():
+				waiting.append(suspend)
+				suspend.register(on_resumed, suspend)
+				return
+
+	step()
+
+def drive(commands, state, ret, entry, answers, modifier=0):
+	# Drive a command, running the main loop while it is suspended. Only for
+	# code which does not run on the main loop itself
+	driver = Driver(commands, state, ret, entry, answers, modifier)
+
+	try:
+		for suspend in driver:
+			wait(suspend)
+	finally:
+		driver.close()
+
+	return driver.value
@@ -0,0 +1,248 @@
+import time
+import glib
+
+import result
+
+# Long running work, split in small steps which are run in idle time so that
+# the main loop keeps going. The work is a generator, each time it yields
+# is a step. What it yields is its progress: None, a fraction between 0 and
+# 1, or a (markup) text. Work which needs to wait, for instance for a
+# command it runs, yields a Suspend result and continues once that is
+# resumed.
+#
+# A task is a Suspend result, commands run them like:
+#
+#   task = tasks.Task(work(), entry)
+#
+#   if task.start():
+#       yield task
+#
+#   if task.cancelled:
+#       ...
+
+# Seconds to spend on tasks in each idle call
+BUDGET = 0.008
+
+class Token:
+	# Tells work that it should stop. Work which passes the token on to
+	# other code can check it between steps
+	def __init__(self):
+		self.cancelled = False
+
+	def cancel(self):
+		self.cancelled = True
+
+class Scheduler:
+	def __init__(self, budget=BUDGET):
+		self.budget = budget
+
+		self._tasks = []
+		self._idle = 0
+		self._stepping = False
+
+	def add(self, task):
+		if not task in self._tasks:
+			self._tasks.append(task)
+
+		if not self._idle:
+			self._idle = glib.idle_add(self.on_idle)
+
+	def remove(self, task):
+		if task in self._tasks:
+			self._tasks.remove(task)
+
+		if not self._tasks and self._idle:
+			glib.source_remove(self._idle)
+			self._idle = 0
+
+	def __len__(self):
+		return len(self._tasks)
+
+	def stepping(self):
+		# Whether a task is being stepped. The scheduler does not run again
+		# until the step is done, so tasks started from a step should not
+		# wait for it
+		return self._stepping
+
+	def on_idle(self):
+		start = time.time()
+		finished = []
+
+		# Take turns, so that one task does not hold up the others
+		while self._tasks and time.time() - start < self.budget:
+			task = self._tasks.pop(0)
+			self._stepping = True
+
+			try:
+				more = task.step()
+			finally:
+				self._stepping = False
+
+			if not more:
+				finished.append(task)
+			elif not task.waiting():
+				self._tasks.append(task)
+
+		for task in self._tasks:
+			task.report()
+
+		keep = len(self._tasks) != 0
+
+		if not keep:
+			self._idle = 0
+
+		# Resuming continues the commands, which may add new tasks
+		for task in finished:
+			task.finish()
+
+		return keep
+
+_instance = None
+
+def instance():
+	global _instance
+
+	if _instance == None:
+		_instance = Scheduler()
+
+	return _instance
+
+class Task(result.Suspend):
+	def __init__(self, work, entry=None, message='Working...', token=None):
+		result.Suspend.__init__(self)
+
+		if token == None:
+			token = Token()
+
+		self.work = work
+		self.entry = entry
+		self.message = message
+		self.token = token
+		self.error = None
+
+		self._progress = None
+		self._reported = None
+		self._running = False
+		self._waiting = None
+		self._stepping = False
+
+	@property
+	def cancelled(self):
+		return self.token.cancelled
+
+	def running(self):
+		return self._running
+
+	def waiting(self):
+		# Whether the work waits to be resumed, it is not stepped until then
+		return self._waiting != None
+
+	def start(self, budget=BUDGET):
+		# Run the first steps right away, work which is done within the
+		# budget does not need to be waited for. Returns whether the task
+		# is still running
+		start = time.time()
+		scheduler = instance()
+
+		while self.step():
+			if self.waiting():
+				self._running = True
+				self.report()
+
+				return True
+
+			if time.time() - start > budget and not scheduler.stepping():
+				self._running = True
+				self.report()
+
+				scheduler.add(self)
+				return True
+
+		return False
+
+	def step(self):
+		# Returns whether there is more to do
+		if self.token.cancelled:
+			self.work.close()
+			return False
+
+		self._stepping = True
+
+		try:
+			progress = self.work.next()
+		except StopIteration:
+			return False
+		except Exception, e:
+			self.error = e
+			return False
+		finally:
+			self._stepping = False
+
+		if self.token.cancelled:
+			# Cancelled during the step
+			self.work.close()
+			return False
+
+		if isinstance(progress, result.Suspend):
+			if not progress.resumed():
+				self._waiting = progress
+				progress.register(self.on_resumed, progress)
+		else:
+			self._progress = progress
+
+		return True
+
+	def on_resumed(self, suspend):
+		# Step the work again, unless it was cancelled in the mean time
+		if self._waiting is not suspend:
+			return
+
+		self._waiting = None
+		instance().add(self)
+
+	def status(self):
+		progress = self._progress
+
+		if progress == None:
+			return '<i>%s</i>' % (self.message,)
+		elif isinstance(progress, float):
+			return '<i>%s %d%%</i>' % (self.message, int(min(max(progress, 0), 1) * 100))
+		else:
+			return str(progress)
+
+	def report(self):
+		if not self.entry:
+			return
+
+		status = self.status()
+
+		if status != self._reported:
+			self._reported = status
+			self.entry.info_status(status + ' <small>(Escape to cancel)</small>')
+
+	def finish(self):
+		self._running = False
+
+		if self._reported != None:
+			self.entry.info_status(None)
+			self._reported = None
+
+		self.resume()
+
+	def cancel(self):
+		# Stop the work, the command continues with cancelled set. Cancel can
+		# be called while the work runs a step, for instance from a nested
+		# main loop, so the work is closed by the next step instead
+		if self.token.cancelled:
+			return
+
+		self.token.cancel()
+		self._waiting = None
+
+		if self._stepping:
+			return
+
+		if self._running:
+			instance().add(self)
+		else:
+			self.work.close()
@@ -0,0 +1,71 @@
+import time
+
+# Keeps track of how long scanning, loading and importing of modules takes.
+# Timings nest, the time spent in nested timings is accounted for separately
+# so that each record knows its own cost as well as the total cost
+LIMIT = 1000
+
+class Record:
+	def __init__(self, kind, name, depth):
+		self.kind = kind
+		self.name = name
+		self.depth = depth
+
+		self.wall = 0
+		self.cpu = 0
+		self.self_wall = 0
+		self.self_cpu = 0
+
+		self.failed = False
+
+_records = []
+_stack = []
+_marks = {}
+
+def begin(kind, name):
+	rec = Record(kind, name, len(_stack))
+	_stack.append([rec, time.time(), time.clock(), 0, 0])
+
+def end(failed=False):
+	rec, wall, cpu, child_wall, child_cpu = _stack.pop()
+
+	rec.wall = time.time() - wall
+	rec.cpu = time.clock() - cpu
+	rec.self_wall = rec.wall - child_wall
+	rec.self_cpu = rec.cpu - child_cpu
+	rec.failed = failed
+
+	if _stack:
+		_stack[-1][3] += rec.wall
+		_stack[-1][4] += rec.cpu
+
+	_records.append(rec)
+
+	if len(_records) > LIMIT:
+		del _records[0]
+
+def call(kind, name, func, *args):
+	begin(kind, name)
+
+	try:
+		ret = func(*args)
+	except:
+		end(True)
+		raise
+
+	end()
+	return ret
+
+def mark(name):
+	# Only the first occurrence of a mark is kept
+	if not name in _marks:
+		_marks[name] = (time.time(), time.clock())
+
+def marks():
+	return dict(_marks)
+
+def records():
+	return list(_records)
+
+def clear():
+	del _records[:]
@@ -0,0 +1,212 @@
+import os
+import time
+import thread
+import glib
+
+import commander.config as config
+
+try:
+	import json
+except ImportError:
+	json = None
+
+# Records a timeline of what commander does, in the trace event format of
+# chrome://tracing (which Perfetto can load as well). Tracing is off unless
+# started; each traced call then becomes a complete ('X') event. Events are
+# written to a file in batches, and the file is rotated when it gets large:
+#
+#   start = tracing.now()
+#   ...
+#   tracing.complete('name', 'category', start, {'key': 'value'})
+
+# Rotate the file when it is larger than this many bytes...
+SIZE = 16 * 1024 * 1024
+
+# ...and keep this many old files
+KEEP = 4
+
+# Write recorded events at most this many milliseconds later
+DELAY = 1000
+
+_writer = None
+
+def now():
+	return time.time()
+
+class Writer:
+	def __init__(self, dirname, size=SIZE, keep=KEEP):
+		self.dirname = dirname
+		self.filename = os.path.join(dirname, 'commander.json')
+		self.size = size
+		self.keep = keep
+
+		self._events = []
+		self._file = None
+		self._first = True
+		self._timeout = 0
+
+		if not os.path.isdir(dirname):
+			os.makedirs(dirname)
+
+		# Each session starts in a new file
+		self._rotate()
+
+	def _name(self, i):
+		if i == 0:
+			return self.filename
+
+		base, ext = os.path.splitext(self.filename)
+		return '%s.%d%s' % (base, i, ext)
+
+	def _rotate(self):
+		self._close()
+
+		# The oldest file is replaced by the one before it
+		for i in xrange(self.keep - 1, -1, -1):
+			if os.path.exists(self._name(i)):
+				os.rename(self._name(i), self._name(i + 1))
+
+		self._file = file(self.filename, 'w')
+		self._file.write('[\n')
+		self._first = True
+
+	def _close(self):
+		if not self._file:
+			return
+
+		# The closing bracket is optional for the viewers, so files which
+		# are not closed properly can still be loaded
+		self._file.write('\n]\n')
+		self._file.close()
+		self._file = None
+
+	def add(self, event):
+		self._events.append(event)
+
+		if not self._timeout:
+			self._timeout = glib.timeout_add(DELAY, self.flush)
+
+	def flush(self):
+		if self._timeout:
+			glib.source_remove(self._timeout)
+			self._timeout = 0
+
+		if not self._events or not self._file:
+			return False
+
+		for event in self._events:
+			if not self._first:
+				self._file.write(',\n')
+
+			self._file.write(json.dumps(event))
+			self._first = False
+
+		self._events = []
+		self._file.flush()
+
+		if self._file.tell() > self.size:
+			self._rotate()
+
+		return False
+
+	def close(self):
+		self.flush()
+		self._close()
+
+def available():
+	return json != None
+
+def enabled():
+	return _writer != None
+
+def start(dirname=None):
+	global _writer
+
+	if dirname == None:
+		dirname = config.filename('traces')
+
+	if _writer == None:
+		_writer = Writer(dirname)
+
+	return _writer.filename
+
+def stop():
+	global _writer
+
+	if _writer != None:
+		_writer.close()
+		_writer = None
+
+def complete(name, cat, start, args=None):
+	# A call which started at start (from now()) and ends now
+	if _writer == None:
+		return
+
+	end = time.time()
+	event = {
+		'name': name,
+		'cat': cat,
+		'ph': 'X',
+		'ts': int(start * 1000000),
+		'dur': int((end - start) * 1000000),
+		'pid': os.getpid(),
+		'tid': thread.get_ident()
+	}
+
+	if args:
+		event['args'] = args
+
+	_writer.add(event)
+
+def instant(name, cat, args=None):
+	if _writer == None:
+		return
+
+	event = {
+		'name': name,
+		'cat': cat,
+		'ph': 'i',
+		's': 't',
+		'ts': int(time.time() * 1000000),
+		'pid': os.getpid(),
+		'tid': thread.get_ident()
+	}
+
+	if args:
+		event['args'] = args
+
+	_writer.add(event)
+
+def call(name, cat, func, *args):
+	if _writer == None:
+		return func(*args)
+
+	start = time.time()
+
+	try:
+		return func(*args)
+	finally:
+		complete(name, cat, start)
+
+def traced(cat, name=None):
+	# Decorator which traces each call of a function
+	def decorator(func):
+		label = name or func.__name__
+
+		def wrapper(*args, **kwargs):
+			if _writer == None:
+				return func(*args, **kwargs)
+
+			start = time.time()
+
+			try:
+				return func(*args, **kwargs)
+			finally:
+				complete(label, cat, start)
+
+		wrapper.__name__ = func.__name__
+		wrapper.__doc__ = func.__doc__
+
+		return wrapper
+
+	return decorator
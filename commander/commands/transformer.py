@@ -0,0 +1,34 @@
+import sys
+import types
+import cPickle
+
+# Runs transforms for processes, in a separate python interpreter which only
+# imports transforms. Requests are read from stdin as pickled tuples of
+# (transform class name, transform attributes, offset, text), and the
+# results are written to stdout as (offset, edits, error)
+
+import transforms
+
+def run(name, state, offset, text):
+	try:
+		func = types.InstanceType(getattr(transforms, name), state)
+		return offset, map(lambda x: (x[0] + offset, x[1], x[2]), func(text)), None
+	except Exception, e:
+		return offset, None, str(e)
+
+def main():
+	while True:
+		try:
+			request = cPickle.load(sys.stdin)
+		except EOFError:
+			break
+
+		# Stop quietly when gedit is gone
+		try:
+			cPickle.dump(run(*request), sys.stdout, cPickle.HIGHEST_PROTOCOL)
+			sys.stdout.flush()
+		except IOError:
+			break
+
+if __name__ == '__main__':
+	main()
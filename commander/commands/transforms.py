@@ -0,0 +1,113 @@
+import re
+
+# Transforms of text which can be run in other processes (see processes).
+# A transform is called with a (unicode) text, and returns the list of edits
+# to make to it, as (offset, length, replacement) in characters. Transforms
+# are sent to the processes as their class name and attributes, so they are
+# plain classes in this module with picklable attributes, and this module
+# only imports the standard library. Transforms which work line by line set
+# chunked, so that a large text can be split at line ends and transformed in
+# parts
+
+_re_group = re.compile('(\\\\)?\\$([0-9]+|{(([0-9]+):([^}]+))})')
+
+_cases = {
+	'u': lambda x: "%s%s" % (x[0].upper(), x[1:]),
+	'U': lambda x: x.upper(),
+	'l': lambda x: "%s%s" % (x[0].lower(), x[1:]),
+	'L': lambda x: x.lower(),
+	't': lambda x: x.title()
+}
+
+def _unicode(s):
+	if isinstance(s, str):
+		return s.decode('utf-8')
+	else:
+		return s
+
+def case(text, trans):
+	# Apply a comma separated list of case transforms: u, U, l, L and t
+	if not trans or not text:
+		return text
+
+	for i in trans.split(','):
+		if i in _cases:
+			text = _cases[i](text)
+
+	return text
+
+class Replacement:
+	# A replacement string, in which $1 or ${1:U} are replaced by the group
+	# of the match (with a case transform)
+	def __init__(self, replacestr):
+		self.replacestr = replacestr
+
+	def _group(self, match, group):
+		if group.group(3):
+			num = int(group.group(4))
+		else:
+			num = int(group.group(2))
+
+		if group.group(1):
+			return group.group(2)
+		elif num < len(match.groups()) + 1:
+			return case(match.group(num), group.group(5))
+		else:
+			return group.group(0)
+
+	def expand(self, match):
+		return _re_group.sub(lambda x: self._group(match, x), self.replacestr)
+
+class RegexReplace:
+	# Replace all matches of a regular expression in the given regions of
+	# the text, (start, end) offsets which do not overlap
+	chunked = False
+
+	def __init__(self, pattern, flags, replacestr, regions):
+		self.pattern = pattern
+		self.flags = flags
+		self.replacestr = replacestr
+		self.regions = regions
+
+	def __call__(self, text):
+		findre = re.compile(_unicode(self.pattern), self.flags)
+		replacement = Replacement(_unicode(self.replacestr))
+		ret = []
+
+		for start, end in self.regions:
+			for match in findre.finditer(text, start, end):
+				# Like find, empty matches are skipped
+				if match.start(0) == match.end(0):
+					continue
+
+				try:
+					repl = replacement.expand(match)
+				except Exception, e:
+					raise ValueError('Invalid replacement: ' + str(e))
+
+				ret.append((match.start(0), match.end(0) - match.start(0), repl))
+
+		ret.sort()
+		return ret
+
+class Case:
+	# Change the case of the text with one of the string methods upper,
+	# lower or title. Only lines which change are replaced
+	chunked = True
+
+	def __init__(self, how):
+		self.how = how
+
+	def __call__(self, text):
+		ret = []
+		offset = 0
+
+		for line in text.splitlines(True):
+			changed = getattr(line, self.how)()
+
+			if changed != line:
+				ret.append((offset, len(line), changed))
+
+			offset += len(line)
+
+		return ret
@@ -0,0 +1,99 @@
+import bisect
+
+class Node:
+	def __init__(self):
+		self.children = {}
+		self.keys = []
+		self.items = []
+
+	def empty(self):
+		return not self.items and not self.keys
+
+	def collect(self, ret):
+		ret.extend(self.items)
+
+		for key in self.keys:
+			self.children[key].collect(ret)
+
+# Index of commands on the '-' separated parts of their names. Looking up
+# ['r', 'a', 'i'] finds all commands of which the first part starts with 'r',
+# the second with 'a' and the third with 'i', such as replace-all-i
+class Trie:
+	def __init__(self, items=[]):
+		self._root = Node()
+		self._size = 0
+
+		for item in items:
+			self.add(item)
+
+	def __len__(self):
+		return self._size
+
+	def add(self, item):
+		node = self._root
+
+		for part in item.name.split('-'):
+			if not part in node.children:
+				node.children[part] = Node()
+				bisect.insort(node.keys, part)
+
+			node = node.children[part]
+
+		node.items.append(item)
+		self._size += 1
+
+	def remove(self, item):
+		path = []
+		node = self._root
+
+		for part in item.name.split('-'):
+			if not part in node.children:
+				return False
+
+			path.append((node, part))
+			node = node.children[part]
+
+		for i in xrange(len(node.items)):
+			if node.items[i] is item:
+				del node.items[i]
+				break
+		else:
+			return False
+
+		self._size -= 1
+
+		# Prune nodes which became empty
+		for parent, part in reversed(path):
+			if not parent.children[part].empty():
+				break
+
+			del parent.children[part]
+			del parent.keys[bisect.bisect_left(parent.keys, part)]
+
+		return True
+
+	def find(self, subs):
+		nodes = [self._root]
+
+		for sub in subs:
+			found = []
+
+			for node in nodes:
+				idx = bisect.bisect_left(node.keys, sub)
+
+				while idx < len(node.keys) and node.keys[idx].startswith(sub):
+					found.append(node.children[node.keys[idx]])
+					idx += 1
+
+			if not found:
+				return []
+
+			nodes = found
+
+		ret = []
+
+		for node in nodes:
+			node.collect(ret)
+
+		ret.sort()
+		return ret
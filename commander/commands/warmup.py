@@ -0,0 +1,84 @@
+import time
+import glib
+
+import commander.commands as commands
+import commander.commands.completion
+
+class Warmup:
+	def __init__(self, usage, budget=0.01):
+		self._usage = usage
+		self._budget = budget
+		self._queue = None
+
+		self._idle = glib.idle_add(self.on_idle, priority=glib.PRIORITY_LOW)
+
+	def stop(self):
+		if self._idle:
+			glib.source_remove(self._idle)
+			self._idle = 0
+
+	def _module(self, word):
+		# Only look at the first part, expanding further would import the
+		# module right away
+		first = word.split('.')[0]
+		ret = commander.commands.completion.command([first], 0)
+
+		if not ret:
+			return None
+
+		# An abbreviation matching several modules can not be told apart
+		# without importing them, skip it unless one matches exactly
+		exact = filter(lambda x: x.name == first, ret[0])
+
+		if exact:
+			cmd = exact[0]
+		elif len(ret[0]) == 1:
+			cmd = ret[0][0]
+		else:
+			return None
+
+		while cmd.parent:
+			cmd = cmd.parent
+
+		return cmd
+
+	def _order(self):
+		# Count how often the modules were used according to the first word
+		# of the lines in the history. Modules are compared by name, so key
+		# on their identity instead
+		mods = {}
+		counts = {}
+
+		for word in self._usage:
+			mod = self._module(word)
+
+			if mod:
+				mods[id(mod)] = mod
+				counts[id(mod)] = counts.get(id(mod), 0) + self._usage[word]
+
+		ret = counts.keys()
+		ret.sort(lambda a, b: cmp(counts[b], counts[a]))
+
+		return map(lambda x: mods[x], ret)
+
+	def on_idle(self):
+		start = time.time()
+
+		if self._queue == None:
+			# First slice scans the modules
+			commands.Commands().ensure()
+			self._queue = self._order()
+
+		while self._queue and time.time() - start < self._budget:
+			mod = self._queue.pop(0)
+
+			try:
+				mod.ensure()
+			except Exception, e:
+				print 'Failed to load module:', e
+
+		if not self._queue:
+			self._idle = 0
+			return False
+
+		return True
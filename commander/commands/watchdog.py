@@ -0,0 +1,212 @@
+import os
+import sys
+import time
+import thread
+import threading
+import traceback
+import glib
+
+# Notices when the main loop is blocked, and finds out by what. A heartbeat
+# on the main loop tells a thread that the main loop is alive. When the
+# heartbeat is late, the thread samples the python stack of the main thread
+# until the main loop is back, and reports the stall with the commander code
+# found on the sampled stacks, and the command or completion which was
+# running.
+#
+# The thread only gets to sample when the main thread runs python code (or
+# releases the interpreter lock), a stall in a single long C call is only
+# reported once it is over. The duration of a stall is how late the
+# heartbeat ran, which leaves out the part of the interval the main loop
+# would have waited anyway.
+
+# Milliseconds between heartbeats
+INTERVAL = 100
+
+# The main loop is stalled when the heartbeat is this many seconds late
+THRESHOLD = 0.5
+
+# Seconds between samples of a stall
+SAMPLE = 0.05
+
+# Number of reports to keep
+LIMIT = 50
+
+# Number of distinct stacks to keep for each report
+STACKS = 10
+
+# What the main loop is running, for attribution. Only changed on the main
+# thread
+_running = []
+
+def push(name):
+	_running.append(name)
+
+def pop():
+	_running.pop()
+
+def running():
+	try:
+		return _running[-1]
+	except IndexError:
+		return None
+
+class Stall:
+	def __init__(self, start, running, roots):
+		self.start = start
+		self.duration = 0
+		self.running = running
+		self.roots = roots
+		self.samples = 0
+
+		self._stacks = {}
+
+	def sample(self, frame):
+		self.samples += 1
+
+		if frame == None:
+			return
+
+		stack = tuple(traceback.extract_stack(frame))
+
+		if not stack in self._stacks and len(self._stacks) >= STACKS:
+			return
+
+		self._stacks[stack] = self._stacks.get(stack, 0) + 1
+
+		if self.running == None:
+			self.running = running()
+
+	def stacks(self):
+		# The sampled stacks, the most common first
+		ret = self._stacks.items()
+		ret.sort(lambda a, b: cmp(b[1], a[1]))
+
+		return ret
+
+	def where(self):
+		# The innermost commander code on the most common stack, in which
+		# the main loop spent its time
+		for stack, count in self.stacks():
+			for filename, lineno, func, text in reversed(stack):
+				if _inside(filename, self.roots):
+					return '%s:%d %s' % (filename, lineno, func)
+
+		return None
+
+def _inside(filename, roots):
+	filename = os.path.abspath(filename)
+
+	for root in roots:
+		if filename.startswith(root + os.sep):
+			return True
+
+	return False
+
+class Watchdog:
+	def __init__(self, dirs=[], threshold=THRESHOLD):
+		self.threshold = threshold
+
+		# Code in these directories is commander code
+		self.roots = map(os.path.abspath, [os.path.dirname(os.path.dirname(os.path.abspath(__file__)))] + list(dirs))
+
+		self._reports = []
+		self._lock = threading.Lock()
+		self._main = thread.get_ident()
+		self._stop = threading.Event()
+
+		# When the last heartbeat ran, and how late it was. Set together, so
+		# the thread never sees the one without the other
+		self._beat = (time.time(), 0)
+
+		# The thread needs to run while the main loop waits
+		glib.threads_init()
+
+		self._timeout = glib.timeout_add(INTERVAL, self.on_beat)
+
+		self._thread = threading.Thread(target=self._watch, name='commander-watchdog')
+		self._thread.setDaemon(True)
+		self._thread.start()
+
+	def on_beat(self):
+		now = time.time()
+
+		# The heartbeat is due an interval after the last one
+		self._beat = (now, max(0, now - self._beat[0] - INTERVAL / 1000.0))
+		return True
+
+	def stop(self):
+		if self._timeout:
+			glib.source_remove(self._timeout)
+			self._timeout = 0
+
+		self._stop.set()
+		self._thread.join()
+
+	def _watch(self):
+		stall = None
+		threshold = self.threshold + INTERVAL / 1000.0
+
+		while not self._stop.isSet():
+			self._stop.wait(SAMPLE)
+
+			beat, late = self._beat
+
+			if time.time() - beat > threshold:
+				if stall == None:
+					# Stalled since the next heartbeat was due
+					stall = Stall(beat + INTERVAL / 1000.0, running(), self.roots)
+
+				stall.sample(sys._current_frames().get(self._main))
+			elif stall != None and beat > stall.start:
+				# The main loop is back
+				stall.duration = late
+				self._report(stall)
+
+				stall = None
+
+	def _report(self, stall):
+		self._lock.acquire()
+
+		try:
+			self._reports.append(stall)
+
+			if len(self._reports) > LIMIT:
+				del self._reports[0]
+		finally:
+			self._lock.release()
+
+	def reports(self):
+		self._lock.acquire()
+
+		try:
+			return list(self._reports)
+		finally:
+			self._lock.release()
+
+	def clear(self):
+		self._lock.acquire()
+
+		try:
+			del self._reports[:]
+		finally:
+			self._lock.release()
+
+_instance = None
+
+def start(dirs=[], threshold=THRESHOLD):
+	global _instance
+
+	if _instance == None:
+		_instance = Watchdog(dirs, threshold)
+
+	return _instance
+
+def stop():
+	global _instance
+
+	if _instance != None:
+		_instance.stop()
+		_instance = None
+
+def instance():
+	return _instance
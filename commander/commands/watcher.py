@@ -0,0 +1,100 @@
+import os
+import gio
+import glib
+
+class Watcher:
+	# Events which can change the contents of a module
+	EVENTS = (gio.FILE_MONITOR_EVENT_CHANGED,
+	          gio.FILE_MONITOR_EVENT_CHANGES_DONE_HINT,
+	          gio.FILE_MONITOR_EVENT_CREATED,
+	          gio.FILE_MONITOR_EVENT_DELETED)
+
+	def __init__(self, callback, delay=300):
+		self._callback = callback
+		self._delay = delay
+
+		self._monitors = {}
+		self._timeouts = {}
+
+	def add(self, d, recursive=False):
+		# Events in a non recursively watched directory are reported for the
+		# changed file itself. Events anywhere below a recursively watched
+		# directory are reported for that directory (i.e. the package)
+		if recursive:
+			self._add_tree(d, d)
+		else:
+			self._add_monitor(d, None)
+
+	def _add_tree(self, d, owner):
+		self._add_monitor(d, owner)
+
+		for dirpath, dirnames, filenames in os.walk(d):
+			for dirname in dirnames:
+				self._add_monitor(os.path.join(dirpath, dirname), owner)
+
+	def _add_monitor(self, d, owner):
+		if d in self._monitors:
+			return
+
+		gfile = gio.File(d)
+		monitor = None
+
+		try:
+			monitor = gfile.monitor_directory(gio.FILE_MONITOR_NONE, None)
+		except gio.Error, e:
+			# Could not create monitor, this happens on systems where file monitoring is
+			# not supported, but we don't really care
+			pass
+
+		if monitor:
+			monitor.connect('changed', self.on_monitor_changed, owner)
+			self._monitors[d] = monitor
+
+	def remove(self, d):
+		for path in self._monitors.keys():
+			if path == d or path.startswith(d + os.sep):
+				self._monitors[path].cancel()
+				del self._monitors[path]
+
+	def stop(self):
+		for path in self._monitors:
+			self._monitors[path].cancel()
+
+		for path in self._timeouts:
+			glib.source_remove(self._timeouts[path])
+
+		self._monitors = {}
+		self._timeouts = {}
+
+	def queue(self, path):
+		# Saving a file commonly emits a burst of events (e.g. DELETE/CREATE or
+		# several CHANGED), wait until things settle down before reporting
+		if path in self._timeouts:
+			glib.source_remove(self._timeouts[path])
+
+		self._timeouts[path] = glib.timeout_add(self._delay, self.on_timeout, path)
+
+	def on_timeout(self, path):
+		del self._timeouts[path]
+		self._callback(path)
+
+		return False
+
+	def on_monitor_changed(self, monitor, gfile1, gfile2, evnt, owner):
+		if not evnt in Watcher.EVENTS:
+			return
+
+		path = gfile1.get_path()
+
+		if owner == None:
+			self.queue(path)
+			return
+
+		if os.path.isdir(path):
+			if evnt == gio.FILE_MONITOR_EVENT_CREATED:
+				self._add_tree(path, owner)
+		elif not path.endswith('.py'):
+			# Ignore byte compiled files, editor backups, etc.
+			return
+
+		self.queue(owner)
@@ -0,0 +1,158 @@
+import threading
+import Queue
+import glib
+
+import result
+import exceptions
+
+# Blocking work, like reading files or walking directories, runs on a few
+# shared threads so that it does not block the main loop. A job is a Suspend
+# result which resumes the command on the main loop once it is done:
+#
+#   job = workers.submit(os.listdir, path)
+#   yield job
+#
+#   names = job.result()
+#
+# Like any Suspend, the yield evaluates to the entry input the command is
+# resumed with, not to the value of the job. Always use job.result(), which
+# also raises what the function raised (check job.cancelled first when the
+# job can be cancelled)
+
+# Number of threads
+THREADS = 4
+
+# Number of jobs that can wait for a thread
+QUEUED = 64
+
+class Job(result.Suspend):
+	def __init__(self, func, args, kwargs):
+		result.Suspend.__init__(self)
+
+		self.func = func
+		self.args = args
+		self.kwargs = kwargs
+
+		self.value = None
+		self.error = None
+		self.cancelled = False
+
+		self._done = False
+
+	def run(self):
+		# Called on a worker thread
+		if self.cancelled:
+			return
+
+		value = None
+		error = None
+
+		try:
+			value = self.func(*self.args, **self.kwargs)
+		except Exception, e:
+			error = e
+
+		glib.idle_add(self._finish, value, error)
+
+	def _finish(self, value, error):
+		if not self.cancelled:
+			self.value = value
+			self.error = error
+			self._done = True
+
+			self.resume()
+
+		return False
+
+	def done(self):
+		return self._done
+
+	def cancel(self):
+		# A job waiting for a thread is not run at all. A running function
+		# can not be interrupted, but its result is dropped and the command
+		# continues right away
+		if self._done or self.cancelled:
+			return
+
+		self.cancelled = True
+		self.resume()
+
+	def result(self):
+		# The value the function returned, raises what the function raised
+		if self.error != None:
+			raise self.error
+
+		return self.value
+
+class Pool:
+	def __init__(self, threads=THREADS, queued=QUEUED):
+		self.size = threads
+
+		self._queue = Queue.Queue(queued)
+		self._threads = []
+
+		# Python threads only run while the main loop waits when glib knows
+		# about them
+		glib.threads_init()
+
+	def submit(self, func, *args, **kwargs):
+		job = Job(func, args, kwargs)
+
+		try:
+			self._queue.put_nowait(job)
+		except Queue.Full:
+			raise exceptions.Execute('Too many jobs are waiting to be run')
+
+		# Threads are started when there is work for them
+		if len(self._threads) < self.size:
+			thread = threading.Thread(target=self._work, name='commander-worker')
+			thread.setDaemon(True)
+			thread.start()
+
+			self._threads.append(thread)
+
+		return job
+
+	def _work(self):
+		while True:
+			job = self._queue.get()
+
+			if job == None:
+				break
+
+			job.run()
+
+	def stop(self):
+		# Drop the jobs which are waiting, and let the threads finish
+		while True:
+			try:
+				job = self._queue.get_nowait()
+			except Queue.Empty:
+				break
+
+			job.cancelled = True
+
+		for thread in self._threads:
+			self._queue.put(None)
+
+		self._threads = []
+
+_instance = None
+
+def instance():
+	global _instance
+
+	if _instance == None:
+		_instance = Pool()
+
+	return _instance
+
+def submit(func, *args, **kwargs):
+	return instance().submit(func, *args, **kwargs)
+
+def stop():
+	global _instance
+
+	if _instance != None:
+		_instance.stop()
+		_instance = None
@@ -0,0 +1,56 @@
+import os
+import ConfigParser
+
+# Commander reads its config from, and saves its state (the manifest, the
+# history and traces) in this directory
+DIRECTORY = os.path.expanduser('~/.gnome2/gedit/commander')
+
+# Optional settings are read from the [commander] section of the config
+SECTION = 'commander'
+
+_directory = DIRECTORY
+_config = None
+
+def set_directory(directory):
+	# Use another directory, for instance when not running inside gedit.
+	# Only files which are opened afterwards are affected
+	global _directory, _config
+
+	_directory = directory
+	_config = None
+
+def filename(name):
+	return os.path.join(_directory, name)
+
+def _parser():
+	global _config
+
+	if _config == None:
+		_config = ConfigParser.RawConfigParser()
+		_config.read(filename('config'))
+
+	return _config
+
+def get_string(key, default=None):
+	try:
+		return _parser().get(SECTION, key)
+	except ConfigParser.Error:
+		return default
+
+def get_boolean(key, default=False):
+	try:
+		return _parser().getboolean(SECTION, key)
+	except (ConfigParser.Error, ValueError):
+		return default
+
+def get_int(key, default=0):
+	try:
+		return _parser().getint(SECTION, key)
+	except (ConfigParser.Error, ValueError):
+		return default
+
+def get_float(key, default=0.0):
+	try:
+		return _parser().getfloat(SECTION, key)
+	except (ConfigParser.Error, ValueError):
+		return default
@@ -3,16 +3,21 @@ import cairo
 import glib
 import os
 import drawing
-import re
 import inspect
+import time
 
 import commander.commands as commands
 import commands.completion
 import commands.module
 import commands.method
 import commands.exceptions
+import commands.metrics
+import commands.tasks
+import commands.tracing
+import commands.watchdog
 
 import commander.utils as utils
+import commander.config as config
 
 from history import History
 from info import Info
@@ -56,7 +61,7 @@ class Entry(gtk.EventBox):
 		self.connect_after('expose-event', self.on_expose)
 		self.connect_after('realize', self.on_realize)
 		
-		self._history = History(os.path.expanduser('~/.gnome2/gedit/commander/history'))
+		self._history = History(config.filename('history'))
 		self._prompt = None
 		
 		hbox.pack_start(self._prompt_label, False, False, 0)
@@ -73,6 +78,10 @@ class Entry(gtk.EventBox):
 		
 		self._history_prefix = None		
 		self._suspended = None
+		self._executing = False
+		self._resume_pending = False
+		self._stream = None
+		self._stream_idle = 0
 		self._handlers = [
 			[0, gtk.keysyms.Up, self.on_history_move, -1],
 			[0, gtk.keysyms.Down, self.on_history_move, 1],
@@ -82,7 +91,7 @@ class Entry(gtk.EventBox):
 			[0, gtk.keysyms.ISO_Left_Tab, self.on_complete, None]
 		]
 		
-		self._re_complete = re.compile('("((?:\\\\"|[^"])*)"?|\'((?:\\\\\'|[^\'])*)\'?|[^\s]+)')
+		self._re_complete = utils.re_words
 		self._command_state = commands.Commands.State()
 	
 	def view(self):
@@ -145,16 +154,28 @@ class Entry(gtk.EventBox):
 		return [bg.red / 65535.0 * 1.1, bg.green / 65535.0 * 1.1, bg.blue / 65535.0 * 0.9, 0.8]
 
 	def on_entry_focus_out(self, widget, evnt):
-		if self._entry.flags() & gtk.SENSITIVE:
+		if self._entry.flags() & gtk.SENSITIVE and not self._suspended:
 			self.destroy()
 	
 	def on_entry_key_press(self, widget, evnt):
 		state = evnt.state & gtk.accelerator_get_default_mod_mask()
 		text = self._entry.get_text()
+
+		if self._suspended and self._entry.flags() & gtk.SENSITIVE:
+			# A task is running, only allow it to be cancelled
+			if evnt.keyval == gtk.keysyms.Escape:
+				self._suspended.cancel()
+
+			return True
 		
 		if evnt.keyval == gtk.keysyms.Escape and self._info_window:
 			if self._suspended:
-				self._suspended.resume()
+				self._suspended.cancel()
+
+			if self._stream:
+				self._stream_stop()
+				self._command_state.clear()
+				self.prompt()
 
 			if self._info_window:
 				self._info_window.destroy()
@@ -248,7 +269,7 @@ class Entry(gtk.EventBox):
 	
 	def on_wait_cancel(self):
 		if self._suspended:
-			self._suspended.resume()
+			self._suspended.cancel()
 		
 		if self._cancel_button:
 			self._cancel_button.destroy()
@@ -260,7 +281,10 @@ class Entry(gtk.EventBox):
 	
 	def _show_wait_cancel(self):
 		self._cancel_button = self.info_add_action(gtk.STOCK_STOP, self.on_wait_cancel)
-		self.info_status('<i>Waiting to finish...</i>')
+
+		# Tasks show their own progress
+		if not isinstance(self._suspended, commands.tasks.Task):
+			self.info_status('<i>Waiting to finish...</i>')
 		
 		self._wait_timeout = 0
 		return False
@@ -280,12 +304,20 @@ class Entry(gtk.EventBox):
 			self.info_status(None)
 		
 		self._entry.set_sensitive(True)
+		self._continue_suspended()
+
+	def _continue_suspended(self):
 		self.command_history_done()
 
 		if self._entry.props.has_focus or (self._info_window and not self._info_window.empty()):
 			self._entry.grab_focus()
 
-		self.on_execute(None, 0)
+		if self._executing:
+			# Resumed from within a command, continue after it returns
+			# instead of nesting another execution
+			self._resume_pending = True
+		else:
+			self.on_execute(None, 0)
 
 	def ellipsize(self, s, size):
 		if len(s) <= size:
@@ -299,9 +331,72 @@ class Entry(gtk.EventBox):
 		gtk.EventBox.destroy(self)
 
 	def on_execute(self, dummy, modifier):
+		return self._drive(lambda: self._execute(modifier))
+
+	def _drive(self, func):
+		self._executing = True
+		start = commands.tracing.now()
+		text = self._entry.get_text()
+
+		try:
+			ret = func()
+
+			while self._resume_pending:
+				self._resume_pending = False
+				ret = self._execute(0)
+		finally:
+			self._executing = False
+			commands.tracing.complete('execute', 'entry', start, {'text': text})
+
+		return ret
+
+	def _stream_start(self, stream):
+		self._stream = stream
+		self._stream_idle = glib.idle_add(self._on_stream_idle)
+
+	def _stream_stop(self):
+		if not self._stream:
+			return
+
+		glib.source_remove(self._stream_idle)
+		self._stream_idle = 0
+
+		self._stream.cancel()
+		self._stream = None
+
+	def _on_stream_idle(self):
+		# Show the output of a stream in batches, for a bounded time in
+		# each idle call
+		start = time.time()
+
+		while time.time() - start < 0.02:
+			items = self._stream.take(50)
+
+			if items == None:
+				self._stream_idle = 0
+				self._stream = None
+
+				if self._command_state:
+					# Continue the command which yielded the stream, it gets
+					# None back instead of what is typed in the entry
+					self._drive(self._resume)
+
+				return False
+
+			self.info_show("\n".join(items), self._stream.use_markup)
+
+		return True
+
+	def _execute(self, modifier):
 		if self._info_window and not self._suspended:
 			self._info_window.destroy()
 
+		if self._stream:
+			# A new command replaces the one which yielded the stream
+			self._stream_stop()
+			self._command_state.clear()
+			self.prompt()
+
 		text = self._entry.get_text().strip()
 		words = list(self._re_complete.finditer(text))
 		wordsstr = []
@@ -315,11 +410,21 @@ class Entry(gtk.EventBox):
 			return
 		
 		self._suspended = None
+		return self._run(lambda: commands.Commands().execute(self._command_state, text, words, wordsstr, self, modifier))
+
+	def _resume(self):
+		self._suspended = None
+		return self._run(lambda: commands.Commands().resume(self._command_state), False)
 
+	def _run(self, func, typed=True):
+		# Run func, which executes or continues a command. Unless the command
+		# is continued without input, the entry text is done with
 		try:
-			ret = commands.Commands().execute(self._command_state, text, words, wordsstr, self, modifier)
+			ret = func()
 		except Exception, e:
-			self.command_history_done()
+			if typed:
+				self.command_history_done()
+
 			self._command_state.clear()
 			
 			self.prompt()
@@ -333,18 +438,33 @@ class Entry(gtk.EventBox):
 			return True
 
 		if ret == commands.result.Result.SUSPEND:
-			# Wait for it...
 			self._suspended = ret
+
+			if ret.resumed():
+				# Work which was done quickly may have resumed it before it
+				# was yielded, continue right away
+				self._continue_suspended()
+				return True
+
+			# Wait for it...
 			ret.register(self.on_suspend_resume)
 
 			self._wait_timeout = glib.timeout_add(500, self._show_wait_cancel)
-			self._entry.set_sensitive(False)
+
+			# Tasks run in idle time, keep the entry to cancel them
+			if not isinstance(ret, commands.tasks.Task):
+				self._entry.set_sensitive(False)
 		else:
-			self.command_history_done()
+			if typed:
+				self.command_history_done()
+
 			self.prompt('')
 			
 			if ret == commands.result.Result.PROMPT:
 				self.prompt(ret.prompt)
+			elif ret == commands.result.Result.STREAM:
+				self._stream_start(ret)
+				self._entry.grab_focus()
 			elif (ret == None or ret == commands.result.HIDE) and not self._prompt and (not self._info_window or self._info_window.empty()):
 				self._command_state.clear()
 				self._view.grab_focus()
@@ -354,6 +474,7 @@ class Entry(gtk.EventBox):
 
 		return True
 	
+	@commands.tracing.traced('entry', 'complete')
 	def on_complete(self, dummy, modifier):
 		# First split all the text in words
 		text = self._entry.get_text()
@@ -397,6 +518,14 @@ class Entry(gtk.EventBox):
 			wordsstr.append('')
 			words.append(None)
 			posidx = len(wordsstr) - 1
+
+		# Complete the command after the last | like a command on its own
+		first = commands.pipe.offset(words, posidx)
+
+		if first:
+			words = words[first:]
+			wordsstr = wordsstr[first:]
+			posidx -= first
 		
 		# First word completes a command, if not in any special 'mode'
 		# otherwise, relay completion to the command, or complete by advice
@@ -405,7 +534,11 @@ class Entry(gtk.EventBox):
 		
 		if not self._command_state and posidx == 0:
 			# Complete the first command
+			start = time.time()
 			ret = commands.completion.command(words=wordsstr, idx=posidx)
+
+			commands.metrics.completion(commands.completion.command, time.time() - start)
+			commands.tracing.complete('command', 'completion', start)
 		else:
 			complete = None
 
@@ -426,7 +559,7 @@ class Entry(gtk.EventBox):
 			args, varargs = cmd.args()
 			
 			# Remove system arguments
-			s = ['argstr', 'args', 'entry', 'view']
+			s = ['argstr', 'args', 'entry', 'view', 'input']
 			args = filter(lambda x: not x in s, args)
 			
 			if posidx - 1 < len(args):
@@ -455,7 +588,16 @@ class Entry(gtk.EventBox):
 						if not k in spec.args:
 							del kwargs[k]
 				
-				ret = func(**kwargs)
+				start = time.time()
+				commands.watchdog.push('completion ' + func.__name__)
+
+				try:
+					ret = func(**kwargs)
+				finally:
+					commands.watchdog.pop()
+
+				commands.metrics.completion(func, time.time() - start)
+				commands.tracing.complete(func.__name__, 'completion', start)
 			except Exception, e:
 				# Can be number of arguments, or return values or simply buggy
 				# modules
@@ -523,6 +665,8 @@ class Entry(gtk.EventBox):
 	
 	def on_destroy(self, widget):
 		self._view.set_border_window_size(gtk.TEXT_WINDOW_BOTTOM, 0)
+		self._stream_stop()
+		self._command_state.clear()
 
 		if self._info_window:
 			self._info_window.destroy()
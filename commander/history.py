@@ -40,6 +40,18 @@ class History:
 
 		self._ptr = len(self._history) - 1
 	
+	def usage(self):
+		# Count how often each command was used, by the first word of a line
+		ret = {}
+
+		for line in self._history:
+			parts = line.split(None, 1)
+
+			if parts:
+				ret[parts[0]] = ret.get(parts[0], 0) + 1
+
+		return ret
+
 	def update(self, line):
 		self._history[self._ptr] = line
 	
@@ -0,0 +1,81 @@
+import os
+import sys
+import gedit
+
+from windowhelper import WindowHelper
+from history import History
+import commands
+import commands.warmup
+import commands.timing
+import commands.tracing
+import commands.watchdog
+import config
+import server
+
+class Commander(gedit.Plugin):
+	def __init__(self):
+		gedit.Plugin.__init__(self)
+		commands.timing.mark('activate')
+		
+		self._instances = {}
+		self._path = os.path.dirname(__file__)
+		self._warmup = None
+		self._server = None
+		
+		if not self._path in sys.path:
+			sys.path.insert(0, self._path)
+
+		commands.Commands().set_dirs([
+			os.path.expanduser('~/.gnome2/gedit/commander/modules'),
+			os.path.join(self.get_data_dir(), 'modules')
+		])
+		
+	def activate(self, window):
+		self._instances[window] = WindowHelper(self, window)
+
+		if len(self._instances) == 1 and config.get_boolean('warmup', False):
+			# Load the most used modules when idle, so the first command
+			# does not need to wait for them
+			history = History(config.filename('history'))
+			self._warmup = commands.warmup.Warmup(history.usage())
+
+		if len(self._instances) == 1 and config.get_boolean('server', False) and server.available():
+			# Let other processes execute commands over a unix socket
+			try:
+				self._server = server.Server(config.get_string('socket'))
+			except Exception, e:
+				print 'Failed to start command server:', e
+
+		if len(self._instances) == 1 and config.get_boolean('trace', False) and commands.tracing.available():
+			# Record a timeline for chrome://tracing
+			try:
+				commands.tracing.start()
+			except Exception, e:
+				print 'Failed to start tracing:', e
+
+		if len(self._instances) == 1 and config.get_boolean('watchdog', False):
+			# Report when commands block the main loop
+			commands.watchdog.start(commands.Commands().get_dirs(), config.get_float('watchdog-threshold', commands.watchdog.THRESHOLD))
+
+	def deactivate(self, window):
+		self._instances[window].deactivate()
+		del self._instances[window]
+		
+		if len(self._instances) == 0:
+			if self._warmup:
+				self._warmup.stop()
+				self._warmup = None
+
+			if self._server:
+				self._server.stop()
+				self._server = None
+
+			commands.Commands().stop()
+			commands.tracing.stop()
+			commands.watchdog.stop()
+			
+			if self._path in sys.path:
+				sys.path.remove(self._path)
+
+	def update_ui(self, window):
+		self._instances[window].update_ui()
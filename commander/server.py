@@ -0,0 +1,392 @@
+import os
+import stat
+import errno
+import socket
+import tempfile
+import glib
+import gedit
+
+try:
+	import json
+except ImportError:
+	json = None
+
+import commands
+import commands.result
+import commands.completion
+import commands.scripted
+
+# Serves commands to other processes on a unix domain socket. Requests are
+# JSON objects, one on each line:
+#
+#   {"command": "find.replace-all", "args": ["foo", "bar"], "uri": "file:///..."}
+#
+# Optional members are "argstr", "answers" (to prompts), and "id", which is
+# copied to the response. Requests are executed one at a time on the main
+# loop, each is answered by a line with the value the command finished
+# with and the info it showed, or with an error
+
+def default_path():
+	runtime = os.environ.get('XDG_RUNTIME_DIR')
+
+	if not runtime or not os.path.isdir(runtime):
+		runtime = tempfile.gettempdir()
+
+	return os.path.join(runtime, 'gedit-commander-%d' % (os.getuid(),))
+
+def _value(ret):
+	if isinstance(ret, commands.result.Result):
+		names = {
+			commands.result.Result.HIDE: 'hide',
+			commands.result.Result.DONE: 'done',
+			commands.result.Result.PROMPT: 'prompt',
+			commands.result.Result.SUSPEND: 'suspend',
+			commands.result.Result.STREAM: 'stream'
+		}
+
+		return names.get(int(ret))
+	elif ret == None or isinstance(ret, (bool, int, long, float, basestring)):
+		return ret
+	else:
+		return str(ret)
+
+def _string(s):
+	if isinstance(s, unicode):
+		return s.encode('utf-8')
+	else:
+		return str(s)
+
+def _message(e):
+	# Exceptions can carry unicode messages
+	try:
+		return str(e)
+	except UnicodeError:
+		return unicode(e).encode('utf-8')
+
+def _text(value):
+	# JSON strings are unicode, bytes which are not utf-8 are replaced
+	if isinstance(value, str):
+		return value.decode('utf-8', 'replace')
+	elif isinstance(value, list):
+		return map(_text, value)
+	elif isinstance(value, dict):
+		return dict(map(lambda x: (x[0], _text(x[1])), value.items()))
+	else:
+		return value
+
+def available():
+	return json != None and hasattr(socket, 'AF_UNIX')
+
+def _find_view(uri):
+	app = gedit.app_get_default()
+
+	if not uri:
+		window = app.get_active_window()
+		return window and window.get_active_view()
+
+	for window in app.get_windows():
+		tab = window.get_tab_from_uri(uri)
+
+		if tab:
+			return tab.get_view()
+
+	return None
+
+class Connection:
+	def __init__(self, server, sock):
+		self._server = server
+		self._sock = sock
+		self._in = ''
+		self._out = ''
+		self._out_watch = 0
+
+		self._sock.setblocking(False)
+		self._watch = glib.io_add_watch(sock, glib.IO_IN | glib.IO_ERR | glib.IO_HUP, self.on_read)
+
+	def close(self):
+		if self._watch:
+			glib.source_remove(self._watch)
+			self._watch = 0
+
+		if self._out_watch:
+			glib.source_remove(self._out_watch)
+			self._out_watch = 0
+
+		self._sock.close()
+		self._server.closed(self)
+
+	def on_read(self, fd, condition):
+		if condition & glib.IO_IN:
+			try:
+				data = self._sock.recv(4096)
+			except socket.error, e:
+				if e.args[0] in (errno.EAGAIN, errno.EINTR):
+					return True
+
+				data = ''
+
+			if data:
+				self._in += data
+				lines = self._in.split("\n")
+				self._in = lines[-1]
+
+				for line in lines[:-1]:
+					if line.strip():
+						self._server.queue(self, line)
+
+				return True
+
+		# Finish sending the responses to queued requests before closing
+		self._watch = 0
+		self._server.hangup(self)
+
+		return False
+
+	def send(self, response):
+		try:
+			line = json.dumps(_text(response))
+		except (TypeError, ValueError), e:
+			line = json.dumps({'id': response.get('id'), 'error': 'Invalid response: ' + str(e)})
+
+		self._out += line + "\n"
+
+		if not self._out_watch:
+			self._out_watch = glib.io_add_watch(self._sock, glib.IO_OUT | glib.IO_ERR | glib.IO_HUP, self.on_write)
+
+	def on_write(self, fd, condition):
+		if condition & glib.IO_OUT:
+			try:
+				sent = self._sock.send(self._out)
+				self._out = self._out[sent:]
+			except socket.error, e:
+				if not e.args[0] in (errno.EAGAIN, errno.EINTR):
+					self._out = ''
+					self.close()
+					return False
+
+			if self._out:
+				return True
+
+			self._out_watch = 0
+			self._server.flushed(self)
+
+			return False
+
+		self._out_watch = 0
+		self._out = ''
+		self.close()
+
+		return False
+
+	def pending(self):
+		return self._out != ''
+
+	def reading(self):
+		return self._watch != 0
+
+def _stale(path):
+	# Whether nothing is listening on the socket at path anymore
+	sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+	try:
+		sock.connect(path)
+	except socket.error, e:
+		return e.errno in (errno.ECONNREFUSED, errno.ENOENT)
+	finally:
+		sock.close()
+
+	return False
+
+class Server:
+	def __init__(self, path=None):
+		if path == None:
+			path = default_path()
+
+		self.path = path
+
+		self._connections = []
+		self._queue = []
+		self._idle = 0
+		self._current = None
+
+		# Remove a socket left behind by a previous instance, but never take
+		# it from an instance which is still running
+		if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+			if not _stale(path):
+				raise socket.error(errno.EADDRINUSE, 'Commands are already served on ' + path)
+
+			os.unlink(path)
+
+		self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+		# Only the user can connect, from the moment the socket exists
+		umask = os.umask(0077)
+
+		try:
+			self._sock.bind(path)
+		finally:
+			os.umask(umask)
+
+		self._sock.listen(5)
+		self._sock.setblocking(False)
+
+		self._watch = glib.io_add_watch(self._sock, glib.IO_IN, self.on_accept)
+
+	def stop(self):
+		if self._watch:
+			glib.source_remove(self._watch)
+			self._watch = 0
+
+		if self._idle:
+			glib.source_remove(self._idle)
+			self._idle = 0
+
+		for conn in list(self._connections):
+			conn.close()
+
+		self._queue = []
+		self._sock.close()
+
+		if os.path.exists(self.path):
+			os.unlink(self.path)
+
+	def on_accept(self, fd, condition):
+		try:
+			sock, address = self._sock.accept()
+		except socket.error:
+			return True
+
+		self._connections.append(Connection(self, sock))
+		return True
+
+	def queue(self, conn, line):
+		self._queue.append((conn, line))
+
+		if not self._idle and not self._current:
+			self._idle = glib.idle_add(self.on_idle)
+
+	def hangup(self, conn):
+		# The client is done sending, close once everything is answered
+		if conn is self._current or conn.pending():
+			return
+
+		if not filter(lambda x: x[0] == conn, self._queue):
+			conn.close()
+
+	def flushed(self, conn):
+		if not conn.reading():
+			self.hangup(conn)
+
+	def closed(self, conn):
+		if conn in self._connections:
+			self._connections.remove(conn)
+
+		self._queue = filter(lambda x: x[0] != conn, self._queue)
+
+	def on_idle(self):
+		self._idle = 0
+
+		if not self._queue:
+			return False
+
+		conn, line = self._queue.pop(0)
+
+		# Suspended commands are continued when they are resumed, do not
+		# start on the next request or close the connection in the meantime
+		self._current = conn
+		self.execute(line, lambda response: self._answer(conn, response))
+
+		return False
+
+	def _answer(self, conn, response):
+		self._current = None
+
+		if conn in self._connections:
+			conn.send(response)
+
+		if self._queue and not self._idle:
+			self._idle = glib.idle_add(self.on_idle)
+
+	def execute(self, line, finish):
+		# Execute a request, finish is called with the response when the
+		# command is done. Every request is answered, also when something
+		# unexpected fails
+		response = {}
+
+		try:
+			request = self._parse(line, response)
+
+			if request == None:
+				finish(response)
+				return
+
+			view, command, args, argstr, answers = request
+			entry = commands.scripted.Entry(view)
+
+			try:
+				driver = commands.Commands().driver(entry, 0, command, args, argstr, answers)
+			except Exception, e:
+				response['error'] = _message(e)
+				finish(response)
+				return
+		except Exception, e:
+			response['error'] = 'Failed to execute request: ' + _message(e)
+			finish(response)
+			return
+
+		def finished(error):
+			if error != None:
+				response['error'] = _message(error)
+			else:
+				response['result'] = _value(driver.value)
+				response['info'] = entry.info
+				response['prompts'] = driver.answers.prompts
+
+			finish(response)
+
+		commands.scripted.run(driver, finished)
+
+	def _parse(self, line, response):
+		# The request as (view, command, args, argstr, answers), or None
+		# when it is not valid, with the error in response
+		try:
+			request = json.loads(line)
+		except ValueError, e:
+			response['error'] = 'Invalid request: ' + str(e)
+			return None
+
+		if not isinstance(request, dict):
+			response['error'] = 'Invalid request: expected an object'
+			return None
+
+		if 'id' in request:
+			response['id'] = request['id']
+
+		command = request.get('command')
+		args = request.get('args', [])
+		answers = request.get('answers')
+
+		if not isinstance(command, basestring) or not isinstance(args, list):
+			response['error'] = 'Invalid request: expected a command and a list of args'
+			return None
+
+		if answers != None and not isinstance(answers, list):
+			response['error'] = 'Invalid request: expected a list of answers'
+			return None
+
+		view = _find_view(request.get('uri'))
+
+		if not view:
+			response['error'] = 'Could not find document: ' + _string(request.get('uri'))
+			return None
+
+		args = map(_string, args)
+		argstr = request.get('argstr')
+
+		if argstr != None:
+			argstr = _string(argstr)
+
+		if answers != None:
+			answers = map(_string, answers)
+
+		return view, _string(command), args, argstr, answers
@@ -2,6 +2,10 @@ import os
 import types
 import inspect
 import sys
+import re
+
+# Words of a command line: quoted strings, or anything else up to a space
+re_words = re.compile('("((?:\\\\"|[^"])*)"?|\'((?:\\\\\'|[^\'])*)\'?|[^\s]+)')
 
 class Struct(dict):
 	def __getattr__(self, name):
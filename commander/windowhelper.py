@@ -14,6 +14,9 @@ class WindowHelper:
 		self._window.add_accel_group(self._accel)
 	
 	def deactivate(self):
+		if self._entry:
+			self._entry.destroy()
+
 		self._window.remove_accel_group(self._accel)
 		self._window = None
 		self._plugin = None
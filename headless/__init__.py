@@ -0,0 +1,139 @@
+"""Stand-ins for gedit, gtk, gio, glib, gtksourceview2, pango and cairo.
+
+Installing them makes commander, its entry and the modules run in a plain
+python process, without a display. This is meant for driving commands from
+scripts, for profiling and for benchmarks."""
+import sys
+import time
+
+import glib
+import gio
+import pango
+import cairo
+import gtk
+import gtksourceview2
+import gedit
+
+_modules = {
+	'glib': glib,
+	'gio': gio,
+	'pango': pango,
+	'cairo': cairo,
+	'gtk': gtk,
+	'gtk.gdk': gtk.gdk,
+	'gtk.keysyms': gtk.keysyms,
+	'gtksourceview2': gtksourceview2,
+	'gedit': gedit
+}
+
+def install():
+	for name in _modules:
+		sys.modules[name] = _modules[name]
+
+def installed():
+	return sys.modules.get('gedit') is gedit
+
+class Harness:
+	# Runs the commander plugin in a headless gedit window. Keys are sent to
+	# the commander entry just like gtk would, so commands are executed and
+	# completed by the entry itself
+	def __init__(self, text='', dirs=None):
+		install()
+
+		import commander.plugin
+		import commander.commands as commands
+
+		self.plugin = commander.plugin.Commander()
+
+		if dirs != None:
+			commands.Commands().set_dirs(dirs)
+
+		self.window = gedit.app_get_default().create_window()
+		self.window.create_tab(True)
+
+		self.view = self.window.get_active_view()
+		self.document = self.view.get_buffer()
+
+		if text:
+			self.document.begin_not_undoable_action()
+			self.document.set_text(text)
+			self.document.end_not_undoable_action()
+
+			self.document.place_cursor(self.document.get_start_iter())
+
+		self.plugin.activate(self.window)
+
+	def close(self):
+		if self.plugin:
+			self.plugin.deactivate(self.window)
+			self.plugin = None
+
+	def entry(self):
+		# Show the commander entry, like pressing <Super>c
+		for group in self.window._gtk_accel_groups:
+			group.activate(gtk.keysyms.C, gtk.gdk.SUPER_MASK, self.window)
+
+		return self.plugin._instances[self.window]._entry
+
+	def key(self, keyval, state=0):
+		entry = self.entry()
+		return entry._entry.emit('key-press-event', gtk.Event(keyval, state))
+
+	def execute(self, text, modifier=0):
+		entry = self.entry()
+		entry._entry.set_text(text)
+
+		return self.key(gtk.keysyms.Return, modifier)
+
+	def complete(self, text, position=-1):
+		entry = self.entry()
+
+		entry._entry.set_text(text)
+		entry._entry.set_position(position)
+
+		self.key(gtk.keysyms.Tab)
+		return entry._entry.get_text()
+
+	def cancel(self):
+		return self.key(gtk.keysyms.Escape)
+
+	def info(self):
+		helper = self.plugin._instances[self.window]
+
+		if not helper._entry or not helper._entry._info_window:
+			return None
+
+		buf = helper._entry._info_window._text.get_buffer()
+		return buf.get_text(*buf.get_bounds())
+
+	def prompt(self):
+		helper = self.plugin._instances[self.window]
+
+		if not helper._entry:
+			return None
+
+		return helper._entry._prompt
+
+	def text(self):
+		return self.document.get_text(*self.document.get_bounds())
+
+	def iterate(self, block=False):
+		return glib.main_context_default().iteration(block)
+
+	def flush(self):
+		# Dispatch everything that is pending, without blocking
+		while glib.main_context_default().pending():
+			self.iterate()
+
+	def wait(self, condition, timeout=10):
+		# Run the main loop until condition() holds
+		end = time.time() + timeout
+
+		while not condition():
+			if time.time() > end:
+				return False
+
+			if not self.iterate(False):
+				time.sleep(0.001)
+
+		return True
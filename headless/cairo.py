@@ -0,0 +1,27 @@
+# Stand-in for pycairo, drawing does nothing
+OPERATOR_CLEAR = 0
+OPERATOR_SOURCE = 1
+OPERATOR_OVER = 2
+
+FORMAT_ARGB32 = 0
+
+class Context:
+	def __init__(self, target=None):
+		self._target = target
+
+	def __getattr__(self, name):
+		if name.startswith('_'):
+			raise AttributeError(name)
+
+		return lambda *args, **kwargs: None
+
+class ImageSurface:
+	def __init__(self, fmt=FORMAT_ARGB32, width=0, height=0):
+		self._width = width
+		self._height = height
+
+	def get_width(self):
+		return self._width
+
+	def get_height(self):
+		return self._height
@@ -0,0 +1,383 @@
+import os
+import sys
+
+import gtk
+import gio
+import gtksourceview2 as gsv
+
+# Stand-in for the gedit python bindings
+SEARCH_DONT_SET_FLAGS = 1 << 0
+SEARCH_ENTIRE_WORD = 1 << 1
+SEARCH_CASE_SENSITIVE = 1 << 2
+
+class Encoding:
+	def get_charset(self):
+		return 'UTF-8'
+
+def encoding_get_current():
+	return Encoding()
+
+def encoding_get_utf8():
+	return Encoding()
+
+def get_language_manager():
+	return gsv.language_manager_get_default()
+
+class Document(gsv.Buffer):
+	def __init__(self):
+		gsv.Buffer.__init__(self)
+
+		self._uri = None
+		self._search_text = None
+		self._search_flags = 0
+
+		self._undo = []
+		self._redo = []
+		self._group = None
+		self._replaying = False
+
+	def get_uri(self):
+		return self._uri
+
+	def set_uri(self, uri):
+		self._uri = uri
+
+	def get_uri_for_display(self):
+		if self._uri:
+			return gio.File(self._uri).get_path()
+
+		return self.get_short_name_for_display()
+
+	def get_short_name_for_display(self):
+		if self._uri:
+			return gio.File(self._uri).get_basename()
+
+		return 'Unsaved Document 1'
+
+	def get_location(self):
+		if self._uri:
+			return gio.File(self._uri)
+
+		return None
+
+	def is_untitled(self):
+		return self._uri == None
+
+	def is_local(self):
+		return self._uri != None and self._uri.startswith('file://')
+
+	def load(self, uri, encoding=None, line_pos=0, create=False):
+		path = gio.File(uri).get_path()
+
+		try:
+			f = file(path, 'r')
+			text = f.read()
+			f.close()
+		except IOError:
+			if not create:
+				raise gio.Error('Could not open ' + uri)
+
+			text = ''
+
+		self._uri = gio.File(uri).get_uri()
+
+		self.begin_not_undoable_action()
+		self.set_text(text)
+		self.end_not_undoable_action()
+
+		self.place_cursor(self.get_iter_at_line(line_pos))
+		self.set_modified(False)
+
+	def save(self, flags=0):
+		f = file(gio.File(self._uri).get_path(), 'w')
+		f.write(self.get_text(*self.get_bounds()))
+		f.close()
+
+		self.set_modified(False)
+
+	# Search
+	def set_search_text(self, text, flags):
+		if not flags & SEARCH_DONT_SET_FLAGS:
+			self._search_flags = flags
+
+		self._search_text = text and gtk._decode(text)
+
+	def get_search_text(self):
+		if self._search_text == None:
+			return None, self._search_flags
+
+		return self._search_text.encode('utf-8'), self._search_flags
+
+	def _entire_word(self, start, end):
+		return (start == 0 or not gtk._is_word(self._text[start - 1])) and (end >= len(self._text) or not gtk._is_word(self._text[end]))
+
+	def search_forward(self, start, end, match_start, match_end):
+		if not self._search_text:
+			return False
+
+		text = self._text
+		needle = self._search_text
+
+		if not self._search_flags & SEARCH_CASE_SENSITIVE:
+			text = text.lower()
+			needle = needle.lower()
+
+		if end == None:
+			limit = len(text)
+		else:
+			limit = end._offset
+
+		offset = start._offset
+
+		while True:
+			idx = text.find(needle, offset, limit)
+
+			if idx == -1:
+				return False
+
+			if not self._search_flags & SEARCH_ENTIRE_WORD or self._entire_word(idx, idx + len(needle)):
+				break
+
+			offset = idx + 1
+
+		if match_start != None:
+			match_start._assign(gtk.TextIter(self, idx))
+
+		if match_end != None:
+			match_end._assign(gtk.TextIter(self, idx + len(needle)))
+
+		return True
+
+	# Undo, every user action is undone as a whole
+	def _record(self, op):
+		if self._replaying:
+			return
+
+		self._redo = []
+
+		if self._group != None:
+			self._group.append(op)
+		elif self._user_action:
+			self._group = [op]
+			self._undo.append(self._group)
+		else:
+			self._undo.append([op])
+
+	def do_insert_text(self, piter, text, length):
+		offset = piter._offset
+		gsv.Buffer.do_insert_text(self, piter, text, length)
+
+		self._record(('insert', offset, gtk._decode(text)))
+
+	def do_delete_range(self, start, end):
+		text = self._text[start._offset:end._offset]
+		offset = start._offset
+
+		gsv.Buffer.do_delete_range(self, start, end)
+		self._record(('delete', offset, text))
+
+	def do_end_user_action(self):
+		self._group = None
+
+	def begin_not_undoable_action(self):
+		self._replaying = True
+
+	def end_not_undoable_action(self):
+		self._replaying = False
+		self._undo = []
+		self._redo = []
+
+	def _replay(self, ops, reverse):
+		self._replaying = True
+
+		if reverse:
+			ops = list(ops)
+			ops.reverse()
+
+		try:
+			for kind, offset, text in ops:
+				if (kind == 'insert') != reverse:
+					self.insert(self.get_iter_at_offset(offset), text)
+				else:
+					self.delete(self.get_iter_at_offset(offset), self.get_iter_at_offset(offset + len(text)))
+		finally:
+			self._replaying = False
+
+	def can_undo(self):
+		return len(self._undo) != 0
+
+	def can_redo(self):
+		return len(self._redo) != 0
+
+	def undo(self):
+		if self._undo:
+			ops = self._undo.pop()
+			self._replay(ops, True)
+			self._redo.append(ops)
+
+	def redo(self):
+		if self._redo:
+			ops = self._redo.pop()
+			self._replay(ops, False)
+			self._undo.append(ops)
+
+class View(gsv.View):
+	def __init__(self, doc=None):
+		if doc == None:
+			doc = Document()
+
+		gsv.View.__init__(self, doc)
+
+class Tab(gtk.VBox):
+	def __init__(self, doc=None):
+		gtk.VBox.__init__(self)
+
+		self._view = View(doc)
+		self.add(self._view)
+
+	def get_view(self):
+		return self._view
+
+	def get_document(self):
+		return self._view.get_buffer()
+
+class MessageBus:
+	def __init__(self):
+		self._messages = {}
+
+	def register(self, domain, name, *args, **kwargs):
+		self._messages[(domain, name)] = []
+
+	def unregister(self, domain, name):
+		if (domain, name) in self._messages:
+			del self._messages[(domain, name)]
+
+	def is_registered(self, domain, name):
+		return (domain, name) in self._messages
+
+	def connect(self, domain, name, callback, *args):
+		if not self.is_registered(domain, name):
+			self.register(domain, name)
+
+		self._messages[(domain, name)].append([callback, args])
+
+	def send(self, domain, name, **kwargs):
+		for callback, args in self._messages.get((domain, name), []):
+			callback(self, kwargs, *args)
+
+	send_sync = send
+
+class Window(gtk.Window):
+	def __init__(self):
+		gtk.Window.__init__(self)
+
+		self._tabs = []
+		self._active = None
+		self._bus = MessageBus()
+
+	def get_message_bus(self):
+		return self._bus
+
+	def create_tab(self, jump_to=True):
+		tab = Tab()
+		self.add(tab)
+		self._tabs.append(tab)
+
+		if jump_to or not self._active:
+			self._active = tab
+
+		return tab
+
+	def create_tab_from_uri(self, uri, encoding=None, line_pos=0, create=False, jump_to=True):
+		tab = self.create_tab(jump_to)
+		tab.get_document().load(uri, encoding, line_pos, create)
+
+		return tab
+
+	def close_tab(self, tab):
+		if tab in self._tabs:
+			self._tabs.remove(tab)
+			tab.destroy()
+
+		if self._active is tab:
+			self._active = self._tabs and self._tabs[-1] or None
+
+	def get_active_tab(self):
+		return self._active
+
+	def set_active_tab(self, tab):
+		self._active = tab
+
+	def get_active_view(self):
+		return self._active and self._active.get_view()
+
+	def get_active_document(self):
+		return self._active and self._active.get_document()
+
+	def get_tab_from_uri(self, uri):
+		for tab in self._tabs:
+			if tab.get_document().get_uri() == uri:
+				return tab
+
+		return None
+
+	def get_documents(self):
+		return map(lambda x: x.get_document(), self._tabs)
+
+	def get_views(self):
+		return map(lambda x: x.get_view(), self._tabs)
+
+class App:
+	def __init__(self):
+		self._windows = []
+
+	def create_window(self, screen=None):
+		window = Window()
+		self._windows.append(window)
+
+		return window
+
+	def get_windows(self):
+		return list(self._windows)
+
+	def get_active_window(self):
+		if not self._windows:
+			return self.create_window()
+
+		return self._windows[-1]
+
+_app = None
+
+def app_get_default():
+	global _app
+
+	if _app == None:
+		_app = App()
+
+	return _app
+
+class _Commands:
+	def load_uri(self, window, uri, encoding=None, line_pos=0, create=False):
+		tab = window.get_tab_from_uri(gio.File(uri).get_uri())
+
+		if tab:
+			window.set_active_tab(tab)
+		else:
+			window.create_tab_from_uri(uri, encoding, line_pos, create, True)
+
+	def load_uris(self, window, uris, encoding=None, line_pos=0):
+		for uri in uris:
+			self.load_uri(window, uri, encoding, line_pos)
+
+commands = _Commands()
+
+class Plugin(object):
+	def __init__(self):
+		pass
+
+	def get_data_dir(self):
+		# Plugins keep their data next to the plugin itself
+		return os.path.dirname(os.path.dirname(os.path.abspath(sys.modules[self.__module__].__file__)))
+
+	def get_install_dir(self):
+		return self.get_data_dir()
@@ -0,0 +1,117 @@
+import os
+import shutil
+import urllib
+import urlparse
+
+import glib
+
+# Stand-in for gio, only local files are supported. File monitors are
+# created but never report anything
+FILE_MONITOR_NONE = 0
+FILE_MONITOR_WATCH_MOUNTS = 1
+
+FILE_MONITOR_EVENT_CHANGED = 0
+FILE_MONITOR_EVENT_CHANGES_DONE_HINT = 1
+FILE_MONITOR_EVENT_DELETED = 2
+FILE_MONITOR_EVENT_CREATED = 3
+FILE_MONITOR_EVENT_ATTRIBUTE_CHANGED = 4
+FILE_MONITOR_EVENT_PRE_UNMOUNT = 5
+FILE_MONITOR_EVENT_UNMOUNTED = 6
+
+FILE_COPY_NONE = 0
+FILE_COPY_OVERWRITE = 1
+
+class Error(glib.GError):
+	pass
+
+class FileMonitor:
+	def __init__(self, gfile):
+		self._file = gfile
+		self._cancelled = False
+
+	def connect(self, name, callback, *args):
+		return 0
+
+	def cancel(self):
+		self._cancelled = True
+		return True
+
+	def is_cancelled(self):
+		return self._cancelled
+
+class File:
+	def __init__(self, path=None, uri=None):
+		if path != None and '://' in path:
+			uri = path
+			path = None
+
+		if uri != None:
+			parsed = urlparse.urlparse(uri)
+
+			if parsed[0] != 'file':
+				raise Error('Only local files are supported: ' + uri)
+
+			path = urllib.unquote(parsed[2])
+
+		self._path = os.path.abspath(os.path.expanduser(path))
+
+	def get_path(self):
+		return self._path
+
+	def get_uri(self):
+		return 'file://' + urllib.quote(self._path)
+
+	def get_parse_name(self):
+		return self._path
+
+	def get_basename(self):
+		return os.path.basename(self._path)
+
+	def get_parent(self):
+		parent = os.path.dirname(self._path)
+
+		if parent == self._path:
+			return None
+
+		return File(parent)
+
+	def get_child(self, name):
+		return File(os.path.join(self._path, name))
+
+	def resolve_relative_path(self, path):
+		return File(os.path.join(self._path, path))
+
+	def query_exists(self, cancellable=None):
+		return os.path.exists(self._path)
+
+	def equal(self, other):
+		return self._path == other._path
+
+	def has_prefix(self, other):
+		return self._path.startswith(other._path + os.sep)
+
+	def move(self, destination, progress_callback=None, flags=FILE_COPY_NONE, cancellable=None):
+		if destination.query_exists() and not flags & FILE_COPY_OVERWRITE:
+			raise Error('Target file exists')
+
+		try:
+			shutil.move(self._path, destination._path)
+		except (IOError, OSError), e:
+			raise Error(str(e))
+
+		return True
+
+	def monitor_directory(self, flags=FILE_MONITOR_NONE, cancellable=None):
+		return FileMonitor(self)
+
+	def monitor_file(self, flags=FILE_MONITOR_NONE, cancellable=None):
+		return FileMonitor(self)
+
+	def __eq__(self, other):
+		return isinstance(other, File) and self._path == other._path
+
+	def __ne__(self, other):
+		return not self.__eq__(other)
+
+	def __hash__(self):
+		return hash(self._path)
@@ -0,0 +1,268 @@
+import os
+import time
+import select
+import threading
+
+# Stand-in for the glib main loop. Sources are dispatched in order of
+# priority from MainContext.iteration, just like the real thing, only
+# without any file descriptors other than those being watched. Like glib,
+# sources can be added from other threads, which wakes up the main loop
+PRIORITY_HIGH = -100
+PRIORITY_DEFAULT = 0
+PRIORITY_HIGH_IDLE = 100
+PRIORITY_DEFAULT_IDLE = 200
+PRIORITY_LOW = 300
+
+IO_IN = 1
+IO_OUT = 4
+IO_PRI = 2
+IO_ERR = 8
+IO_HUP = 16
+IO_NVAL = 32
+
+class GError(Exception):
+	pass
+
+_depth = 0
+
+class Source:
+	def __init__(self, callback, args, priority):
+		self.callback = callback
+		self.args = args
+		self.priority = priority
+
+		self.due = None
+		self.interval = None
+		self.fd = None
+		self.condition = 0
+		self.dispatching = False
+
+	def dispatch(self, condition=None):
+		# Like glib, a source is not dispatched again from a nested main
+		# loop iteration while it is being dispatched
+		global _depth
+
+		self.dispatching = True
+		_depth += 1
+
+		try:
+			if self.fd != None:
+				return self.callback(self.fd, condition, *self.args)
+			else:
+				return self.callback(*self.args)
+		finally:
+			self.dispatching = False
+			_depth -= 1
+
+class MainContext:
+	def __init__(self):
+		self._sources = {}
+		self._next = 1
+		self._lock = threading.Lock()
+		self._wakeup = os.pipe()
+		self._thread = threading.currentThread()
+
+	def add(self, source):
+		self._lock.acquire()
+
+		try:
+			ident = self._next
+			self._next += 1
+
+			self._sources[ident] = source
+		finally:
+			self._lock.release()
+
+		if threading.currentThread() != self._thread:
+			os.write(self._wakeup[1], 'x')
+
+		return ident
+
+	def remove(self, ident):
+		self._lock.acquire()
+
+		try:
+			if ident in self._sources:
+				del self._sources[ident]
+				return True
+
+			return False
+		finally:
+			self._lock.release()
+
+	def _woken(self, timeout):
+		# Wait for a source to be added from another thread
+		r, w, x = select.select([self._wakeup[0]], [], [], timeout)
+
+		if r:
+			os.read(self._wakeup[0], 4096)
+			return True
+
+		return False
+
+	def _fileno(self, fd):
+		if hasattr(fd, 'fileno'):
+			return fd.fileno()
+		else:
+			return fd
+
+	def _poll(self, timeout):
+		sources = dict(self._sources)
+		watches = filter(lambda x: sources[x].fd != None and not sources[x].dispatching, sources.keys())
+
+		if not watches:
+			if timeout:
+				self._woken(timeout)
+
+			return {}
+
+		rd = [self._wakeup[0]]
+		wr = []
+
+		for ident in watches:
+			source = sources[ident]
+
+			if source.condition & (IO_IN | IO_PRI | IO_HUP | IO_ERR):
+				rd.append(self._fileno(source.fd))
+
+			if source.condition & IO_OUT:
+				wr.append(self._fileno(source.fd))
+
+		try:
+			r, w, x = select.select(rd, wr, [], timeout)
+		except (select.error, ValueError):
+			r, w = [], []
+
+		if self._wakeup[0] in r:
+			os.read(self._wakeup[0], 4096)
+
+		ret = {}
+
+		for ident in watches:
+			source = sources[ident]
+			fd = self._fileno(source.fd)
+			condition = 0
+
+			if fd in r:
+				condition |= source.condition & (IO_IN | IO_PRI)
+
+			if fd in w:
+				condition |= IO_OUT
+
+			if condition:
+				ret[ident] = condition
+
+		return ret
+
+	def _ready(self, may_block):
+		now = time.time()
+		ready = {}
+		timeout = None
+		sources = dict(self._sources)
+
+		for ident in sources:
+			source = sources[ident]
+
+			if source.fd != None or source.dispatching:
+				continue
+
+			if source.due == None or source.due <= now:
+				ready[ident] = None
+			elif timeout == None or source.due - now < timeout:
+				timeout = source.due - now
+
+		if ready or not may_block:
+			timeout = 0
+
+		ready.update(self._poll(timeout))
+		return ready
+
+	def pending(self):
+		return len(self._ready(False)) != 0
+
+	def iteration(self, may_block=True):
+		if not self._sources:
+			# Nothing to wait for, unless another thread is about to add a
+			# source
+			if not may_block or not self._woken(0.01):
+				return False
+
+		ready = self._ready(may_block)
+
+		if not ready and may_block:
+			# Waited for the first timeout to expire
+			ready = self._ready(False)
+
+		if not ready:
+			return False
+
+		# Dispatch all the ready sources with the highest priority
+		priority = min(map(lambda x: self._sources[x].priority, ready.keys()))
+		idents = filter(lambda x: self._sources[x].priority == priority, ready.keys())
+		idents.sort()
+
+		for ident in idents:
+			if not ident in self._sources:
+				continue
+
+			source = self._sources[ident]
+
+			if not source.dispatch(ready[ident]):
+				self.remove(ident)
+			elif source.interval != None:
+				source.due = time.time() + source.interval
+
+		return True
+
+_context = MainContext()
+
+def main_depth():
+	return _depth
+
+def main_context_default():
+	return _context
+
+class MainLoop:
+	def __init__(self, context=None, is_running=False):
+		self._context = context or _context
+		self._running = is_running
+
+	def run(self):
+		self._running = True
+
+		while self._running and self._context.iteration(True):
+			pass
+
+		self._running = False
+
+	def quit(self):
+		self._running = False
+
+	def is_running(self):
+		return self._running
+
+def idle_add(callback, *args, **kwargs):
+	return _context.add(Source(callback, args, kwargs.get('priority', PRIORITY_DEFAULT_IDLE)))
+
+def timeout_add(interval, callback, *args, **kwargs):
+	source = Source(callback, args, kwargs.get('priority', PRIORITY_DEFAULT))
+	source.interval = interval / 1000.0
+	source.due = time.time() + source.interval
+
+	return _context.add(source)
+
+def timeout_add_seconds(interval, callback, *args, **kwargs):
+	return timeout_add(interval * 1000, callback, *args, **kwargs)
+
+def io_add_watch(fd, condition, callback, *args, **kwargs):
+	source = Source(callback, args, kwargs.get('priority', PRIORITY_DEFAULT))
+	source.fd = fd
+	source.condition = condition
+
+	return _context.add(source)
+
+def threads_init():
+	pass
+
+def source_remove(ident):
+	return _context.remove(ident)
@@ -0,0 +1,1255 @@
+import glib
+import pango
+
+# Stand-in for the part of pygtk used by commander and its modules. The text
+# buffer is a real implementation, widgets only keep the state commander
+# looks at and ignore anything that only affects how they look
+STATE_NORMAL = 0
+STATE_ACTIVE = 1
+STATE_PRELIGHT = 2
+STATE_SELECTED = 3
+STATE_INSENSITIVE = 4
+
+SENSITIVE = 1 << 11
+
+TEXT_WINDOW_PRIVATE = 0
+TEXT_WINDOW_WIDGET = 1
+TEXT_WINDOW_TEXT = 2
+TEXT_WINDOW_LEFT = 3
+TEXT_WINDOW_RIGHT = 4
+TEXT_WINDOW_TOP = 5
+TEXT_WINDOW_BOTTOM = 6
+
+TEXT_SEARCH_VISIBLE_ONLY = 1
+TEXT_SEARCH_TEXT_ONLY = 2
+
+POLICY_ALWAYS = 0
+POLICY_AUTOMATIC = 1
+POLICY_NEVER = 2
+
+WRAP_NONE = 0
+WRAP_CHAR = 1
+WRAP_WORD = 2
+WRAP_WORD_CHAR = 3
+
+WINDOW_TOPLEVEL = 0
+WINDOW_POPUP = 1
+
+MOVEMENT_LOGICAL_POSITIONS = 0
+MOVEMENT_VISUAL_POSITIONS = 1
+MOVEMENT_WORDS = 2
+MOVEMENT_DISPLAY_LINES = 3
+MOVEMENT_DISPLAY_LINE_ENDS = 4
+MOVEMENT_PARAGRAPHS = 5
+MOVEMENT_PARAGRAPH_ENDS = 6
+MOVEMENT_PAGES = 7
+MOVEMENT_BUFFER_ENDS = 8
+
+ICON_SIZE_MENU = 1
+STOCK_STOP = 'gtk-stop'
+
+class _Namespace:
+	def __init__(self, **kwargs):
+		self.__dict__.update(kwargs)
+
+keysyms = _Namespace(
+	BackSpace=0xff08,
+	Tab=0xff09,
+	Return=0xff0d,
+	Escape=0xff1b,
+	Home=0xff50,
+	Left=0xff51,
+	Up=0xff52,
+	Right=0xff53,
+	Down=0xff54,
+	End=0xff57,
+	KP_Enter=0xff8d,
+	ISO_Left_Tab=0xfe20,
+	C=0x43,
+	c=0x63
+)
+
+class Rectangle:
+	def __init__(self, x=0, y=0, width=0, height=0):
+		self.x = x
+		self.y = y
+		self.width = width
+		self.height = height
+
+class _Color:
+	def __init__(self, red=0, green=0, blue=0):
+		self.red = red
+		self.green = green
+		self.blue = blue
+
+class _Region:
+	def intersect(self, other):
+		pass
+
+class _Cursor:
+	def __init__(self, *args):
+		pass
+
+class _GdkWindow:
+	def __init__(self, width=800, height=600):
+		self._width = width
+		self._height = height
+
+	def get_parent(self):
+		return self
+
+	def get_size(self):
+		return self._width, self._height
+
+	def get_position(self):
+		return 0, 0
+
+	def get_origin(self):
+		return 0, 0
+
+	def get_geometry(self):
+		return 0, 0, self._width, self._height, 24
+
+	def set_back_pixmap(self, pixmap, parent_relative):
+		pass
+
+	def set_cursor(self, cursor):
+		pass
+
+	def cairo_create(self):
+		import cairo
+		return cairo.Context(None)
+
+gdk = _Namespace(
+	SHIFT_MASK=1 << 0,
+	LOCK_MASK=1 << 1,
+	CONTROL_MASK=1 << 2,
+	MOD1_MASK=1 << 3,
+	SUPER_MASK=1 << 26,
+	HYPER_MASK=1 << 27,
+	META_MASK=1 << 28,
+	ALL_EVENTS_MASK=0x3ffffe,
+	HAND2=60,
+	Color=_Color,
+	Cursor=_Cursor,
+	Rectangle=Rectangle,
+	region_rectangle=lambda rect: _Region()
+)
+
+def accelerator_get_default_mod_mask():
+	return gdk.SHIFT_MASK | gdk.CONTROL_MASK | gdk.MOD1_MASK | gdk.SUPER_MASK | gdk.HYPER_MASK | gdk.META_MASK
+
+def rc_parse_string(s):
+	pass
+
+def events_pending():
+	return glib.main_context_default().pending()
+
+def main_iteration(block=True):
+	glib.main_context_default().iteration(block)
+	return False
+
+def main_iteration_do(block=True):
+	return main_iteration(block)
+
+class Event:
+	def __init__(self, keyval=0, state=0, window=None):
+		self.keyval = keyval
+		self.state = state
+		self.window = window
+		self.area = Rectangle()
+
+class _Object:
+	# Minimal signal support: handlers connected with connect run before
+	# the default handler (do_<signal>), those connected with connect_after
+	# run after it. A handler returning True stops event signals
+	def _gtk_handlers(self):
+		if not '_gtk_signals' in self.__dict__:
+			self._gtk_signals = []
+			self._gtk_next_handler = 1
+
+		return self._gtk_signals
+
+	def _gtk_connect(self, name, callback, args, after):
+		handlers = self._gtk_handlers()
+		ident = self._gtk_next_handler
+		self._gtk_next_handler += 1
+
+		handlers.append([ident, name, callback, args, after])
+		return ident
+
+	def connect(self, name, callback, *args):
+		return self._gtk_connect(name, callback, args, False)
+
+	def connect_after(self, name, callback, *args):
+		return self._gtk_connect(name, callback, args, True)
+
+	def disconnect(self, ident):
+		handlers = self._gtk_handlers()
+
+		for i in xrange(len(handlers)):
+			if handlers[i][0] == ident:
+				del handlers[i]
+				break
+
+	handler_disconnect = disconnect
+
+	def _run_gtk_handlers(self, name, args, after):
+		for handler in list(self._gtk_handlers()):
+			if handler[1] == name and handler[4] == after and handler in self._gtk_handlers():
+				if handler[2](self, *(args + handler[3])) and name.endswith('-event'):
+					return True
+
+		return False
+
+	def emit(self, name, *args):
+		if self._run_gtk_handlers(name, args, False):
+			return True
+
+		default = getattr(self, 'do_' + name.replace('-', '_'), None)
+		ret = None
+
+		if default:
+			ret = default(*args)
+
+		if self._run_gtk_handlers(name, args, True):
+			return True
+
+		return ret
+
+	def set_data(self, key, value):
+		if not '_gtk_data' in self.__dict__:
+			self._gtk_data = {}
+
+		self._gtk_data[key] = value
+
+	def get_data(self, key):
+		return self.__dict__.get('_gtk_data', {}).get(key)
+
+	def set_property(self, name, value):
+		setattr(self.props, name.replace('-', '_'), value)
+
+	def get_property(self, name):
+		return getattr(self.props, name.replace('-', '_'), None)
+
+class _Props:
+	pass
+
+class TextMark(_Object):
+	def __init__(self, name=None, left_gravity=False):
+		self._name = name
+		self._left_gravity = left_gravity
+		self._buffer = None
+		self._offset = 0
+		self._visible = True
+		self.props = _Props()
+
+	def get_name(self):
+		return self._name
+
+	def get_buffer(self):
+		return self._buffer
+
+	def get_left_gravity(self):
+		return self._left_gravity
+
+	def get_deleted(self):
+		return self._buffer == None
+
+	def get_visible(self):
+		return self._visible
+
+	def set_visible(self, visible):
+		self._visible = visible
+
+class TextTag(_Object):
+	def __init__(self, name=None):
+		self.props = _Props()
+		self.props.name = name
+
+class TextTagTable(_Object):
+	def __init__(self):
+		self._tags = {}
+
+	def add(self, tag):
+		if tag.props.name:
+			self._tags[tag.props.name] = tag
+
+	def remove(self, tag):
+		if tag.props.name in self._tags:
+			del self._tags[tag.props.name]
+
+	def lookup(self, name):
+		return self._tags.get(name)
+
+	def get_size(self):
+		return len(self._tags)
+
+def _is_word(c):
+	return c.isalnum() or c == '_'
+
+class TextIter:
+	def __init__(self, buf, offset):
+		self._buffer = buf
+		self._offset = offset
+
+	def _text(self):
+		return self._buffer._text
+
+	def _set(self, offset):
+		length = len(self._buffer._text)
+		self._offset = max(0, min(offset, length))
+
+	def _assign(self, other):
+		self._buffer = other._buffer
+		self._offset = other._offset
+
+	def copy(self):
+		return TextIter(self._buffer, self._offset)
+
+	def get_buffer(self):
+		return self._buffer
+
+	def get_offset(self):
+		return self._offset
+
+	def set_offset(self, offset):
+		self._set(offset)
+
+	def get_char(self):
+		text = self._text()
+
+		if self._offset >= len(text):
+			return ''
+
+		return text[self._offset].encode('utf-8')
+
+	def get_text(self, end):
+		return self._buffer.get_text(self, end)
+
+	def get_slice(self, end):
+		return self._buffer.get_slice(self, end)
+
+	def get_visible_text(self, end):
+		return self.get_text(end)
+
+	def get_line(self):
+		return self._text().count(u'\n', 0, self._offset)
+
+	def set_line(self, line):
+		self._assign(self._buffer.get_iter_at_line(line))
+
+	def _line_start(self):
+		return self._text().rfind(u'\n', 0, self._offset) + 1
+
+	def _line_end(self):
+		text = self._text()
+		idx = text.find(u'\n', self._offset)
+
+		if idx == -1:
+			return len(text)
+
+		return idx
+
+	def get_line_offset(self):
+		return self._offset - self._line_start()
+
+	def set_line_offset(self, offset):
+		start = self._line_start()
+		self._set(min(start + offset, self._line_end()))
+
+	def get_chars_in_line(self):
+		end = self._line_end()
+
+		if end < len(self._text()):
+			end += 1
+
+		return end - self._line_start()
+
+	def is_start(self):
+		return self._offset == 0
+
+	def is_end(self):
+		return self._offset >= len(self._text())
+
+	def starts_line(self):
+		return self._offset == self._line_start()
+
+	def ends_line(self):
+		return self._offset == self._line_end()
+
+	def starts_word(self):
+		text = self._text()
+
+		return not self.is_end() and _is_word(text[self._offset]) and (self._offset == 0 or not _is_word(text[self._offset - 1]))
+
+	def ends_word(self):
+		text = self._text()
+
+		return self._offset > 0 and _is_word(text[self._offset - 1]) and (self.is_end() or not _is_word(text[self._offset]))
+
+	def inside_word(self):
+		text = self._text()
+
+		return not self.is_end() and _is_word(text[self._offset])
+
+	def forward_char(self):
+		return self.forward_chars(1)
+
+	def backward_char(self):
+		return self.backward_chars(1)
+
+	def forward_chars(self, count):
+		if count < 0:
+			return self.backward_chars(-count)
+
+		old = self._offset
+		self._set(self._offset + count)
+
+		return self._offset != old and not self.is_end()
+
+	def backward_chars(self, count):
+		if count < 0:
+			return self.forward_chars(-count)
+
+		old = self._offset
+		self._set(self._offset - count)
+
+		return self._offset != old
+
+	def forward_line(self):
+		end = self._line_end()
+
+		if end >= len(self._text()):
+			self._set(end)
+			return False
+
+		self._set(end + 1)
+		return True
+
+	def backward_line(self):
+		start = self._line_start()
+
+		if start == 0:
+			moved = self._offset != 0
+			self._set(0)
+
+			return moved
+
+		self._set(start - 1)
+		self._set(self._line_start())
+
+		return True
+
+	def forward_lines(self, count):
+		ret = True
+
+		for i in xrange(abs(count)):
+			if count > 0:
+				ret = self.forward_line()
+			else:
+				ret = self.backward_line()
+
+		return ret
+
+	def backward_lines(self, count):
+		return self.forward_lines(-count)
+
+	def forward_to_line_end(self):
+		if self.ends_line():
+			if not self.forward_line():
+				return False
+
+		self._set(self._line_end())
+		return not self.is_end()
+
+	def forward_to_end(self):
+		self._set(len(self._text()))
+
+	def forward_word_end(self):
+		text = self._text()
+		offset = self._offset
+
+		while offset < len(text) and not _is_word(text[offset]):
+			offset += 1
+
+		while offset < len(text) and _is_word(text[offset]):
+			offset += 1
+
+		moved = offset != self._offset
+		self._set(offset)
+
+		return moved and not self.is_end()
+
+	def backward_word_start(self):
+		text = self._text()
+		offset = self._offset
+
+		while offset > 0 and not _is_word(text[offset - 1]):
+			offset -= 1
+
+		while offset > 0 and _is_word(text[offset - 1]):
+			offset -= 1
+
+		moved = offset != self._offset
+		self._set(offset)
+
+		return moved
+
+	def forward_word_ends(self, count):
+		ret = True
+
+		for i in xrange(count):
+			ret = self.forward_word_end()
+
+		return ret
+
+	def backward_word_starts(self, count):
+		ret = True
+
+		for i in xrange(count):
+			ret = self.backward_word_start()
+
+		return ret
+
+	def forward_search(self, text, flags, limit=None):
+		return self._buffer._search(self, text, True, limit)
+
+	def backward_search(self, text, flags, limit=None):
+		return self._buffer._search(self, text, False, limit)
+
+	def equal(self, other):
+		return self._offset == other._offset
+
+	def compare(self, other):
+		return cmp(self._offset, other._offset)
+
+	def in_range(self, start, end):
+		return start._offset <= self._offset < end._offset
+
+	def order(self, other):
+		if self._offset > other._offset:
+			self._offset, other._offset = other._offset, self._offset
+
+	def __eq__(self, other):
+		return isinstance(other, TextIter) and self._buffer is other._buffer and self._offset == other._offset
+
+	def __ne__(self, other):
+		return not self.__eq__(other)
+
+def _decode(text):
+	if isinstance(text, unicode):
+		return text
+
+	return text.decode('utf-8')
+
+class TextBuffer(_Object):
+	def __init__(self, table=None):
+		self._text = u''
+		self._marks = {}
+		self._anonymous = []
+		self._table = table or TextTagTable()
+		self._user_action = 0
+		self._modified = False
+		self.props = _Props()
+
+		self._insert = self.create_mark('insert', self.get_start_iter(), True)
+		self._selection_bound = self.create_mark('selection_bound', self.get_start_iter(), True)
+
+	# Iterators
+	def get_start_iter(self):
+		return TextIter(self, 0)
+
+	def get_end_iter(self):
+		return TextIter(self, len(self._text))
+
+	def get_bounds(self):
+		return self.get_start_iter(), self.get_end_iter()
+
+	def get_iter_at_offset(self, offset):
+		piter = self.get_start_iter()
+		piter._set(offset)
+
+		return piter
+
+	def get_iter_at_line(self, line):
+		return self.get_iter_at_line_offset(line, 0)
+
+	def get_iter_at_line_offset(self, line, offset):
+		piter = self.get_start_iter()
+
+		if line > 0 and not piter.forward_lines(line):
+			piter.set_line_offset(0)
+
+		piter.set_line_offset(offset)
+		return piter
+
+	def get_iter_at_mark(self, mark):
+		return TextIter(self, mark._offset)
+
+	def get_char_count(self):
+		return len(self._text)
+
+	def get_line_count(self):
+		return self._text.count(u'\n') + 1
+
+	# Text
+	def get_text(self, start, end, include_hidden_chars=True):
+		a, b = sorted([start._offset, end._offset])
+		return self._text[a:b].encode('utf-8')
+
+	def get_slice(self, start, end, include_hidden_chars=True):
+		return self.get_text(start, end)
+
+	def set_text(self, text):
+		self.begin_user_action()
+		self.delete(self.get_start_iter(), self.get_end_iter())
+		self.insert(self.get_start_iter(), text)
+		self.end_user_action()
+
+	def insert(self, piter, text, length=-1):
+		text = _decode(text)
+
+		if length >= 0:
+			text = _decode(text.encode('utf-8')[:length])
+
+		if not text:
+			return
+
+		self.emit('insert-text', piter, text.encode('utf-8'), len(text.encode('utf-8')))
+
+	def do_insert_text(self, piter, text, length):
+		text = _decode(text)
+		offset = piter._offset
+
+		self._text = self._text[:offset] + text + self._text[offset:]
+
+		for mark in self._all_marks():
+			if mark._offset > offset or (mark._offset == offset and not mark._left_gravity):
+				mark._offset += len(text)
+
+		# The iter is revalidated to point to the end of the inserted text
+		piter._offset = offset + len(text)
+
+		self._modified = True
+		self.emit('changed')
+
+	def insert_at_cursor(self, text, length=-1):
+		self.insert(self.get_iter_at_mark(self._insert), text, length)
+
+	def insert_with_tags(self, piter, text, *tags):
+		self.insert(piter, text)
+
+	def insert_with_tags_by_name(self, piter, text, *tags):
+		self.insert(piter, text)
+
+	def delete(self, start, end):
+		start.order(end)
+
+		if start._offset == end._offset:
+			return
+
+		self.emit('delete-range', start, end)
+
+	def do_delete_range(self, start, end):
+		a, b = start._offset, end._offset
+		self._text = self._text[:a] + self._text[b:]
+
+		for mark in self._all_marks():
+			if mark._offset >= b:
+				mark._offset -= b - a
+			elif mark._offset > a:
+				mark._offset = a
+
+		# Both iters are revalidated to point to the location of the
+		# deleted text
+		end._offset = a
+
+		self._modified = True
+		self.emit('changed')
+
+	def delete_selection(self, interactive=True, default_editable=True):
+		bounds = self.get_selection_bounds()
+
+		if not bounds:
+			return False
+
+		self.delete(bounds[0], bounds[1])
+		return True
+
+	def _search(self, piter, text, forward, limit):
+		text = _decode(text)
+
+		if forward:
+			end = len(self._text)
+
+			if limit:
+				end = limit._offset
+
+			idx = self._text.find(text, piter._offset, end)
+		else:
+			start = 0
+
+			if limit:
+				start = limit._offset
+
+			idx = self._text.rfind(text, start, piter._offset)
+
+		if idx == -1:
+			return None
+
+		return TextIter(self, idx), TextIter(self, idx + len(text))
+
+	# Marks
+	def _all_marks(self):
+		return self._marks.values() + self._anonymous
+
+	def create_mark(self, name, where, left_gravity=False):
+		if name != None and name in self._marks:
+			raise RuntimeError('Mark ' + name + ' already exists in the buffer')
+
+		mark = TextMark(name, left_gravity)
+		mark._buffer = self
+		mark._offset = where._offset
+
+		if name != None:
+			self._marks[name] = mark
+		else:
+			self._anonymous.append(mark)
+
+		return mark
+
+	def add_mark(self, mark, where):
+		mark._buffer = self
+		mark._offset = where._offset
+
+		if mark._name != None:
+			self._marks[mark._name] = mark
+		else:
+			self._anonymous.append(mark)
+
+	def get_mark(self, name):
+		return self._marks.get(name)
+
+	def move_mark(self, mark, where):
+		mark._offset = where._offset
+		self.emit('mark-set', where.copy(), mark)
+
+	def move_mark_by_name(self, name, where):
+		self.move_mark(self._marks[name], where)
+
+	def delete_mark(self, mark):
+		if mark is self._insert or mark is self._selection_bound:
+			raise RuntimeError('Cannot delete the insert or selection bound marks')
+
+		if mark._name != None and self._marks.get(mark._name) is mark:
+			del self._marks[mark._name]
+		elif mark in self._anonymous:
+			self._anonymous.remove(mark)
+
+		mark._buffer = None
+
+	def delete_mark_by_name(self, name):
+		self.delete_mark(self._marks[name])
+
+	def get_insert(self):
+		return self._insert
+
+	def get_selection_bound(self):
+		return self._selection_bound
+
+	def place_cursor(self, where):
+		self.select_range(where, where)
+
+	def select_range(self, ins, bound):
+		self._insert._offset = ins._offset
+		self._selection_bound._offset = bound._offset
+
+		self.emit('mark-set', ins.copy(), self._insert)
+
+	def get_has_selection(self):
+		return self._insert._offset != self._selection_bound._offset
+
+	def get_selection_bounds(self):
+		if not self.get_has_selection():
+			return ()
+
+		a, b = sorted([self._insert._offset, self._selection_bound._offset])
+		return TextIter(self, a), TextIter(self, b)
+
+	# Tags
+	def get_tag_table(self):
+		return self._table
+
+	def create_tag(self, name=None, **kwargs):
+		tag = TextTag(name)
+
+		for k in kwargs:
+			tag.set_property(k, kwargs[k])
+
+		self._table.add(tag)
+		return tag
+
+	def apply_tag(self, tag, start, end):
+		pass
+
+	def apply_tag_by_name(self, name, start, end):
+		pass
+
+	def remove_tag(self, tag, start, end):
+		pass
+
+	def remove_all_tags(self, start, end):
+		pass
+
+	# State
+	def begin_user_action(self):
+		self._user_action += 1
+
+		if self._user_action == 1:
+			self.emit('begin-user-action')
+
+	def end_user_action(self):
+		if self._user_action == 0:
+			return
+
+		self._user_action -= 1
+
+		if self._user_action == 0:
+			self.emit('end-user-action')
+
+	def get_modified(self):
+		return self._modified
+
+	def set_modified(self, modified):
+		self._modified = modified
+		self.emit('modified-changed')
+
+class Widget(_Object):
+	_gtk_focus = None
+	_gtk_focusable = False
+
+	def __init__(self, *args, **kwargs):
+		self.props = _Props()
+		self.props.has_focus = False
+		self.props.can_focus = self._gtk_focusable
+		self.props.visible = False
+		self.props.sensitive = True
+
+		self.allocation = Rectangle(0, 0, 800, 600)
+		self.state = STATE_NORMAL
+		self.style = _Style()
+		self.window = None
+
+		self._gtk_parent = None
+		self._gtk_children = []
+		self._gtk_destroyed = False
+
+	def __getattr__(self, name):
+		# Anything which only changes the looks of a widget is ignored
+		for prefix in ('set_', 'modify_', 'unset_', 'queue_', 'add_events', 'grab_add', 'grab_remove'):
+			if name.startswith(prefix):
+				return lambda *args, **kwargs: None
+
+		raise AttributeError(name)
+
+	def show(self):
+		self.props.visible = True
+
+	def show_all(self):
+		self.show()
+
+		for child in self._gtk_children:
+			child.show_all()
+
+	def hide(self):
+		self.props.visible = False
+
+	def get_visible(self):
+		return self.props.visible
+
+	def realize(self):
+		if not self.window:
+			self.window = _GdkWindow(self.allocation.width, self.allocation.height)
+			self.emit('realize')
+
+	def destroy(self):
+		if self._gtk_destroyed:
+			return
+
+		self._gtk_destroyed = True
+		self.hide()
+
+		for child in list(self._gtk_children):
+			child.destroy()
+
+		if self._gtk_parent:
+			self._gtk_parent.remove(self)
+
+		if Widget._gtk_focus is self:
+			Widget._gtk_focus = None
+
+		self.emit('destroy')
+
+	def flags(self):
+		if self.props.sensitive:
+			return SENSITIVE
+
+		return 0
+
+	def set_sensitive(self, sensitive):
+		self.props.sensitive = sensitive
+
+	def get_sensitive(self):
+		return self.props.sensitive
+
+	def is_sensitive(self):
+		return self.props.sensitive
+
+	def grab_focus(self):
+		previous = Widget._gtk_focus
+
+		if previous is self or not self.props.can_focus:
+			return
+
+		Widget._gtk_focus = self
+		self.props.has_focus = True
+
+		if previous:
+			previous.props.has_focus = False
+			previous.emit('focus-out-event', Event())
+
+		self.emit('focus-in-event', Event())
+
+	def has_focus(self):
+		return self.props.has_focus
+
+	def is_focus(self):
+		return self.props.has_focus
+
+	def get_parent(self):
+		return self._gtk_parent
+
+	def get_toplevel(self):
+		widget = self
+
+		while widget._gtk_parent:
+			widget = widget._gtk_parent
+
+		return widget
+
+	def get_style(self):
+		return self.style
+
+	def get_screen(self):
+		return _Screen()
+
+	def get_window(self, *args):
+		self.realize()
+		return self.window
+
+	def get_size_request(self):
+		return -1, -1
+
+	def is_composited(self):
+		return False
+
+	def create_pango_layout(self, text):
+		return pango.Layout(text)
+
+	def render_icon(self, stock, size):
+		return None
+
+	# Containers
+	def add(self, child):
+		child._gtk_parent = self
+		self._gtk_children.append(child)
+
+	def remove(self, child):
+		if child in self._gtk_children:
+			self._gtk_children.remove(child)
+			child._gtk_parent = None
+
+	def pack_start(self, child, expand=True, fill=True, padding=0):
+		self.add(child)
+
+	def pack_end(self, child, expand=True, fill=True, padding=0):
+		self.add(child)
+
+	def get_children(self):
+		return list(self._gtk_children)
+
+	def get_child(self):
+		if self._gtk_children:
+			return self._gtk_children[0]
+
+		return None
+
+class _Style:
+	def __init__(self):
+		white = _Color(65535, 65535, 65535)
+		black = _Color(0, 0, 0)
+
+		self.font_desc = pango.FontDescription('Monospace 10')
+		self.text = [black] * 5
+		self.fg = [black] * 5
+		self.base = [white] * 5
+		self.bg = [white] * 5
+
+class _Screen:
+	def get_rgba_colormap(self):
+		return None
+
+	def get_width(self):
+		return 1024
+
+	def get_height(self):
+		return 768
+
+class Container(Widget):
+	pass
+
+class Bin(Container):
+	pass
+
+class EventBox(Bin):
+	pass
+
+class Box(Container):
+	pass
+
+class HBox(Box):
+	pass
+
+class VBox(Box):
+	pass
+
+class Label(Widget):
+	def __init__(self, text=''):
+		Widget.__init__(self)
+		self._text = text
+
+	def set_text(self, text):
+		self._text = text
+
+	def set_markup(self, text):
+		self._text = text
+
+	def get_text(self):
+		return pango.parse_markup(self._text)[1]
+
+	def get_label(self):
+		return self._text
+
+class Image(Widget):
+	pass
+
+def image_new_from_stock(stock, size):
+	return Image()
+
+class Entry(Widget):
+	_gtk_focusable = True
+
+	def __init__(self, *args):
+		Widget.__init__(self)
+
+		self._text = u''
+		self._position = 0
+
+	def get_text(self):
+		return self._text.encode('utf-8')
+
+	def set_text(self, text):
+		self._text = _decode(text)
+		self._position = len(self._text)
+		self.emit('changed')
+
+	def get_text_length(self):
+		return len(self._text)
+
+	def get_chars(self, start, end):
+		if end < 0:
+			end = len(self._text)
+
+		return self._text[start:end].encode('utf-8')
+
+	def get_position(self):
+		return self._position
+
+	def set_position(self, position):
+		if position < 0 or position > len(self._text):
+			position = len(self._text)
+
+		self._position = position
+
+	def insert_text(self, text, position=0):
+		text = _decode(text)
+
+		if position < 0 or position > len(self._text):
+			position = len(self._text)
+
+		self._text = self._text[:position] + text + self._text[position:]
+
+		if self._position >= position:
+			self._position += len(text)
+
+		self.emit('changed')
+		return position + len(text)
+
+	def delete_text(self, start, end):
+		if end < 0:
+			end = len(self._text)
+
+		self._text = self._text[:start] + self._text[end:]
+
+		if self._position > end:
+			self._position -= end - start
+		elif self._position > start:
+			self._position = start
+
+		self.emit('changed')
+
+class ScrolledWindow(Bin):
+	def __init__(self, *args):
+		Bin.__init__(self)
+		self._policy = (POLICY_AUTOMATIC, POLICY_AUTOMATIC)
+
+	def set_policy(self, hpolicy, vpolicy):
+		self._policy = (hpolicy, vpolicy)
+
+	def get_policy(self):
+		return self._policy
+
+class TextView(Container):
+	_gtk_focusable = True
+
+	def __init__(self, buf=None):
+		Container.__init__(self)
+
+		if buf == None:
+			buf = TextBuffer()
+
+		self._buffer = buf
+		self._gtk_editable = True
+		self._gtk_windows = {}
+
+	def get_buffer(self):
+		return self._buffer
+
+	def set_buffer(self, buf):
+		self._buffer = buf
+
+	def get_editable(self):
+		return self._gtk_editable
+
+	def set_editable(self, editable):
+		self._gtk_editable = editable
+
+	def get_window(self, which=TEXT_WINDOW_WIDGET):
+		if not which in self._gtk_windows:
+			self._gtk_windows[which] = _GdkWindow(self.allocation.width, self.allocation.height)
+
+		return self._gtk_windows[which]
+
+	def add_child_in_window(self, child, which, x, y):
+		self.add(child)
+
+	def get_visible_rect(self):
+		return Rectangle(0, 0, self.allocation.width, self.allocation.height)
+
+	def get_iter_location(self, piter):
+		return Rectangle(0, piter.get_line(), 0, 1)
+
+	def scroll_to_iter(self, *args):
+		return False
+
+	def scroll_to_mark(self, *args):
+		pass
+
+	def forward_display_line(self, piter):
+		return piter.forward_line()
+
+	def backward_display_line(self, piter):
+		return piter.backward_line()
+
+	def do_move_cursor(self, step, count, extend_selection):
+		buf = self._buffer
+		piter = buf.get_iter_at_mark(buf.get_insert())
+
+		if step in (MOVEMENT_LOGICAL_POSITIONS, MOVEMENT_VISUAL_POSITIONS):
+			piter.forward_chars(count)
+		elif step == MOVEMENT_WORDS:
+			if count > 0:
+				piter.forward_word_ends(count)
+			else:
+				piter.backward_word_starts(-count)
+		elif step in (MOVEMENT_DISPLAY_LINES, MOVEMENT_PARAGRAPHS):
+			offset = piter.get_line_offset()
+			piter.forward_lines(count)
+			piter.set_line_offset(offset)
+		elif step == MOVEMENT_BUFFER_ENDS:
+			if count > 0:
+				piter = buf.get_end_iter()
+			else:
+				piter = buf.get_start_iter()
+
+		if extend_selection:
+			buf.move_mark(buf.get_insert(), piter)
+		else:
+			buf.place_cursor(piter)
+
+class Window(Bin):
+	def __init__(self, kind=WINDOW_TOPLEVEL):
+		Bin.__init__(self)
+
+		self._gtk_accel_groups = []
+		self._gtk_size = (self.allocation.width, self.allocation.height)
+
+	def resize(self, width, height):
+		self._gtk_size = (width, height)
+
+	def get_size(self):
+		return self._gtk_size
+
+	def move(self, x, y):
+		pass
+
+	def get_position(self):
+		return 0, 0
+
+	def add_accel_group(self, group):
+		self._gtk_accel_groups.append(group)
+
+	def remove_accel_group(self, group):
+		if group in self._gtk_accel_groups:
+			self._gtk_accel_groups.remove(group)
+
+class AccelGroup(_Object):
+	def __init__(self):
+		self._accels = []
+
+	def connect_group(self, key, mods, flags, callback):
+		self._accels.append([key, mods, flags, callback])
+
+	def activate(self, key, mods, acceleratable=None):
+		for accel in self._accels:
+			if accel[0] == key and accel[1] == mods:
+				return accel[3](self, acceleratable, key, mods)
+
+		return False
+
+class ListStore(_Object):
+	def __init__(self, *types):
+		self._rows = []
+
+	def append(self, row=None):
+		self._rows.append(row)
+
+	def clear(self):
+		self._rows = []
+
+	def __len__(self):
+		return len(self._rows)
+
+	def __iter__(self):
+		return iter(self._rows)
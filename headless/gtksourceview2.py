@@ -0,0 +1,116 @@
+import fnmatch
+
+import gtk
+
+# Stand-in for gtksourceview2, with a fixed set of languages
+DRAW_SPACES_SPACE = 1 << 0
+DRAW_SPACES_TAB = 1 << 1
+DRAW_SPACES_NEWLINE = 1 << 2
+DRAW_SPACES_NBSP = 1 << 3
+DRAW_SPACES_LEADING = 1 << 4
+DRAW_SPACES_TEXT = 1 << 5
+DRAW_SPACES_TRAILING = 1 << 6
+DRAW_SPACES_ALL = 0x7f
+
+_languages = [
+	('c', 'C', ['*.c']),
+	('chdr', 'C/ObjC Header', ['*.h']),
+	('cpp', 'C++', ['*.cpp', '*.cxx', '*.cc', '*.hpp']),
+	('python', 'Python', ['*.py']),
+	('js', 'Javascript', ['*.js']),
+	('sh', 'sh', ['*.sh']),
+	('xml', 'XML', ['*.xml']),
+	('html', 'HTML', ['*.html', '*.htm'])
+]
+
+class Language:
+	def __init__(self, ident, name, globs):
+		self._id = ident
+		self._name = name
+		self._globs = globs
+
+	def get_id(self):
+		return self._id
+
+	def get_name(self):
+		return self._name
+
+	def get_globs(self):
+		return list(self._globs)
+
+class LanguageManager:
+	def __init__(self):
+		self._languages = {}
+
+		for ident, name, globs in _languages:
+			self._languages[ident] = Language(ident, name, globs)
+
+	def get_language_ids(self):
+		ret = self._languages.keys()
+		ret.sort()
+
+		return ret
+
+	def get_language(self, ident):
+		return self._languages.get(ident)
+
+	def guess_language(self, filename=None, content_type=None):
+		if not filename:
+			return None
+
+		for ident, name, globs in _languages:
+			for glob in globs:
+				if fnmatch.fnmatch(filename, glob):
+					return self._languages[ident]
+
+		return None
+
+_manager = None
+
+def language_manager_get_default():
+	global _manager
+
+	if _manager == None:
+		_manager = LanguageManager()
+
+	return _manager
+
+class Buffer(gtk.TextBuffer):
+	def __init__(self, table=None):
+		gtk.TextBuffer.__init__(self, table)
+		self._language = None
+
+	def get_language(self):
+		return self._language
+
+	def set_language(self, language):
+		self._language = language
+
+class View(gtk.TextView):
+	def __init__(self, buf=None):
+		if buf == None:
+			buf = Buffer()
+
+		gtk.TextView.__init__(self, buf)
+
+		self._tab_width = 8
+		self._insert_spaces = False
+		self._draw_spaces = 0
+
+	def get_tab_width(self):
+		return self._tab_width
+
+	def set_tab_width(self, width):
+		self._tab_width = width
+
+	def get_insert_spaces_instead_of_tabs(self):
+		return self._insert_spaces
+
+	def set_insert_spaces_instead_of_tabs(self, setting):
+		self._insert_spaces = setting
+
+	def get_draw_spaces(self):
+		return self._draw_spaces
+
+	def set_draw_spaces(self, flags):
+		self._draw_spaces = flags
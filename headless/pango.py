@@ -0,0 +1,68 @@
+import re
+from xml.sax import saxutils
+
+# Stand-in for pango, markup is parsed into plain text without attributes
+SCALE = 1024
+
+ATTR_INVALID = 0
+ATTR_LANGUAGE = 1
+ATTR_FAMILY = 2
+ATTR_STYLE = 3
+ATTR_WEIGHT = 4
+ATTR_VARIANT = 5
+ATTR_STRETCH = 6
+ATTR_SIZE = 7
+ATTR_FONT_DESC = 8
+ATTR_FOREGROUND = 9
+ATTR_BACKGROUND = 10
+ATTR_UNDERLINE = 11
+ATTR_STRIKETHROUGH = 12
+ATTR_RISE = 13
+ATTR_SHAPE = 14
+ATTR_SCALE = 15
+
+_re_tag = re.compile('<[^>]*>')
+
+class FontDescription:
+	def __init__(self, desc=''):
+		self._desc = desc
+
+	def to_string(self):
+		return self._desc
+
+class AttrIterator:
+	def __init__(self, length):
+		self._length = length
+
+	def range(self):
+		return 0, self._length
+
+	def get_attrs(self):
+		return []
+
+	def next(self):
+		return False
+
+class AttrList:
+	def __init__(self, length=0):
+		self._length = length
+
+	def get_iterator(self):
+		return AttrIterator(self._length)
+
+class Layout:
+	def __init__(self, text=''):
+		self._text = text
+
+	def get_pixel_extents(self):
+		lines = self._text.split('\n')
+		rect = (0, 0, max(map(len, lines)) * 8, len(lines) * 16)
+
+		return rect, rect
+
+	def get_pixel_size(self):
+		return self.get_pixel_extents()[1][2:]
+
+def parse_markup(markup, accel_marker=u'\0'):
+	text = saxutils.unescape(_re_tag.sub('', markup), {'&quot;': '"', '&apos;': "'"})
+	return AttrList(len(text)), text, u'\0'
@@ -0,0 +1,157 @@
+import time
+from xml.sax import saxutils
+
+import commander.commands as commands
+import commander.commands.completion
+import commander.commands.exceptions
+import commander.commands.macro
+import commander.commands.result
+import commander.commands.scripted
+import commander.commands.tasks
+
+__commander_module__ = True
+__root__ = ['each']
+
+class Edits:
+	# Counts the edits made to a buffer: insertions, deletions and
+	# replacements, which are a deletion followed by an insertion at the
+	# same place
+	def __init__(self, buf):
+		self.buf = buf
+		self.count = 0
+
+		self._deleted = None
+		self._handlers = [
+			buf.connect('insert-text', self.on_insert_text),
+			buf.connect('delete-range', self.on_delete_range)
+		]
+
+	def on_insert_text(self, buf, piter, text, length):
+		if piter.get_offset() != self._deleted:
+			self.count += 1
+
+		self._deleted = None
+
+	def on_delete_range(self, buf, start, end):
+		self.count += 1
+		self._deleted = start.get_offset()
+
+	def disconnect(self):
+		for handler in self._handlers:
+			self.buf.disconnect(handler)
+
+		self._handlers = []
+
+class Batch:
+	# Runs a command on all documents of a window, as a task which handles
+	# a document in each step
+	def __init__(self, window, entry, cmd, args, argstr, modifier):
+		self.cmd = cmd
+		self.args = args
+		self.argstr = argstr
+		self.modifier = modifier
+
+		self.views = []
+		self.report = []
+		self.start = time.time()
+		self.elapsed = 0
+
+		# Run only once for documents shown in more than one view
+		buffers = []
+
+		for view in window.get_views():
+			if not view.get_buffer() in buffers:
+				buffers.append(view.get_buffer())
+				self.views.append(view)
+
+		self.total = len(self.views)
+		self.task = commands.tasks.Task(self.work(), entry)
+
+	def done(self):
+		self.elapsed = time.time() - self.start
+
+	def run(self, view):
+		buf = view.get_buffer()
+		edits = Edits(buf)
+		driver = None
+		error = None
+
+		start = time.time()
+
+		# Make the changes to each document undoable at once
+		buf.begin_user_action()
+
+		try:
+			driver = commands.Commands().driver(commands.scripted.Entry(view), self.modifier, self.cmd, self.args, self.argstr)
+
+			# Commands which are suspended, like !, are waited for by the
+			# task instead of blocking in a main loop of their own
+			for suspend in driver:
+				yield suspend
+		except Exception, e:
+			error = str(e)
+		finally:
+			if driver:
+				driver.close()
+
+			buf.end_user_action()
+			edits.disconnect()
+
+		self.report.append([buf.get_short_name_for_display(), edits.count, time.time() - start, error])
+
+	def work(self):
+		while self.views:
+			for suspend in self.run(self.views.pop(0)):
+				yield suspend
+
+			yield '<i>Running on %d of %d documents...</i>' % (len(self.report), self.total)
+
+	def info(self):
+		lines = []
+
+		for name, edits, elapsed, error in self.report:
+			line = '%-30s %6d edits %8.1f ms' % (saxutils.escape(name), edits, elapsed * 1000)
+
+			if error:
+				line += ' <span color="#f66">%s</span>' % (saxutils.escape(error),)
+
+			lines.append(line)
+
+		total = sum(map(lambda x: x[1], self.report))
+		lines.append('<b>%d of %d documents, %d edits in %.1f ms</b>' % (len(self.report), self.total, total, self.elapsed * 1000))
+
+		return "\n".join(lines)
+
+@commands.autocomplete(command=commander.commands.completion.command)
+def __default__(entry, window, modifier, argstr, command, *args):
+	"""Run a command on all documents: all &lt;command&gt; [&lt;arguments&gt;]
+
+Run a command on each document of the window, for example
+<i>all format.remove-trailing-spaces</i>. The changes to each document can be
+undone at once. The number of edits and the time taken for each document are
+shown when all documents are done."""
+	cmd = commander.commands.completion.single_command([command], 0)
+
+	if not cmd:
+		raise commands.exceptions.Execute('Could not find command: ' + command)
+
+	# The arguments for the command are those after its name
+	words, wordsstr = commands.macro.split(argstr)
+
+	if len(words) > 1:
+		argstr = argstr[words[1].start(0):]
+	else:
+		argstr = ''
+
+	batch = Batch(window, entry, cmd, list(args), argstr, modifier)
+
+	if batch.task.start():
+		yield batch.task
+
+	# Cancelled or simply done
+	batch.done()
+
+	entry.info_show(batch.info(), True)
+	yield commands.result.DONE
+
+locals()['each'] = __default__
@@ -0,0 +1,60 @@
+"""Pack modules into bundles"""
+import os
+import gio
+import xml.sax.saxutils as saxutils
+
+import commander.commands as commands
+import commander.commands.completion
+import commander.commands.exceptions
+import commander.commands.result
+import commander.commands.bundle
+
+__commander_module__ = True
+
+def _resolve(view, filename):
+	filename = os.path.expanduser(filename)
+
+	if os.path.isabs(filename):
+		return filename
+
+	doc = view.get_buffer()
+
+	if not doc.is_untitled():
+		root = os.path.dirname(gio.File(doc.get_uri()).get_path())
+	else:
+		root = os.path.expanduser('~/')
+
+	return os.path.join(root, filename)
+
+@commands.autocomplete(directory=commander.commands.completion.filename, output=commander.commands.completion.filename)
+def pack(view, entry, directory, output=None):
+	"""Pack modules into a bundle: bundle.pack &lt;directory&gt; [&lt;output&gt;]
+
+Pack all the commander modules in &lt;directory&gt; into a single zip bundle, which
+contains an index of the modules and their roots. Bundles placed in a modules
+directory are registered by reading only that index, and their modules are
+imported from the bundle when used. The bundle is written to
+&lt;directory&gt;.zip when no &lt;output&gt; is given."""
+
+	directory = _resolve(view, directory).rstrip(os.sep)
+
+	if not os.path.isdir(directory):
+		raise commander.commands.exceptions.Execute('Not a directory: ' + directory)
+
+	if output == None:
+		output = directory + '.zip'
+	else:
+		output = _resolve(view, output)
+
+	if not commander.commands.bundle.is_bundle(output):
+		raise commander.commands.exceptions.Execute('Bundles should have the .zip extension')
+
+	try:
+		index = commander.commands.bundle.pack(directory, output)
+	except (IOError, OSError), e:
+		raise commander.commands.exceptions.Execute('Could not write bundle: ' + str(e))
+
+	names = map(lambda x: x['name'], index)
+	entry.info_show('Packed %d modules into <i>%s</i>: %s' % (len(names), saxutils.escape(output), ', '.join(names)), True)
+
+	return commander.commands.result.DONE
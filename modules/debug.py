@@ -0,0 +1,131 @@
+"""Debug commander itself"""
+import time
+import commander.commands as commands
+import commander.commands.result
+import commander.commands.timing as timing
+import commander.commands.tracing as tracing
+import commander.commands.watchdog as watchdog
+import commander.commands.exceptions
+
+from xml.sax import saxutils
+
+__commander_module__ = True
+
+def _ms(t):
+	return '%8.1f' % (t * 1000,)
+
+def startup(entry):
+	"""Show module load times: debug.startup
+
+Show how much time was spent scanning module directories and importing
+modules, sorted by cost. For each import the total time, the time spent in
+the import itself (excluding nested imports) and the CPU time is shown."""
+
+	recs = timing.records()
+	marks = timing.marks()
+	lines = []
+
+	if 'activate' in marks and 'ready' in marks:
+		wall = marks['ready'][0] - marks['activate'][0]
+		cpu = marks['ready'][1] - marks['activate'][1]
+
+		lines.append('Activation until first command ready: %.1f ms (%.1f ms CPU)' % (wall * 1000, cpu * 1000))
+	else:
+		lines.append('Commands have not been loaded yet')
+
+	scans = filter(lambda x: x.kind == 'scan', recs)
+	lines.append('Scanning %d directories: %.1f ms' % (len(scans), sum(map(lambda x: x.wall, scans)) * 1000))
+
+	mods = filter(lambda x: x.kind == 'load', recs)
+	lines.append('Loading %d modules: %.1f ms' % (len(mods), sum(map(lambda x: x.wall, mods)) * 1000))
+
+	loads = filter(lambda x: x.kind in ('load', 'import'), recs)
+
+	if loads:
+		loads.sort(lambda a, b: cmp(b.wall, a.wall))
+
+		lines.append('')
+		lines.append('%8s %8s %8s  %-6s  %s' % ('Total', 'Self', 'CPU', 'Kind', 'Name'))
+
+		for rec in loads:
+			name = rec.name
+
+			if rec.failed:
+				name += ' (failed)'
+
+			lines.append('%s %s %s  %-6s  %s' % (_ms(rec.wall), _ms(rec.self_wall), _ms(rec.cpu), rec.kind, name))
+
+	entry.info_show('\n'.join(lines))
+	return commands.result.DONE
+
+def trace(entry, action='toggle'):
+	"""Record a timeline: debug.trace [start|stop]
+
+Record the execution of commands, their generator steps, completions, module
+reloads, searches and shell output in the trace event format. The trace is
+written to ~/.gnome2/gedit/commander/traces and can be loaded in
+chrome://tracing or Perfetto. Without argument, tracing is toggled."""
+	if not tracing.available():
+		raise commands.exceptions.Execute('Tracing needs the json module')
+
+	if action == 'toggle':
+		if tracing.enabled():
+			action = 'stop'
+		else:
+			action = 'start'
+
+	if action == 'start':
+		filename = tracing.start()
+		entry.info_show('Tracing to <i>%s</i>' % (saxutils.escape(filename),), True)
+	elif action == 'stop':
+		tracing.stop()
+		entry.info_show('Tracing stopped')
+	else:
+		raise commands.exceptions.Execute('Expected start or stop: ' + action)
+
+	return commands.result.DONE
+
+def stalls(entry, action='show'):
+	"""Show main loop stalls: debug.stalls [start|stop|clear]
+
+Show the times the editor was blocked, with the command or completion that was
+running and the commander code found on sampled stacks. The stall watchdog is
+started when <i>watchdog</i> is set in the configuration, or with
+<i>debug.stalls start</i>."""
+	if action == 'start':
+		watchdog.start(commands.Commands().get_dirs())
+		entry.info_show('Watching for stalls')
+	elif action == 'stop':
+		watchdog.stop()
+		entry.info_show('Stopped watching for stalls')
+	elif action == 'clear':
+		if watchdog.instance():
+			watchdog.instance().clear()
+	elif action == 'show':
+		dog = watchdog.instance()
+
+		if not dog:
+			raise commands.exceptions.Execute('The stall watchdog is not running, use debug.stalls start')
+
+		reports = dog.reports()
+
+		if not reports:
+			entry.info_show('No stalls of more than %.0f ms' % (dog.threshold * 1000,))
+			return commands.result.DONE
+
+		lines = []
+
+		for stall in reversed(reports):
+			when = time.strftime('%H:%M:%S', time.localtime(stall.start))
+			lines.append('<b>%s</b> %s ms in <b>%s</b>' % (when, _ms(stall.duration).strip(), saxutils.escape(str(stall.running))))
+
+			where = stall.where()
+
+			if where:
+				lines.append('    at %s (%d samples)' % (saxutils.escape(where), stall.samples))
+
+		entry.info_show('\n'.join(lines), True)
+	else:
+		raise commands.exceptions.Execute('Expected start, stop or clear: ' + action)
+
+	return commands.result.DONE
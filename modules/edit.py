@@ -12,6 +12,7 @@ import commander.commands as commands
 import commander.commands.completion
 import commander.commands.result
 import commander.commands.exceptions
+import commander.commands.workers
 
 __commander_module__ = True
 
@@ -30,7 +31,14 @@ def __default__(filename, view):
 	if not os.path.isabs(filename):
 		filename = os.path.join(cwd, filename)
 	
-	matches = glob.glob(filename)
+	# Globbing can take a while on large or remote directories
+	job = commander.commands.workers.submit(glob.glob, filename)
+	yield job
+
+	if job.cancelled:
+		yield commander.commands.result.HIDE
+
+	matches = job.result()
 	files = []
 	
 	if matches:
@@ -43,7 +51,7 @@ def __default__(filename, view):
 		window = view.get_toplevel()
 		gedit.commands.load_uris(window, files)
 		
-	return commander.commands.result.HIDE
+	yield commander.commands.result.HIDE
 
 def _dummy_cb(num, total):
 	pass
@@ -153,6 +161,12 @@ def _resume_command(view, mod, parts):
 def command(view, name):
 	"""Edit commander command: edit.command &lt;command&gt;"""
 	parts = name.split('.')
+
+	# Make sure the module providing the command is imported
+	res = commander.commands.completion.command([name], 0)
+
+	if res:
+		res[0][0].real()
 	
 	for mod in sys.modules:
 		if commands.is_commander_module(sys.modules[mod]) and (mod == parts[0] or _mod_has_alias(sys.modules[mod], parts[0])):
@@ -27,19 +27,33 @@ class TextFinder(finder.Finder):
 		else:
 			return False
 
-def __default__(entry, argstr):
+	def match(self, line):
+		if self.flags & gedit.SEARCH_CASE_SENSITIVE:
+			return self.findstr in line
+		else:
+			return self.findstr.lower() in line.lower()
+
+def _find(fd, argstr, input):
+	if input != None:
+		return fd.filter(argstr, input)
+	else:
+		return fd.find(argstr)
+
+def __default__(entry, argstr, input=None):
 	"""Find in document: find &lt;text&gt;
 
-Quickly find phrases in the document"""
+Quickly find phrases in the document. In a pipeline, the lines of the input
+containing the text are passed on instead"""
 	fd = TextFinder(entry, gedit.SEARCH_CASE_SENSITIVE)
-	yield fd.find(argstr)
+	yield _find(fd, argstr, input)
 
-def _find_insensitive(entry, argstr):
+def _find_insensitive(entry, argstr, input=None):
 	"""Find in document (case insensitive): find-i &lt;text&gt;
 
-Quickly find phrases in the document (case insensitive)"""
+Quickly find phrases in the document (case insensitive). In a pipeline, the
+lines of the input containing the text are passed on instead"""
 	fd = TextFinder(entry, 0)
-	yield fd.find(argstr)
+	yield _find(fd, argstr, input)
 
 def replace(entry, findstr, replstr=None):
 	"""Find/replace in document: find.replace &lt;find&gt; [&lt;replace&gt;]
@@ -1,6 +1,9 @@
 from xml.sax import saxutils
 import commander.commands as commands
 import commander.utils as utils
+import commander.changeset as changeset
+import commander.commands.tasks as tasks
+import commander.commands.tracing as tracing
 
 class Finder:
 	FIND_STARTMARK = 'gedit-commander-find-startmark'
@@ -36,6 +39,9 @@ class Finder:
 	
 	def do_find(self, bounds):
 		return None
+
+	def match(self, line):
+		return False
 	
 	def get_replace(self, text):
 		return self.replacestr
@@ -61,6 +67,7 @@ class Finder:
 		if loc.y + loc.height < visible.y or loc.y > visible.y + visible.height:
 			self.view.scroll_to_iter(startiter, 0.2, True, 0, 0.5)
 	
+	@tracing.traced('find')
 	def find_next(self, select=False):
 		buf = self.view.get_buffer()
 		
@@ -68,7 +75,7 @@ class Finder:
 		bounds = [buf.get_iter_at_mark(self.find_result.end),
 			      buf.get_iter_at_mark(self.search_boundaries.end)]
 
-		ret = self.do_find(bounds)
+		ret = tracing.call('do_find', 'find', self.do_find, bounds)
 		
 		# Check if we need to wrap around if nothing is found
 		startiter = buf.get_iter_at_mark(self.search_start_mark)
@@ -84,7 +91,7 @@ class Finder:
 			# Make sure to just stop at the start of the previous
 			self.search_boundaries.end = self.search_start_mark
 			
-			ret = self.do_find(bounds)
+			ret = tracing.call('do_find', 'find', self.do_find, bounds)
 	
 		if not ret:
 			return False
@@ -186,6 +193,17 @@ class Finder:
 		self.cancel()
 		yield commands.result.DONE
 	
+	def filter(self, findstr, input):
+		# Show the lines of the input which match, instead of searching
+		# the document
+		self.set_find(findstr)
+
+		for line in input:
+			if self.match(line):
+				self.entry.info_show(line)
+
+		yield commands.result.DONE
+
 	def _restore_cursor(self, mark):
 		buf = mark.get_buffer()
 		
@@ -194,6 +212,76 @@ class Finder:
 		
 		self.view.scroll_to_mark(buf.get_insert(), 0.2, True, 0, 0.5)
 	
+	def _collect(self, changes):
+		# Collect the replacements of all matches, one match in each step
+		buf = self.view.get_buffer()
+		found = 0
+
+		while True:
+			start = buf.get_iter_at_mark(self.find_result.start)
+			end = buf.get_iter_at_mark(self.find_result.end)
+
+			if not start.equal(end):
+				changes.replace_range(start, end, self.get_replace(start.get_text(end)))
+				found += 1
+
+			if not self.find_next():
+				break
+
+			yield '<i>Replacing... %d found</i>' % (found,)
+
+	def find_all(self, changes):
+		# Start collecting the replacements of all matches in changes.
+		# Finding all matches in a large document takes a while, so it runs
+		# as a task
+		task = tasks.Task(self._collect(changes), self.entry, 'Replacing...')
+		task.start()
+
+		return task
+
+	def found_all(self, job, changes):
+		pass
+
+	def _replace_all(self, startmark):
+		# The replacements are made at once when all are found
+		buf = self.view.get_buffer()
+		changes = changeset.ChangeSet(buf)
+
+		job = self.find_all(changes)
+
+		# The collected offsets are no longer valid when the document changes
+		changed = []
+		handler = buf.connect('changed', lambda b: (changed.append(True), job.cancel()))
+
+		try:
+			if job.running():
+				yield job
+		except GeneratorExit, e:
+			job.cancel()
+			buf.disconnect(handler)
+
+			self._restore_cursor(startmark)
+			self.cancel()
+			raise e
+
+		buf.disconnect(handler)
+
+		if job.error:
+			self._restore_cursor(startmark)
+			self.cancel()
+			raise job.error
+
+		if job.cancelled:
+			if changed:
+				self.entry.info_show('<i>Replace cancelled, the document was changed</i>', True)
+			else:
+				self.entry.info_show('<i>Replace cancelled</i>', True)
+		else:
+			self.found_all(job, changes)
+			changes.commit()
+
+		self._restore_cursor(startmark)
+
 	def replace(self, findstr, replaceall=False, replacestr=None):
 		if findstr:
 			self.set_find(findstr)
@@ -224,17 +312,20 @@ class Finder:
 				self.cancel()
 				raise e
 
-		# On replace all, wrap it in begin/end user action
+		# Replace all collects the replacements in a task, and makes them at
+		# once when all are found
 		if replaceall:
-			buf.begin_user_action()
+			yield self._replace_all(startmark)
+
+			self.cancel()
+			yield commands.result.DONE
 
 		try:
 			while True:
-				if not replaceall:
-					rep, words, modifier = (yield commands.result.Prompt('Replace next [%s]:' % (saxutils.escape(self.replacestr),)))
-			
-					if rep:
-						self.set_replace(rep)
+				rep, words, modifier = (yield commands.result.Prompt('Replace next [%s]:' % (saxutils.escape(self.replacestr),)))
+		
+				if rep:
+					self.set_replace(rep)
 
 				bounds = utils.Struct({'start': buf.get_iter_at_mark(self.find_result.start),
 				                       'end': buf.get_iter_at_mark(self.find_result.end)})
@@ -250,24 +341,13 @@ class Finder:
 					buf.end_user_action()
 
 				# Find next
-				if not self.find_next(select=not replaceall):
-					if not replaceall:
-						self.entry.info_show('<i>Search hit end of the document</i>', True)
-
+				if not self.find_next(select=True):
+					self.entry.info_show('<i>Search hit end of the document</i>', True)
 					break
 	
 		except GeneratorExit, e:
-			if replaceall:
-				self._restore_cursor(startmark)
-				buf.end_user_action()
-
 			self.cancel()
 			raise e				
 
-		if replaceall:
-			self._restore_cursor(startmark)
-
-			buf.end_user_action()
-
 		self.cancel()
 		yield commands.result.DONE
\ No newline at end of file
@@ -1,4 +1,6 @@
 import commander.commands as commands
+import commander.commands.processes as processes
+import commander.commands.transforms as transforms
 import finder
 
 import gedit
@@ -12,7 +14,6 @@ class RegexFinder(finder.Finder):
 		finder.Finder.__init__(self, entry)
 		
 		self.flags = re.UNICODE | re.MULTILINE | re.DOTALL | flags
-		self.groupre = re.compile('(\\\\)?\\$([0-9]+|{(([0-9]+):([^}]+))})')
 	
 	def set_find(self, findstr):
 		finder.Finder.set_find(self, findstr)
@@ -38,40 +39,12 @@ class RegexFinder(finder.Finder):
 			return [start, end]
 		else:
 			return False
-	
-	def _transform(self, text, trans):
-		if not trans:
-			return text
-		
-		transforms = {
-			'u': lambda x: "%s%s" % (x[0].upper(), x[1:]),
-			'U': lambda x: x.upper(),
-			'l': lambda x: "%s%s" % (x[0].lower(), x[1:]),
-			'L': lambda x: x.lower(),
-			't': lambda x: x.title()
-		}
-		
-		for i in trans.split(','):
-			if i in transforms:
-				text = transforms[i](text)
-		
-		return text
-	
-	def _do_re_replace_group(self, matchit, group):
-		if group.group(3):
-			num = int(group.group(4))
-		else:
-			num = int(group.group(2))
-		
-		if group.group(1):
-			return group.group(2)
-		elif num < len(matchit.groups()) + 1:
-			return self._transform(matchit.group(num), group.group(5))
-		else:
-			return group.group(0)
+
+	def match(self, line):
+		return self.findre.search(line) != None
 	
 	def _do_re_replace(self, matchit):
-		return self.groupre.sub(lambda x: self._do_re_replace_group(matchit, x), self.replacestr)
+		return transforms.Replacement(self.replacestr).expand(matchit)
 	
 	def get_replace(self, text):
 		try:
@@ -79,21 +52,50 @@ class RegexFinder(finder.Finder):
 		except Exception, e:
 			raise commands.exceptions.Execute('Invalid replacement: ' + str(e))
 
-def __default__(entry, argstr):
+	def find_all(self, changes):
+		# Match the whole document at once instead of match by match, in
+		# another process when it is large
+		buf = self.view.get_buffer()
+		text = buf.get_text(*buf.get_bounds()).decode('utf-8')
+
+		if self.search_start_mark:
+			# From the cursor to the end, and then from the start
+			cursor = buf.get_iter_at_mark(self.search_start_mark).get_offset()
+			regions = [(cursor, len(text)), (0, cursor)]
+		else:
+			regions = [(buf.get_iter_at_mark(self.search_boundaries.start).get_offset(),
+			            buf.get_iter_at_mark(self.search_boundaries.end).get_offset())]
+
+		transform = transforms.RegexReplace(self.findre.pattern, self.flags, self.replacestr, regions)
+		return processes.transform(transform, text)
+
+	def found_all(self, job, changes):
+		for offset, length, text in job.result():
+			changes.replace(offset, length, text)
+
+def _find(fd, argstr, input):
+	if input != None:
+		return fd.filter(argstr, input)
+	else:
+		return fd.find(argstr)
+
+def __default__(entry, argstr, input=None):
 	"""Find regex in document: find.regex &lt;regex&gt;
 
 Find text in the document that matches a given regular expression. The regular
-expression syntax is that of python regular expressions."""
+expression syntax is that of python regular expressions. In a pipeline, the
+lines of the input that match are passed on instead."""
 	fd = RegexFinder(entry)
-	yield fd.find(argstr)
+	yield _find(fd, argstr, input)
 
-def _find_insensitive(entry, argstr):
+def _find_insensitive(entry, argstr, input=None):
 	"""Find regex in document (case insensitive): find.regex-i &lt;regex&gt;
 
 Find text in the document that matches a given regular expression. The regular
-expression syntax is that of python regular expressions. Matching dicards case."""
+expression syntax is that of python regular expressions. Matching dicards case.
+In a pipeline, the lines of the input that match are passed on instead."""
 	fd = RegexFinder(entry, re.IGNORECASE)
-	yield fd.find(argstr)
+	yield _find(fd, argstr, input)
 
 def replace(entry, findre, replstr=None):
 	"""Find/replace regex in document: find.replace &lt;find&gt; [&lt;replace&gt;]
@@ -122,3 +124,5 @@ def replace_all_i(entry, findre, replstr=None):
 Quickly find and replace all phrases in the document using regular expressions"""
 	fd = RegexFinder(entry, re.IGNORECASE)
 	yield fd.replace(findre, True, replstr)
+
+locals()['regex_i'] = _find_insensitive
@@ -1,4 +1,7 @@
 import commander.commands as commands
+import commander.changeset as changeset
+import commander.commands.processes as processes
+import commander.commands.transforms as transforms
 
 __commander_module__ = True
 
@@ -12,8 +15,9 @@ spaces are removed from the whole document."""
 	
 	if not bounds:
 		bounds = buf.get_bounds()
-	
-	buf.begin_user_action()
+
+	# Collect the spaces to remove, and remove them all at once
+	changes = changeset.ChangeSet(buf)
 	
 	try:
 		# For each line, remove trailing spaces
@@ -40,7 +44,7 @@ spaces are removed from the whole document."""
 					end.forward_char()
 
 				if last.get_offset() - end.get_offset() > 1 or end.get_char() != ' ':
-					buf.delete(end, last)
+					changes.delete_range(end, last)
 
 			start = end.copy()
 			start.forward_line()
@@ -49,10 +53,11 @@ spaces are removed from the whole document."""
 		print e
 	
 	buf.delete_mark(until)
-	buf.end_user_action()
+	changes.commit()
+
 	return commands.result.HIDE
 
-def _transform(view, how):
+def _transform(view, entry, how):
 	buf = view.get_buffer()
 	bounds = buf.get_selection_bounds()
 	
@@ -66,29 +71,48 @@ def _transform(view, how):
 		bounds = [start, end]
 	
 	if not bounds[0].equal(bounds[1]):
-		text = how(bounds[0].get_text(bounds[1]))
-
-		buf.begin_user_action()
-		buf.delete(bounds[0], bounds[1])
-		buf.insert(bounds[0], text)
-		buf.end_user_action()
+		# Large selections are transformed in other processes
+		offset = bounds[0].get_offset()
+		job = processes.transform(how, bounds[0].get_text(bounds[1]).decode('utf-8'))
+
+		if job.running():
+			# The edits are no longer valid when the document changes
+			changed = []
+			handler = buf.connect('changed', lambda b: (changed.append(True), job.cancel()))
+
+			try:
+				yield job
+			finally:
+				buf.disconnect(handler)
+
+		if job.cancelled:
+			if changed:
+				entry.info_show('<i>Transform cancelled, the document was changed</i>', True)
+				return
+		else:
+			changes = changeset.ChangeSet(buf)
+
+			for start, length, text in job.result():
+				changes.replace(offset + start, length, text)
+
+			changes.commit()
 	
-	return commands.result.HIDE
+	yield commands.result.HIDE
 		
-def upper(view):
+def upper(view, entry):
 	"""Make upper case: format.upper
 
 Transform text in selection to upper case."""
-	return _transform(view, lambda x: x.upper())
+	return _transform(view, entry, transforms.Case('upper'))
 
-def lower(view):
+def lower(view, entry):
 	"""Make lower case: format.lower
 
 Transform text in selection to lower case."""
-	return _transform(view, lambda x: x.lower())
+	return _transform(view, entry, transforms.Case('lower'))
 
-def title(view):
+def title(view, entry):
 	"""Make title case: format.title
 
 Transform text in selection to title case."""
-	return _transform(view, lambda x: x.title()).replace('_', '')
+	return _transform(view, entry, transforms.Case('title'))
@@ -51,3 +51,22 @@ Show detailed information on how to use a certain command (if available)"""
 
 	entry.info_show(_doc_text(command, res[0][0]), True)
 	return commands.result.DONE		
+
+def _list(prefix, cmds):
+	for cmd in cmds:
+		name = prefix + cmd.name
+
+		if cmd.name != '__default__':
+			yield '<b>%s</b> %s' % (saxutils.escape(name), cmd.oneline_doc())
+
+		for line in _list(name + '.', cmd.commands()):
+			yield line
+
+def _all(entry):
+	"""List all commands: help.all
+
+List all commands with a short description. The list is shown while it is
+being built, press Escape to stop it"""
+	return commands.result.Stream(_list('', commands.Commands().modules()), True)
+
+locals()['all'] = _all
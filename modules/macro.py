@@ -0,0 +1,101 @@
+import os
+import gio
+
+import commander.commands as commands
+import commander.commands.completion
+import commander.commands.exceptions
+import commander.commands.result
+import commander.commands.macro as macro
+
+__commander_module__ = True
+__root__ = ['source']
+
+@commands.attrs(macro=False)
+def record(entry):
+	"""Record a macro: macro.record
+
+Start recording the commands that are executed, until macro.stop. Answers
+to prompts are recorded with the commands, pipelines are not recorded."""
+	macro.record()
+	return commands.result.HIDE
+
+@commands.attrs(macro=False)
+def stop(entry):
+	"""Stop recording a macro: macro.stop
+
+Stop recording commands. The recorded commands can be replayed with
+macro.play."""
+	if not macro.recording():
+		raise commands.exceptions.Execute('Not recording a macro')
+
+	ret = macro.stop()
+
+	entry.info_show('Recorded %d commands' % (len(ret),))
+	return commands.result.DONE
+
+def _times(times):
+	try:
+		ret = int(times)
+	except ValueError:
+		ret = 0
+
+	if ret < 1:
+		raise commands.exceptions.Execute('Invalid number of times: ' + times)
+
+	return ret
+
+@commands.attrs(macro=False)
+def play(entry, modifier, times='1'):
+	"""Play the last macro: macro.play [&lt;times&gt;]
+
+Replay the commands of the last recorded macro, optionally a number of times.
+All changes made to the document can be undone at once."""
+	if macro.recording():
+		raise commands.exceptions.Execute('Cannot play a macro while recording')
+
+	script = macro.last()
+
+	if not script:
+		raise commands.exceptions.Execute('No macro was recorded')
+
+	for ret in commands.Commands().play(script, entry, modifier, _times(times)):
+		yield ret
+
+	yield commands.result.HIDE
+
+def _filename(view, filename):
+	filename = os.path.expanduser(filename)
+
+	if os.path.isabs(filename):
+		return filename
+
+	doc = view.get_buffer()
+
+	if not doc.is_untitled() and doc.is_local():
+		root = os.path.dirname(gio.File(doc.get_uri()).get_path())
+	else:
+		root = os.path.expanduser('~/')
+
+	return os.path.join(root, filename)
+
+@commands.autocomplete(filename=commander.commands.completion.filename)
+def _source(entry, view, modifier, filename):
+	"""Run commands from a file: source &lt;file&gt;
+
+Run the commands in a file, one on each line. Empty lines and lines starting
+with # are skipped. All changes made to the document can be undone at once."""
+	try:
+		f = file(_filename(view, filename), 'r')
+		text = f.read()
+		f.close()
+	except IOError, e:
+		raise commands.exceptions.Execute('Failed to read script: ' + str(e))
+
+	script = macro.parse(text, commander.commands.completion.single_command)
+
+	for ret in commands.Commands().play(script, entry, modifier):
+		yield ret
+
+	yield commands.result.HIDE
+
+locals()['source'] = _source
@@ -1,4 +1,5 @@
 import commander.commands as commands
+import commander.commands.tasks
 import gtk
 import re
 
@@ -37,10 +38,34 @@ def paragraph(view, modifier, num=1):
 Move the cursor per paragraph (use negative num to move backwards)"""
 	return _move(view, gtk.MOVEMENT_PARAGRAPHS, num, modifier)
 
-def regex(view, modifier, regex, num=1):
+def _matches(r, text, num, found):
+	# Find the match to move to, one match in each step. Moving forward it
+	# is the num-th match, moving backward the num-th match from the end
+	count = 0
+
+	for match in r.finditer(text):
+		count += 1
+
+		if num > 0:
+			del found[:]
+
+		found.append(match)
+
+		if num > 0 and count == num:
+			break
+
+		if len(found) > abs(num):
+			found.pop(0)
+
+		yield float(match.end(0)) / len(text)
+
+def regex(view, entry, modifier, regex, num=1):
 	"""Move cursor per regex: move.regex &lt;num&gt;
 
 Move the cursor per regex (use negative num to move backwards)"""
+	if isinstance(regex, str):
+		regex = regex.decode('utf-8')
+
 	try:
 		r = re.compile(regex, re.DOTALL | re.MULTILINE | re.UNICODE)
 	except Exception, e:
@@ -60,22 +85,31 @@ Move the cursor per regex (use negative num to move backwards)"""
 		end = start.copy()
 		start = buf.get_start_iter()
 	
-	text = start.get_text(end)
-	ret = list(r.finditer(text))
-	
-	if num < 0:
-		ret.reverse()
-	
-	idx = min(abs(num), len(ret))
-	
-	if idx > 0:
-		found = ret[idx - 1]
-		start = buf.get_iter_at_mark(buf.get_insert())
-		
-		if num < 0:
-			start.backward_char(len(text) - found.start(0))
-		else:
-			start.forward_chars(found.start(0))
+	# Match on characters, so that match offsets are buffer offsets
+	offset = start.get_offset()
+	text = start.get_text(end).decode('utf-8')
+
+	if num == 0 or not text:
+		yield commands.result.HIDE
+		return
+
+	found = []
+
+	# Matching a large document takes a while, do not block the editor
+	task = commands.tasks.Task(_matches(r, text, num, found), entry, 'Moving...')
+	handler = buf.connect('changed', lambda b: task.cancel())
+
+	try:
+		if task.start():
+			yield task
+	finally:
+		buf.disconnect(handler)
+
+	if task.error:
+		raise task.error
+
+	if found and not task.cancelled:
+		start = buf.get_iter_at_offset(offset + found[0].start(0))
 
 		if modifier & gtk.gdk.CONTROL_MASK:
 			buf.move_mark(buf.get_selection_bound(), start)
@@ -90,4 +124,4 @@ Move the cursor per regex (use negative num to move backwards)"""
 		if loc.y + loc.height < visible.y or loc.y > visible.y + visible.height:
 			view.scroll_to_mark(buf.get_insert(), 0.2, True, 0, 0.5)
 	
-	return commands.result.HIDE
+	yield commands.result.HIDE
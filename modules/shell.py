@@ -4,11 +4,14 @@ import fcntl
 import os
 import tempfile
 import signal
+import errno
 import gio
 
 import commander.commands as commands
 import commander.commands.exceptions
 import commander.commands.result
+import commander.commands.tracing
+import commander.changeset as changeset
 
 __commander_module__ = True
 __root__ = ['!', '!!', '!&']
@@ -20,6 +23,10 @@ class Process:
 		self.tmpin = tmpin
 		self.entry = entry
 		self.suspend = suspend
+
+		self._input = None
+		self._pending = ''
+		self._feed = 0
 		
 		if replace:
 			self.entry.view().set_editable(False)
@@ -33,6 +40,87 @@ class Process:
 		else:
 			stdout.close()
 
+			# Remove the input file once the process is done with it
+			if self.tmpin:
+				glib.timeout_add(1000, self.on_reap)
+
+	def feed(self, input):
+		# Write the lines of input to the process, as it reads them
+		self._input = input
+
+		fcntl.fcntl(self.pipe.stdin, fcntl.F_SETFL, os.O_NONBLOCK)
+		self._feed = glib.io_add_watch(self.pipe.stdin, glib.IO_OUT | glib.IO_ERR | glib.IO_HUP, self.on_feed)
+
+	def _read_input(self):
+		# The next few lines of input, or None when there are no more
+		lines = []
+
+		for line in self._input:
+			if isinstance(line, unicode):
+				line = line.encode('utf-8')
+
+			lines.append(line + "\n")
+
+			if len(lines) == 64:
+				break
+
+		if not lines:
+			return None
+
+		return ''.join(lines)
+
+	def on_feed(self, fd, condition):
+		if not condition & glib.IO_OUT:
+			self.close_input()
+			return False
+
+		try:
+			if not self._pending:
+				self._pending = self._read_input()
+
+			if self._pending == None:
+				self.close_input()
+				return False
+
+			written = os.write(fd.fileno(), self._pending)
+			self._pending = self._pending[written:]
+		except OSError, e:
+			if e.errno == errno.EAGAIN:
+				return True
+
+			# The process does not read anymore
+			self.close_input()
+			return False
+
+		return True
+
+	def close_input(self):
+		self._feed = 0
+		self._input = None
+
+		if self.pipe.stdin and not self.pipe.stdin.closed:
+			self.pipe.stdin.close()
+
+	def remove_input(self):
+		if not self.tmpin:
+			return
+
+		self.tmpin.close()
+
+		try:
+			os.unlink(self.tmpin.name)
+		except OSError:
+			pass
+
+		self.tmpin = None
+
+	def on_reap(self):
+		if self.pipe.poll() == None:
+			return True
+
+		self.remove_input()
+		return False
+
 	def update(self):
 		parts = self._buffer.split("\n")
 		
@@ -41,6 +129,7 @@ class Process:
 		
 		self._buffer = parts[-1]
 
+	@commander.commands.tracing.traced('shell')
 	def collect_output(self, fd, condition):
 		if condition & (glib.IO_IN | glib.IO_PRI):
 			try:
@@ -62,16 +151,18 @@ class Process:
 		if condition & (glib.IO_ERR | glib.IO_HUP):
 			if self.replace:
 				buf = self.entry.view().get_buffer()
-				buf.begin_user_action()
+				changes = changeset.ChangeSet(buf)
 				
 				bounds = buf.get_selection_bounds()
 				
 				if bounds:
-					buf.delete(bounds[0], bounds[1])
+					changes.replace_range(bounds[0], bounds[1], self._buffer)
+				else:
+					changes.insert(buf.get_iter_at_mark(buf.get_insert()).get_offset(), self._buffer)
 
-				buf.insert_at_cursor(self._buffer)
-				buf.end_user_action()
-			else:
+				changes.commit()
+			elif self._buffer.strip("\n"):
+				# In a pipeline an empty line would be passed on
 				self.entry.info_show(self._buffer.strip("\n"))
 			
 			self.stop()
@@ -87,19 +178,23 @@ class Process:
 			self.pipe.kill()
 
 		glib.source_remove(self.watch)
+
+		if self._feed:
+			glib.source_remove(self._feed)
+
+		self.close_input()
+		self.remove_input()
 		
 		if self.replace:
 			self.entry.view().set_editable(True)
 		
-		if self.tmpin:
-			self.tmpin.close()
-		
 		sus = self.suspend
 		self.suspend = None
 		sus.resume()
 
-def _run_command(entry, replace, background, argstr):
+def _run_command(entry, replace, background, argstr, input=None):
 	tmpin = None
+	stdin = None
 	
 	cwd = None
 	doc = entry.view().get_buffer()
@@ -123,13 +218,21 @@ def _run_command(entry, replace, background, argstr):
 
 		# Replace with temporary file
 		argstr = argstr.replace('<!', '< "' + tmpin.name + '"')
+	elif input != None:
+		# The output of the previous command in a pipeline is written to
+		# the process while it runs
+		stdin = subprocess.PIPE
 
 	try:
-		p = subprocess.Popen(argstr, shell=True, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+		p = subprocess.Popen(argstr, shell=True, cwd=cwd, stdin=stdin, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
 		stdout = p.stdout
 
 	except Exception, e:
-		raise commander.commands.exceptions.Execute('Failed to execute: ' + e)
+		if tmpin:
+			tmpin.close()
+			os.unlink(tmpin.name)
+
+		raise commander.commands.exceptions.Execute('Failed to execute: ' + str(e))
 	
 	suspend = None
 	
@@ -138,36 +241,46 @@ def _run_command(entry, replace, background, argstr):
 	
 	proc = Process(entry, p, replace, background, tmpin, stdout, suspend)
 
+	if stdin == subprocess.PIPE:
+		proc.feed(input)
+
 	if not background:
-		yield suspend
-	
-		# Cancelled or simply done
-		proc.stop()
+		try:
+			yield suspend
+		finally:
+			# Cancelled, closed or simply done
+			proc.stop()
 
 		yield commander.commands.result.DONE
 	else:
 		yield commander.commands.result.HIDE
 
-def __default__(entry, argstr):
+def __default__(entry, argstr, input=None):
 	"""Run shell command: ! &lt;command&gt;
 
 You can use <b>&lt;!</b> as a special input meaning the current selection or current
-document."""
-	return _run_command(entry, False, False, argstr)
+document. In a pipeline, the output of the previous command is the input. A |
+followed by a commander command ends the shell command, any other | is part
+of it."""
+	return _run_command(entry, False, False, argstr, input)
 
-def _run_replace(entry, argstr):
+def _run_replace(entry, argstr, input=None):
 	"""Run shell command and place output in document: !! &lt;command&gt;
 
 You can use <b>&lt;!</b> as a special input meaning the current selection or current
-document."""
-	return _run_command(entry, True, False, argstr)
+document. In a pipeline, the output of the previous command is the input. A |
+followed by a commander command ends the shell command, any other | is part
+of it."""
+	return _run_command(entry, True, False, argstr, input)
 
-def _run_background(entry, argstr):
+def _run_background(entry, argstr, input=None):
 	"""Run shell command in the background: !&amp; &lt;command&gt;
 
 You can use <b>&lt;!</b> as a special input meaning the current selection or current
-document."""
-	return _run_command(entry, False, True, argstr)
+document. In a pipeline, the output of the previous command is the input. A |
+followed by a commander command ends the shell command, any other | is part
+of it."""
+	return _run_command(entry, False, True, argstr, input)
 
 locals()['!'] = __default__
 locals()['!!'] = _run_replace
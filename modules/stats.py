@@ -0,0 +1,59 @@
+"""Show command statistics"""
+import commander.commands as commands
+import commander.commands.result
+import commander.commands.metrics as metrics
+
+__commander_module__ = True
+
+def _ms(t):
+	return '%8.1f' % (t * 1000,)
+
+def _latency(hist):
+	return '%s %s %s' % (_ms(hist.percentile(50)), _ms(hist.percentile(90)), _ms(hist.percentile(99)))
+
+def _sorted(items, key):
+	names = items.keys()
+	names.sort(lambda a, b: cmp(key(items[b]), key(items[a])) or cmp(a, b))
+
+	return names
+
+def __default__(entry):
+	"""Show command statistics: stats
+
+Show how often commands and completions were used and how long they took, in
+milliseconds. For commands the 50th, 90th and 99th percentiles of the time
+to the first result and of the total time (including time spent waiting for
+input) are shown, together with the average number of generator steps."""
+
+	cmds = metrics.commands()
+	comps = metrics.completions()
+
+	if not cmds and not comps:
+		entry.info_show('No statistics recorded yet')
+		return commands.result.DONE
+
+	lines = []
+
+	if cmds:
+		lines.append('%-24s %6s %6s %9s %26s %26s %6s' % ('Command', 'Calls', 'Failed', 'Cancelled', 'First (p50/p90/p99)', 'Total (p50/p90/p99)', 'Steps'))
+
+		for name in _sorted(cmds, lambda x: x.total.percentile(90)):
+			cmd = cmds[name]
+			lines.append('%-24s %6d %6d %9d %s %s %6.1f' % (name, cmd.total.count, cmd.failed, cmd.cancelled, _latency(cmd.first), _latency(cmd.total), cmd.steps.mean()))
+
+	if comps:
+		if lines:
+			lines.append('')
+
+		lines.append('%-48s %6s %26s' % ('Completion', 'Calls', 'Latency (p50/p90/p99)'))
+
+		for name in _sorted(comps, lambda x: x.percentile(90)):
+			lines.append('%-48s %6d %s' % (name, comps[name].count, _latency(comps[name])))
+
+	entry.info_show('\n'.join(lines))
+	return commands.result.DONE
+
+def clear(entry):
+	"""Clear command statistics: stats.clear"""
+	metrics.clear()
+	return commands.result.HIDE
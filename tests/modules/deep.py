@@ -0,0 +1,75 @@
+import glib
+import traceback
+
+import commander.commands as commands
+import commander.commands.result
+
+__commander_module__ = True
+
+def gen_lines(entry):
+	"""Yield lines: deep.gen-lines"""
+	for line in ('one', 'two', 'three'):
+		yield line
+
+def count(entry, input=None):
+	"""Count the lines of the input: deep.count"""
+	num = 0
+
+	for line in input or []:
+		num += 1
+
+	entry.info_show('count %d' % (num,))
+	return commands.result.DONE
+
+def ask(entry):
+	"""Prompt for a name: deep.ask"""
+	ret = yield commands.result.Prompt('Name:')
+
+	entry.info_show('got ' + ret[0])
+	yield commands.result.DONE
+
+def resumed(entry):
+	"""Wait for work which is already done: deep.resumed"""
+	suspend = commands.result.Suspend()
+	suspend.resume()
+
+	yield suspend
+
+	entry.info_show('resumed')
+	yield commands.result.DONE
+
+def later(entry):
+	"""Wait for the main loop: deep.later"""
+	suspend = commands.result.Suspend()
+	glib.idle_add(lambda: suspend.resume() or False)
+
+	yield suspend
+
+	entry.info_show('later')
+	yield commands.result.DONE
+
+def keywords(entry, **kwargs):
+	"""Show the system arguments passed by keyword: deep.keywords"""
+	entry.info_show(' '.join(sorted(kwargs.keys())))
+	return commands.result.DONE
+
+def _nest(depth):
+	if depth == 0:
+		yield len(traceback.extract_stack())
+	else:
+		ret = yield _nest(depth - 1)
+		yield ret
+
+def nest(entry, depth='1'):
+	"""Nest generators: deep.nest [&lt;depth&gt;]"""
+	ret = yield _nest(int(depth))
+
+	entry.info_show('stack %d' % (ret,))
+	yield commands.result.DONE
+
+def stream(entry, count='2'):
+	"""Stream lines: deep.stream [&lt;count&gt;]"""
+	ret = yield commands.result.Stream(map(str, xrange(int(count))))
+
+	entry.info_show('done %r' % (ret,))
+	yield commands.result.DONE
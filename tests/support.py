@@ -0,0 +1,26 @@
+import os
+import sys
+import tempfile
+
+# Tests run commander headless, with the bundled modules and those in
+# tests/modules. Commander keeps its manifest, history and config in the home
+# directory, so that is a temporary one
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+	os.path.join(ROOT, 'modules'),
+	os.path.join(ROOT, 'tests', 'modules')
+]
+
+if not ROOT in sys.path:
+	sys.path.insert(0, ROOT)
+
+os.environ['HOME'] = tempfile.mkdtemp(prefix='commander-tests-')
+
+import headless
+headless.install()
+
+from headless import Harness
+
+def harness(text=''):
+	return Harness(text, dirs=MODULES)
@@ -0,0 +1,55 @@
+import time
+import unittest
+
+import support
+
+class TestAll(unittest.TestCase):
+	def setUp(self):
+		self.harness = support.harness("doc\n")
+
+		for i in xrange(2):
+			self.harness.window.create_tab(False)
+			self.harness.window.get_views()[-1].get_buffer().set_text('doc %d\n' % (i,))
+
+	def tearDown(self):
+		self.harness.close()
+
+	def texts(self):
+		return map(lambda x: x.get_buffer().get_text(*x.get_buffer().get_bounds()), self.harness.window.get_views())
+
+	def done(self):
+		info = self.harness.info()
+		return info != None and 'documents' in info
+
+	def test_edits(self):
+		h = self.harness
+
+		h.execute('all find.replace-all doc text')
+		self.assertTrue(h.wait(self.done, 5))
+
+		self.assertEqual(self.texts(), ['text\n', 'text 0\n', 'text 1\n'])
+		self.assertTrue('3 of 3 documents, 3 edits' in h.info())
+
+	def test_suspended(self):
+		h = self.harness
+
+		# The shell commands run while the main loop keeps going
+		h.execute('all !! echo hi')
+		self.assertFalse(self.done())
+
+		self.assertTrue(h.wait(self.done, 5))
+		self.assertEqual(self.texts(), ['hi\ndoc\n', 'hi\ndoc 0\n', 'hi\ndoc 1\n'])
+
+	def test_cancel(self):
+		h = self.harness
+		start = time.time()
+
+		h.execute('all ! sleep 5')
+		h.flush()
+		h.cancel()
+
+		self.assertTrue(h.wait(self.done, 2))
+		self.assertTrue(time.time() - start < 2)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,47 @@
+import os
+import sys
+import tempfile
+import subprocess
+import unittest
+
+import support
+
+class TestBatch(unittest.TestCase):
+	def setUp(self):
+		self.home = tempfile.mkdtemp()
+		self.filename = os.path.join(tempfile.mkdtemp(), 'file.txt')
+
+		f = file(self.filename, 'w')
+		f.write("foo bar\nfoo\n")
+		f.close()
+
+	def run_batch(self, *args):
+		env = dict(os.environ)
+		env['HOME'] = self.home
+
+		argv = [sys.executable, '-m', 'commander.batch', '-q', '-j', '1', '-m', support.MODULES[0]] + list(args)
+		return subprocess.call(argv, cwd=support.ROOT, env=env)
+
+	def text(self):
+		f = file(self.filename, 'r')
+		ret = f.read()
+		f.close()
+
+		return ret
+
+	def test_run(self):
+		self.assertEqual(self.run_batch('find.replace-all', 'foo', 'baz', '--', self.filename), 0)
+		self.assertEqual(self.text(), "baz bar\nbaz\n")
+
+		# Nothing is saved in the home directory
+		self.assertEqual(os.listdir(self.home), [])
+
+	def test_state_dir(self):
+		state = tempfile.mkdtemp()
+
+		self.assertEqual(self.run_batch('-s', state, 'find.replace-all', 'foo', 'baz', '--', self.filename), 0)
+		self.assertTrue(os.path.isfile(os.path.join(state, 'manifest')))
+		self.assertEqual(os.listdir(self.home), [])
+
+if __name__ == '__main__':
+	unittest.main()
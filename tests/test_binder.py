@@ -0,0 +1,76 @@
+import unittest
+
+import support
+
+import commander.commands.exceptions as exceptions
+import commander.commands.method as method
+
+class View:
+	def get_toplevel(self):
+		return 'window'
+
+class Entry:
+	def __init__(self):
+		self._view = View()
+
+	def view(self):
+		return self._view
+
+def words(first, second):
+	return [first, second]
+
+def system(view, first, entry, modifier):
+	return [view, first, entry, modifier]
+
+def defaults(first, second='2', view=None, argstr=None):
+	return [first, second, view, argstr]
+
+def varargs(first, *rest):
+	return [first, rest]
+
+def keywords(first, **kwargs):
+	return [first, sorted(kwargs.keys())]
+
+class TestBinder(unittest.TestCase):
+	def setUp(self):
+		self.entry = Entry()
+
+	def execute(self, func, args):
+		cmd = method.Method(func, func.__name__, None)
+		return cmd.execute(' '.join(args), args, self.entry, 4)
+
+	def test_words(self):
+		self.assertEqual(self.execute(words, ['a', 'b']), ['a', 'b'])
+
+	def test_system(self):
+		self.assertEqual(self.execute(system, ['a']), [self.entry.view(), 'a', self.entry, 4])
+
+	def test_defaults(self):
+		self.assertEqual(self.execute(defaults, ['a', 'b']), ['a', 'b', self.entry.view(), 'a b'])
+
+		# The default is kept, the system arguments after it are passed by
+		# name
+		self.assertEqual(self.execute(defaults, ['a']), ['a', '2', self.entry.view(), 'a'])
+
+	def test_missing(self):
+		try:
+			self.execute(words, ['a'])
+		except exceptions.Execute, e:
+			self.assertEqual(str(e), 'Invalid number of arguments (need second)')
+		else:
+			self.fail('expected an error')
+
+	def test_varargs(self):
+		self.assertEqual(self.execute(varargs, ['a', 'b', 'c']), ['a', ('b', 'c')])
+		self.assertEqual(self.execute(varargs, ['a']), ['a', ()])
+
+	def test_keywords(self):
+		# Input is not passed unless it is named
+		self.assertEqual(self.execute(keywords, ['a']), ['a', ['args', 'argstr', 'entry', 'modifier', 'view', 'window']])
+
+	def test_cached(self):
+		cmd = method.Method(words, 'words', None)
+		self.assertTrue(cmd.binder() is cmd.binder())
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,75 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import support
+
+import commander.commands as commands
+import commander.commands.bundle as bundle
+import commander.commands.completion as completion
+
+FILES = {
+	'alpha.py': "__commander_module__ = True\n__root__ = ['alpha_root']\n\ndef alpha_root(entry):\n\tentry.info_show('alpha')\n",
+	'beta/__init__.py': '__commander_module__ = True\n\nimport helper\n\ndef run(entry):\n\tentry.info_show(helper.TEXT)\n',
+	'beta/helper.py': "TEXT = 'beta'\n",
+	'gamma.py': "__commander_module__ = True\n__root__ = list(['gamma_root'])\n\ndef gamma_root(entry):\n\tpass\n",
+	'other.py': 'VALUE = 1\n'
+}
+
+class TestBundle(unittest.TestCase):
+	def setUp(self):
+		self.dirname = tempfile.mkdtemp(prefix='commander-bundle-')
+		self.source = os.path.join(self.dirname, 'source')
+		self.modules = os.path.join(self.dirname, 'modules')
+
+		os.makedirs(os.path.join(self.source, 'beta'))
+		os.mkdir(self.modules)
+
+		for name in FILES:
+			f = file(os.path.join(self.source, name), 'w')
+			f.write(FILES[name])
+			f.close()
+
+		self.filename = os.path.join(self.modules, 'mods.zip')
+		self.index = bundle.pack(self.source, self.filename)
+
+		self.harness = support.Harness(dirs=[self.modules])
+
+	def tearDown(self):
+		self.harness.close()
+		bundle.forget(self.filename)
+
+		shutil.rmtree(self.dirname, True)
+
+	def module(self, name):
+		return filter(lambda x: x.name == name, commands.Commands().modules())[0]
+
+	def test_index(self):
+		index = map(lambda x: (x['name'], x['default'], x['roots']), self.index)
+
+		# Files which are not commander modules are left out
+		self.assertEqual(index, [('alpha', False, ['alpha_root']), ('beta', False, []), ('gamma', False, None)])
+		self.assertEqual(bundle.read_index(self.filename), self.index)
+
+	def test_deferred(self):
+		self.assertTrue(self.module('alpha').deferred())
+		self.assertTrue(self.module('beta').deferred())
+
+		# The roots of gamma are only known by importing it
+		self.assertFalse(self.module('gamma').cached())
+		self.assertTrue(completion.single_command(['gamma-root'], 0))
+
+	def test_execute(self):
+		h = self.harness
+
+		h.execute('alpha-root')
+		self.assertEqual(h.info(), 'alpha')
+
+		# Modules of a package are imported from the bundle too
+		h.execute('beta.run')
+		self.assertEqual(h.info(), 'beta')
+		self.assertTrue(bundle.archive(self.module('beta').mod.__file__))
+
+if __name__ == '__main__':
+	unittest.main()
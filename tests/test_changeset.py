@@ -0,0 +1,57 @@
+import unittest
+
+import support
+
+import commander.changeset as changeset
+
+class TestChangeSet(unittest.TestCase):
+	def setUp(self):
+		self.harness = support.harness("ab" * 200)
+
+	def tearDown(self):
+		self.harness.close()
+
+	def replace_all(self, changes):
+		for i in xrange(0, 400, 2):
+			changes.replace(i, 1, 'AA')
+
+		self.assertEqual(changes.commit(), 200)
+		self.assertEqual(self.harness.text(), "AAb" * 200)
+
+	def test_marks(self):
+		buf = self.harness.document
+		mark = buf.create_mark(None, buf.get_iter_at_offset(201), False)
+
+		self.replace_all(changeset.ChangeSet(buf))
+
+		# The mark stays in front of the b at 201, after the 101 edits before it
+		self.assertEqual(buf.get_iter_at_mark(mark).get_offset(), 302)
+
+	def test_replace_all(self):
+		h = self.harness
+		buf = h.document
+
+		# A mark in the replaced region, like a bookmark
+		mark = buf.create_mark(None, buf.get_iter_at_offset(201), False)
+
+		h.execute('find.replace-all a AA')
+		self.assertTrue(h.wait(lambda: h.entry()._suspended == None, 5))
+		h.flush()
+
+		self.assertEqual(h.text(), "AAb" * 200)
+		self.assertEqual(buf.get_iter_at_mark(mark).get_offset(), 302)
+
+	def test_insert_and_replace(self):
+		buf = self.harness.document
+		changes = changeset.ChangeSet(buf)
+
+		# The insert is made in front of the replacement, in whatever order
+		# they were added
+		changes.replace(2, 2, 'xy')
+		changes.insert(2, '-')
+
+		self.assertEqual(changes.commit(), 2)
+		self.assertEqual(self.harness.text()[:6], 'ab-xya')
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import support
+
+import commander.commands as commands
+import commander.commands.completion as completion
+import commander.commands.module as module
+
+LITERAL = '''__commander_module__ = True
+__root__ = ['literal_root']
+
+def literal_root(view):
+	"""A root from a literal: literal-root"""
+	pass
+'''
+
+COMPUTED = '''__commander_module__ = True
+__root__ = ['computed_' + x for x in ('root',)]
+
+def computed_root(view):
+	"""A root which is computed: computed-root"""
+	pass
+'''
+
+class TestDeferred(unittest.TestCase):
+	def setUp(self):
+		self.dirname = tempfile.mkdtemp(prefix='commander-deferred-')
+
+		self.write('literal', LITERAL)
+		self.write('computed', COMPUTED)
+
+		self.harness = support.Harness(dirs=[self.dirname])
+
+	def tearDown(self):
+		self.harness.close()
+		shutil.rmtree(self.dirname, True)
+
+	def write(self, name, source):
+		f = file(os.path.join(self.dirname, name + '.py'), 'w')
+		f.write(source)
+		f.close()
+
+	def module(self, name):
+		commands.Commands().ensure()
+		return commands.Commands()._lookup_module(os.path.join(self.dirname, name + '.py'))
+
+	def test_scan_roots(self):
+		self.assertEqual(module.scan_roots('x = 1\n'), [])
+		self.assertEqual(module.scan_roots("__root__ = ['a', 'b']\n"), ['a', 'b'])
+
+		# Anything which is not a single literal needs the module to be
+		# imported
+		self.assertEqual(module.scan_roots("__root__ = ['a'] + other\n"), None)
+		self.assertEqual(module.scan_roots("__root__ = ['a']\n__root__.append('b')\n"), None)
+		self.assertEqual(module.scan_roots("from other import __root__\n"), None)
+		self.assertEqual(module.scan_roots("__root__ = ['a']\n__root__ = ['b']\n"), None)
+
+	def test_literal(self):
+		mod = self.module('literal')
+
+		# The roots are known without importing the module
+		self.assertTrue(mod.deferred())
+		self.assertEqual(map(lambda x: x.name, mod.roots()), ['literal-root'])
+		self.assertTrue(completion.single_command(['literal-root'], 0))
+
+	def test_computed(self):
+		mod = self.module('computed')
+
+		# The module was imported to find its roots
+		self.assertFalse(mod.cached())
+		self.assertEqual(map(lambda x: x.name, mod.roots()), ['computed-root'])
+		self.assertTrue(completion.single_command(['computed-root'], 0))
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+
+import support
+
+import gtk
+
+import commander.commands as commands
+import commander.commands.completion as completion
+
+class TestHeadless(unittest.TestCase):
+	def setUp(self):
+		self.harness = support.harness("hello world\nfoo bar\n")
+
+	def tearDown(self):
+		self.harness.close()
+
+	def test_execute(self):
+		h = self.harness
+
+		h.execute('goto 2')
+		buf = h.document
+		self.assertEqual(buf.get_iter_at_mark(buf.get_insert()).get_line(), 1)
+
+		h.execute('format.upper')
+		self.assertEqual(h.text(), "hello world\nFOO BAR\n")
+
+	def test_complete(self):
+		self.assertEqual(self.harness.complete('form'), 'format.')
+
+	def test_info(self):
+		h = self.harness
+
+		h.execute('goto')
+		self.assertTrue('Error' in h.info())
+
+	def test_help_all(self):
+		h = self.harness
+
+		h.execute('help.all')
+		h.flush()
+
+		self.assertTrue('\nhelp.all List all commands' in h.info())
+		self.assertFalse('help.all-' in h.info())
+
+	def test_move_regex(self):
+		h = self.harness
+		buf = h.document
+		buf.place_cursor(buf.get_end_iter())
+
+		# Nothing to match after the cursor, the command is done at once
+		cmd = completion.single_command(['move.regex'], 0)
+		gen = cmd.real().method(h.view, h.entry(), 0, 'o')
+
+		self.assertEqual(gen.next(), commands.result.HIDE)
+		self.assertRaises(StopIteration, gen.next)
+
+	def test_resumed(self):
+		h = self.harness
+
+		# The suspend was resumed before the command yielded it, the entry
+		# does not wait for it
+		h.execute('deep.resumed')
+		self.assertEqual(h.info(), 'resumed')
+
+		entry = h.entry()
+		self.assertEqual(entry._suspended, None)
+		self.assertTrue(entry._entry.flags() & gtk.SENSITIVE)
+
+	def test_prompt(self):
+		h = self.harness
+
+		h.execute('find')
+		self.assertTrue(h.prompt())
+
+		h.cancel()
+		self.assertFalse(h.prompt())
+
+if __name__ == '__main__':
+	unittest.main()
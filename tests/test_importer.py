@@ -0,0 +1,86 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+import support
+
+import commander.commands as commands
+import commander.commands.importer as importer
+
+FILES = {
+	'__init__.py': '__commander_module__ = True\n\nimport middle\nimport unrelated\n\ndef value(view):\n\treturn middle.helper.VALUE\n',
+	'middle.py': 'import helper\n',
+	'helper.py': 'VALUE = 1\n',
+	'unrelated.py': 'VALUE = 2\n'
+}
+
+class TestImporter(unittest.TestCase):
+	def setUp(self):
+		self.dirname = tempfile.mkdtemp(prefix='commander-importer-')
+		self.path = os.path.join(self.dirname, 'pkg')
+
+		os.mkdir(self.path)
+
+		for name in FILES:
+			self.write(name, FILES[name])
+
+		self.harness = support.Harness(dirs=[self.dirname])
+
+		self.module = self.lookup()
+		self.module.ensure()
+
+	def tearDown(self):
+		self.harness.close()
+		shutil.rmtree(self.dirname, True)
+
+	def write(self, name, source):
+		f = file(os.path.join(self.path, name), 'w')
+		f.write(source)
+		f.close()
+
+	def lookup(self):
+		commands.Commands().ensure()
+		return commands.Commands()._lookup_module(self.path)
+
+	def test_closure(self):
+		closure = importer.instance().closure('pkg')
+		closure.sort()
+
+		self.assertEqual(closure, ['pkg', 'pkg.helper', 'pkg.middle', 'pkg.unrelated'])
+
+	def test_invalidated(self):
+		self.write('helper.py', 'VALUE = 10\n')
+
+		# The changed module and the modules importing it, directly or not
+		invalidated = importer.instance().invalidated('pkg')
+		invalidated.sort()
+
+		self.assertEqual(invalidated, ['pkg', 'pkg.helper', 'pkg.middle'])
+
+	def test_reload(self):
+		unrelated = sys.modules['pkg.unrelated']
+		helper = sys.modules['pkg.helper']
+
+		self.write('helper.py', 'VALUE = 10\n')
+		self.assertTrue(commands.Commands().reload_module(self.module))
+
+		# Only what changed is imported again
+		self.assertTrue(sys.modules['pkg.unrelated'] is unrelated)
+		self.assertFalse(sys.modules['pkg.helper'] is helper)
+		self.assertEqual(self.lookup().mod.middle.helper.VALUE, 10)
+
+	def test_broken(self):
+		mod = self.module.mod
+		self.write('helper.py', 'VALUE = \n')
+
+		# A broken edit leaves the old version in place
+		self.assertFalse(commands.Commands().reload_module(self.module))
+
+		self.assertTrue(self.lookup().mod is mod)
+		self.assertTrue(sys.modules['pkg'] is mod)
+		self.assertEqual(sys.modules['pkg.helper'].VALUE, 1)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,92 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import support
+
+import commander.utils as utils
+import commander.commands as commands
+import commander.commands.macro as macro
+
+class TestMacro(unittest.TestCase):
+	def setUp(self):
+		self.harness = support.harness("alpha\nbeta\n")
+
+	def tearDown(self):
+		self.harness.close()
+
+	def test_split(self):
+		words, wordsstr = macro.split('find "a b" \'c\' d')
+
+		self.assertEqual(wordsstr, ['find', 'a b', 'c', 'd'])
+		self.assertEqual(map(lambda x: x.group(0), words), map(lambda x: x.group(0), utils.re_words.finditer('find "a b" \'c\' d')))
+
+	def test_answers(self):
+		h = self.harness
+
+		h.execute('macro.record')
+		h.execute('deep.ask')
+		self.assertEqual(h.prompt(), 'Name:')
+
+		h.execute('bob')
+		self.assertEqual(h.info(), 'got bob')
+
+		h.execute('macro.stop')
+		self.assertEqual(macro.last().steps[0].answers, ['bob'])
+
+		h.execute('macro.play')
+		self.assertEqual(h.info(), 'got bob')
+
+	def test_suspended(self):
+		h = self.harness
+		running = lambda: h.entry()._suspended != None
+
+		h.execute('macro.record')
+		h.execute('deep.later')
+		self.assertTrue(h.wait(lambda: not running(), 5))
+		h.flush()
+		h.execute('macro.stop')
+
+		# The entry waits for the played command, instead of a nested main
+		# loop inside macro.play
+		h.execute('macro.play')
+		self.assertTrue(running())
+
+		self.assertTrue(h.wait(lambda: not running(), 5))
+		h.flush()
+		self.assertEqual(h.info(), 'later')
+
+class TestReload(unittest.TestCase):
+	def setUp(self):
+		self.dirname = tempfile.mkdtemp(prefix='commander-macro-')
+		self.path = os.path.join(self.dirname, 'greet.py')
+
+		self.write('one')
+		self.harness = support.Harness(dirs=support.MODULES + [self.dirname])
+
+	def tearDown(self):
+		self.harness.close()
+		shutil.rmtree(self.dirname, True)
+
+	def write(self, text):
+		f = file(self.path, 'w')
+		f.write("__commander_module__ = True\n\ndef hello(entry):\n\tentry.info_show('%s')\n" % (text,))
+		f.close()
+
+	def test_reload(self):
+		h = self.harness
+
+		h.execute('macro.record')
+		h.execute('greet.hello')
+		h.execute('macro.stop')
+
+		self.write('three')
+		self.assertTrue(commands.Commands().reload_module(self.path))
+
+		# The macro plays the new version of the command
+		h.execute('macro.play')
+		self.assertEqual(h.info(), 'three')
+
+if __name__ == '__main__':
+	unittest.main()
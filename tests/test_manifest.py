@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import support
+
+import commander.commands as commands
+import commander.commands.manifest as manifest
+
+SOURCE = '''import commander.commands as commands
+
+__commander_module__ = True
+
+def hello(view):
+	"""Say hello: sample.hello"""
+	return commands.result.DONE
+'''
+
+class TestManifest(unittest.TestCase):
+	def setUp(self):
+		self.dirname = tempfile.mkdtemp(prefix='commander-manifest-')
+		self.path = os.path.join(self.dirname, 'sample.py')
+
+		self.write(SOURCE)
+
+		self.harness = support.Harness(dirs=[self.dirname])
+
+		self.manifest = manifest.Manifest(os.path.join(self.dirname, 'manifest'))
+
+	def tearDown(self):
+		self.harness.close()
+		shutil.rmtree(self.dirname, True)
+
+	def write(self, source):
+		f = file(self.path, 'w')
+		f.write(source)
+		f.close()
+
+	def module(self):
+		commands.Commands().ensure()
+		return commands.Commands()._lookup_module(self.path)
+
+	def update(self):
+		mod = self.module().real()
+
+		self.manifest.update(self.path, mod)
+		self.manifest.save()
+
+		return manifest.Manifest(os.path.join(self.dirname, 'manifest'))
+
+	def test_lookup(self):
+		entry = self.update().lookup(self.path)
+
+		self.assertTrue(entry)
+		self.assertEqual(map(lambda x: x['name'], entry['command']['commands']), ['hello'])
+
+	def test_mtime(self):
+		saved = self.update()
+		st = os.stat(self.path)
+
+		os.utime(self.path, (st.st_atime, st.st_mtime + 10))
+		self.assertEqual(saved.lookup(self.path), None)
+
+	def test_size(self):
+		saved = self.update()
+		st = os.stat(self.path)
+
+		# Same modification time, but the file has grown
+		self.write(SOURCE + '\n')
+		os.utime(self.path, (st.st_atime, st.st_mtime))
+
+		self.assertEqual(saved.lookup(self.path), None)
+
+	def test_restore(self):
+		entry = self.update().lookup(self.path)
+
+		mod = commands.Commands()._create_module(self.path)
+		self.manifest.restore(mod, entry)
+
+		# The commands are known without importing the module
+		self.assertTrue(mod.cached())
+		self.assertEqual(map(lambda x: x.name, mod.commands()), ['hello'])
+		self.assertEqual(mod.commands()[0].doc(), 'Say hello: sample.hello')
+
+if __name__ == '__main__':
+	unittest.main()
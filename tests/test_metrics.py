@@ -0,0 +1,68 @@
+import unittest
+
+import support
+
+import commander.commands.metrics as metrics
+
+class TestMetrics(unittest.TestCase):
+	def setUp(self):
+		metrics.clear()
+		self.harness = support.harness()
+
+	def tearDown(self):
+		self.harness.close()
+
+	def test_finished(self):
+		h = self.harness
+
+		h.execute('deep.ask')
+		self.assertFalse('deep.ask' in metrics.commands())
+
+		h.execute('me')
+		self.assertEqual(h.info(), 'got me')
+
+		cmd = metrics.commands()['deep.ask']
+		self.assertEqual((cmd.total.count, cmd.failed, cmd.cancelled), (1, 0, 0))
+
+	def test_cancel(self):
+		h = self.harness
+
+		h.execute('deep.ask')
+		h.cancel()
+
+		cmd = metrics.commands()['deep.ask']
+		self.assertEqual((cmd.total.count, cmd.cancelled), (1, 1))
+
+	def test_destroy(self):
+		h = self.harness
+
+		h.execute('deep.ask')
+		h.close()
+
+		self.assertEqual(metrics.commands()['deep.ask'].cancelled, 1)
+
+	def test_limit(self):
+		for i in xrange(metrics.LIMIT):
+			metrics.Call('cmd%d' % (i,)).finish(1)
+
+		metrics.Call('cmd0').finish(1)
+		metrics.Call('new').finish(1)
+
+		# The least used command made room
+		cmds = metrics.commands()
+
+		self.assertEqual(len(cmds), metrics.LIMIT)
+		self.assertTrue('cmd0' in cmds and 'new' in cmds)
+
+	def test_percentile(self):
+		hist = metrics.Histogram()
+
+		for i in xrange(1, 101):
+			hist.add(i / 1000.0)
+
+		self.assertEqual(hist.count, 100)
+		self.assertTrue(0.05 <= hist.percentile(50) <= 0.05 * metrics.RATIO)
+		self.assertEqual(hist.percentile(100), 0.1)
+
+if __name__ == '__main__':
+	unittest.main()
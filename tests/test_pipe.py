@@ -0,0 +1,98 @@
+import os
+import tempfile
+import unittest
+
+import support
+
+import commander.commands as commands
+import commander.commands.completion as completion
+import commander.commands.macro as macro
+import commander.commands.pipe as pipe
+
+class TestPipe(unittest.TestCase):
+	def setUp(self):
+		self.harness = support.harness("alpha\nbeta\n")
+
+	def tearDown(self):
+		self.harness.close()
+
+	def running(self):
+		entry = self.harness.entry()
+		return entry._suspended != None
+
+	def execute(self, text):
+		h = self.harness
+
+		h.execute(text)
+		self.assertTrue(h.wait(lambda: not self.running(), 5))
+		h.flush()
+
+		return (h.info() or '').strip()
+
+	def test_generator(self):
+		self.assertEqual(self.execute('deep.gen-lines | deep.count'), 'count 3')
+
+	def test_generator_shell(self):
+		self.assertEqual(self.execute('deep.gen-lines | ! sort'), "one\nthree\ntwo")
+
+	def test_shell_pipe(self):
+		# The | belongs to the shell command, even though sh resolves to a
+		# command
+		self.assertEqual(self.execute("! echo 'echo hi' | sh"), 'hi')
+
+	def stages(self, text):
+		words, wordsstr = macro.split(text)
+		return pipe.split(words, wordsstr, completion.exact_command)
+
+	def test_split(self):
+		self.assertEqual(self.stages('deep.gen-lines | deep.count'), [(0, 1), (2, 3)])
+		self.assertEqual(self.stages('deep.gen-lines | ! sort | uniq'), [(0, 1), (2, 6)])
+
+		# Only the full name of a command starts a new stage
+		self.assertEqual(self.stages('deep.gen-lines | deep.co'), [(0, 3)])
+		self.assertEqual(self.stages('! ls | sort | sh'), [(0, 6)])
+
+		# Also after a shell command, and for commands of submodules
+		self.assertEqual(self.stages('! git grep foo | find.regex-i bar'), [(0, 4), (5, 7)])
+		self.assertEqual(self.stages('deep.gen-lines | find.regex-i TW'), [(0, 1), (2, 4)])
+
+	def test_submodule(self):
+		self.assertEqual(self.execute('deep.gen-lines | find.regex-i TW'), 'two')
+
+	def test_keywords(self):
+		# Input is only passed to commands which name it
+		self.assertEqual(self.execute('deep.gen-lines | deep.keywords'), 'args argstr modifier view window')
+
+	def test_shell_command(self):
+		self.assertEqual(self.execute("! printf 'one\\ntwo\\n' | deep.count"), 'count 2')
+
+	def command(self, state, text):
+		words, wordsstr = macro.split(text)
+		return commands.Commands().execute(state, text, words, wordsstr, self.harness.entry(), 0)
+
+	def test_state(self):
+		state = commands.Commands.State()
+
+		# The pipeline is done with once its last stage runs
+		self.command(state, 'deep.gen-lines | deep.ask')
+		self.assertEqual(state.pipeline, None)
+
+		self.command(state, 'bob')
+		self.assertEqual(self.harness.info().strip(), 'got bob')
+
+		# Also when a stage fails
+		state.clear()
+		self.assertRaises(commands.exceptions.Execute, self.command, state, 'deep.gen-lines | goto')
+		self.assertEqual(state.pipeline, None)
+
+	def temporary(self):
+		return set(filter(lambda x: x.startswith('tmp'), os.listdir(tempfile.gettempdir())))
+
+	def test_input_file(self):
+		before = self.temporary()
+
+		self.assertEqual(self.execute('! wc -l <!'), '2')
+		self.assertEqual(self.temporary(), before)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,104 @@
+import os
+import unittest
+
+import support
+
+import glib
+
+import commander.commands.processes as processes
+import commander.commands.transforms as transforms
+
+class TestProcesses(unittest.TestCase):
+	def tearDown(self):
+		processes.stop()
+
+	def transform(self, func, text):
+		job = processes.transform(func, text)
+		context = glib.main_context_default()
+
+		while job.running():
+			context.iteration(True)
+
+		return job
+
+	def test_helper(self):
+		text = u'ab\n' * (processes.THRESHOLD / 3 + 1)
+		job = self.transform(transforms.Case('upper'), text)
+
+		edits = job.result()
+		self.assertEqual(len(edits), processes.THRESHOLD / 3 + 1)
+		self.assertEqual(edits[-1], (len(text) - 3, 3, u'AB\n'))
+
+		# The transform ran in a new interpreter, not in a fork of this one
+		helpers = processes.instance()._helpers
+
+		self.assertTrue(helpers)
+		self.assertTrue(len(helpers) <= processes.PROCESSES)
+
+		for helper in helpers:
+			self.assertNotEqual(helper.process.pid, os.getpid())
+
+	def test_error(self):
+		text = u'ab\n' * (processes.THRESHOLD / 3 + 1)
+		job = self.transform(transforms.RegexReplace('(', 0, 'x', [(0, len(text))]), text)
+
+		self.assertRaises(processes.Error, job.result)
+
+	def fallback(self, python):
+		# Without a working python 2, the parts are transformed on the
+		# threads of the pool
+		original = processes._python
+		processes._python = lambda: python
+
+		try:
+			text = u'ab\n' * (processes.THRESHOLD / 3 + 1)
+
+			for i in xrange(2):
+				job = self.transform(transforms.Case('upper'), text)
+				self.assertEqual(len(job.result()), processes.THRESHOLD / 3 + 1)
+
+			for helper in processes.instance()._helpers:
+				self.assertFalse(helper.available)
+				self.assertEqual(helper.process, None)
+		finally:
+			processes._python = original
+
+	def test_fallback_missing(self):
+		self.fallback('/nonexistent/python')
+
+	def test_fallback_broken(self):
+		self.fallback('false')
+
+	def test_stop(self):
+		self.transform(transforms.Case('upper'), u'ab\n' * (processes.THRESHOLD / 3 + 1))
+
+		helper = processes.instance()._helpers[0]
+		process = helper.process
+
+		processes.stop()
+
+		self.assertEqual(helper.process, None)
+		self.assertNotEqual(process.poll(), None)
+
+	def test_changed(self):
+		text = 'ab\n' * (processes.THRESHOLD / 3 + 1)
+		h = support.harness(text)
+
+		try:
+			buf = h.document
+			buf.select_range(buf.get_start_iter(), buf.get_end_iter())
+
+			# The document changes while the parts are transformed
+			h.execute('format.upper')
+			buf.insert(buf.get_start_iter(), 'x')
+
+			self.assertTrue(h.wait(lambda: h.entry()._suspended == None, 5))
+			h.flush()
+
+			self.assertEqual(h.info(), 'Transform cancelled, the document was changed')
+			self.assertEqual(h.text(), 'x' + text)
+		finally:
+			h.close()
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,25 @@
+import unittest
+
+import support
+
+class TestReload(unittest.TestCase):
+	def setUp(self):
+		self.harness = support.harness("one\ntwo\n")
+
+	def tearDown(self):
+		self.harness.close()
+
+	def test_submodule(self):
+		# A submodule is reloaded with the module it is defined in
+		h = self.harness
+
+		h.execute('reload find.regex')
+		self.assertFalse(h.info())
+
+		h.execute('find.regex-i TW')
+
+		buf = h.document
+		self.assertEqual(buf.get_iter_at_mark(buf.get_insert()).get_line(), 1)
+
+if __name__ == '__main__':
+	unittest.main()
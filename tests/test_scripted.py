@@ -0,0 +1,72 @@
+import unittest
+
+import support
+
+import glib
+
+import commander.commands as commands
+
+class TestScripted(unittest.TestCase):
+	def setUp(self):
+		self.harness = support.harness("alpha\nbeta\n")
+
+	def tearDown(self):
+		self.harness.close()
+
+	def test_answers(self):
+		ret = commands.Commands().script(self.harness.view, 'deep.ask', answers=['bob'])
+
+		self.assertEqual(ret.prompts, ['Name:'])
+		self.assertEqual(ret.info, ['got bob'])
+
+	def test_no_answer(self):
+		self.assertRaises(commands.exceptions.Execute, commands.Commands().script, self.harness.view, 'deep.ask')
+
+	def test_resumed(self):
+		# Waiting for a suspend which was resumed before it was yielded
+		ret = commands.Commands().script(self.harness.view, 'deep.resumed')
+		self.assertEqual(ret.info, ['resumed'])
+
+	def test_wait(self):
+		ret = commands.Commands().script(self.harness.view, 'deep.later')
+		self.assertEqual(ret.info, ['later'])
+
+	def test_nested(self):
+		# From the main loop, suspended commands are not waited for with a
+		# nested main loop, which would run the other idle handler
+		ret = []
+
+		def script():
+			try:
+				commands.Commands().script(self.harness.view, 'deep.later')
+			except commands.exceptions.Execute, e:
+				ret.append('refused')
+
+			return False
+
+		glib.idle_add(script)
+		glib.idle_add(lambda: ret.append('other') or False)
+
+		self.assertTrue(self.harness.wait(lambda: len(ret) == 2, 5))
+		self.assertEqual(ret, ['refused', 'other'])
+
+	def test_run(self):
+		view = self.harness.view
+		ret = []
+
+		def script():
+			entry = commands.scripted.Entry(view)
+			driver = commands.Commands().driver(entry, 0, 'deep.later', [])
+
+			commands.scripted.run(driver, lambda e: ret.append((e, entry.info)))
+			ret.append('started')
+
+			return False
+
+		glib.idle_add(script)
+
+		self.assertTrue(self.harness.wait(lambda: len(ret) == 2, 5))
+		self.assertEqual(ret, ['started', (None, ['later'])])
+
+if __name__ == '__main__':
+	unittest.main()
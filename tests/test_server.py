@@ -0,0 +1,106 @@
+import os
+import stat
+import json
+import socket
+import tempfile
+import threading
+import unittest
+
+import support
+
+import commander.server as server
+
+class TestServer(unittest.TestCase):
+	def setUp(self):
+		self.harness = support.harness("foo bar\nfoo\n")
+		self.path = os.path.join(tempfile.mkdtemp(), 'socket')
+		self.server = server.Server(self.path)
+
+	def tearDown(self):
+		self.server.stop()
+		self.harness.close()
+
+	def request(self, *requests):
+		responses = []
+
+		def client():
+			sock = socket.socket(socket.AF_UNIX)
+			sock.connect(self.path)
+
+			sock.sendall(''.join(map(lambda x: json.dumps(x) + "\n", requests)))
+			sock.shutdown(socket.SHUT_WR)
+
+			for line in sock.makefile():
+				responses.append(json.loads(line))
+
+			responses.append(None)
+
+		thread = threading.Thread(target=client)
+		thread.start()
+
+		self.assertTrue(self.harness.wait(lambda: responses and responses[-1] == None, 5))
+		thread.join()
+
+		return responses[:-1]
+
+	def test_permissions(self):
+		self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode) & 0077, 0)
+
+	def test_running(self):
+		# The socket of a running instance is left alone
+		self.assertRaises(socket.error, server.Server, self.path)
+		self.assertEqual(self.request({'id': 1, 'command': 'nope'})[0]['id'], 1)
+
+	def test_stale(self):
+		path = os.path.join(os.path.dirname(self.path), 'stale')
+
+		# A socket left behind, which nothing listens on
+		sock = socket.socket(socket.AF_UNIX)
+		sock.bind(path)
+		sock.close()
+
+		other = server.Server(path)
+		other.stop()
+
+	def test_execute(self):
+		ret = self.request({'id': 1, 'command': 'find.replace-all', 'args': ['foo', 'baz']}, {'id': 2, 'command': 'nope'})
+
+		self.assertEqual(ret[0]['id'], 1)
+		self.assertFalse('error' in ret[0])
+		self.assertEqual(self.harness.text(), "baz bar\nbaz\n")
+
+		self.assertEqual(ret[1]['id'], 2)
+		self.assertTrue('error' in ret[1])
+
+	def test_invalid_utf8(self):
+		ret = self.request({'id': 1, 'command': '!', 'args': [], 'argstr': "printf 'a\\377b'"}, {'id': 2, 'command': 'nope'})
+
+		self.assertEqual(len(ret), 2)
+		self.assertEqual(ret[0]['info'], [u'a\ufffdb'])
+
+	def test_unicode_errors(self):
+		ret = self.request({'id': 1, 'command': 'find', 'uri': u'file:///caf\xe9'}, {'id': 2, 'command': u'caf\xe9'})
+
+		self.assertEqual(len(ret), 2)
+		self.assertEqual(ret[0]['error'], u'Could not find document: file:///caf\xe9')
+		self.assertEqual(ret[1]['id'], 2)
+		self.assertTrue(u'caf\xe9' in ret[1]['error'])
+
+	def test_unexpected_error(self):
+		find_view = server._find_view
+
+		def fail(uri):
+			raise RuntimeError('broken')
+
+		server._find_view = fail
+
+		try:
+			ret = self.request({'id': 1, 'command': 'nope'}, {'id': 2, 'command': 'nope'})
+		finally:
+			server._find_view = find_view
+
+		self.assertEqual(map(lambda x: x['id'], ret), [1, 2])
+		self.assertEqual(ret[0]['error'], 'Failed to execute request: broken')
+
+if __name__ == '__main__':
+	unittest.main()
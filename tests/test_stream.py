@@ -0,0 +1,55 @@
+import unittest
+
+import support
+
+class TestStream(unittest.TestCase):
+	def setUp(self):
+		self.harness = support.harness()
+
+	def tearDown(self):
+		self.harness.close()
+
+	def streaming(self):
+		return self.harness.entry()._stream != None
+
+	def test_finish(self):
+		h = self.harness
+
+		h.execute('deep.stream')
+		self.assertTrue(self.streaming())
+
+		# Text typed while the stream is shown is not sent to the command
+		h.entry()._entry.set_text('typed')
+
+		self.assertTrue(h.wait(lambda: not self.streaming(), 5))
+		h.flush()
+
+		self.assertEqual(h.info(), "0\n1\ndone None")
+		self.assertEqual(h.entry()._entry.get_text(), 'typed')
+
+	def test_new_command(self):
+		h = self.harness
+
+		h.execute('deep.stream 100000')
+		self.assertTrue(self.streaming())
+
+		# A new command replaces the one which yielded the stream
+		h.execute('deep.count')
+		self.assertFalse(self.streaming())
+		self.assertFalse(h.entry()._command_state)
+
+		h.flush()
+		self.assertEqual(h.info(), 'count 0')
+
+	def test_cancel(self):
+		h = self.harness
+
+		h.execute('deep.stream 100000')
+		h.iterate()
+
+		h.cancel()
+		self.assertFalse(self.streaming())
+		self.assertFalse(h.entry()._command_state)
+
+if __name__ == '__main__':
+	unittest.main()
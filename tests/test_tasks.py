@@ -0,0 +1,81 @@
+import unittest
+
+import support
+
+import commander.commands.result as result
+import commander.commands.tasks as tasks
+
+class TestTasks(unittest.TestCase):
+	def setUp(self):
+		self.harness = support.harness()
+		self.log = []
+
+	def tearDown(self):
+		self.harness.close()
+
+	def work(self, steps, cancel=-1):
+		try:
+			for i in xrange(steps):
+				if i == cancel:
+					# Like Escape handled by a nested main loop in the step
+					self.task.cancel()
+
+				self.log.append(i)
+				yield None
+		finally:
+			self.log.append('closed')
+
+	def start(self, work):
+		self.task = tasks.Task(work)
+		self.task.register(lambda: self.log.append('resumed'))
+
+		return self.task.start(0)
+
+	def test_run(self):
+		self.assertTrue(self.start(self.work(3)))
+		self.assertTrue(self.harness.wait(lambda: 'resumed' in self.log, 5))
+
+		self.assertEqual(self.log, [0, 1, 2, 'closed', 'resumed'])
+		self.assertFalse(self.task.cancelled)
+
+	def test_cancel_in_start(self):
+		# The first steps run right away, cancelling from one of them does
+		# not close the work while it runs
+		self.assertFalse(self.start(self.work(3, 0)))
+
+		self.assertTrue(self.task.cancelled)
+		self.assertEqual(self.log, [0, 'closed'])
+
+	def test_cancel_in_step(self):
+		self.assertTrue(self.start(self.work(5, 2)))
+		self.assertTrue(self.harness.wait(lambda: 'resumed' in self.log, 5))
+
+		self.assertTrue(self.task.cancelled)
+		self.assertEqual(self.log, [0, 1, 2, 'closed', 'resumed'])
+
+	def test_cancel_waiting(self):
+		suspend = result.Suspend()
+
+		def work():
+			try:
+				yield suspend
+				self.log.append('continued')
+			finally:
+				self.log.append('closed')
+
+		self.assertTrue(self.start(work()))
+		self.assertTrue(self.task.waiting())
+
+		# The work is closed and the command resumed by the scheduler
+		self.task.cancel()
+		self.assertEqual(self.log, [])
+
+		self.assertTrue(self.harness.wait(lambda: 'resumed' in self.log, 5))
+		self.assertEqual(self.log, ['closed', 'resumed'])
+
+		suspend.resume()
+		self.harness.flush()
+		self.assertEqual(self.log, ['closed', 'resumed'])
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,61 @@
+import time
+import unittest
+
+import support
+
+import commander.commands.timing as timing
+
+class TestTiming(unittest.TestCase):
+	def setUp(self):
+		timing.clear()
+
+	def test_nested(self):
+		def inner():
+			time.sleep(0.01)
+			return 'inner'
+
+		def outer():
+			time.sleep(0.01)
+			return timing.call('import', 'inner', inner)
+
+		self.assertEqual(timing.call('load', 'outer', outer), 'inner')
+
+		rec_inner, rec_outer = timing.records()
+
+		self.assertEqual((rec_inner.name, rec_inner.depth), ('inner', 1))
+		self.assertEqual((rec_outer.name, rec_outer.depth), ('outer', 0))
+
+		# The nested import is not counted as time of the load itself
+		self.assertTrue(rec_outer.wall >= rec_inner.wall + 0.01)
+		self.assertAlmostEqual(rec_outer.self_wall, rec_outer.wall - rec_inner.wall)
+
+	def test_failed(self):
+		def fail():
+			raise ValueError('failed')
+
+		self.assertRaises(ValueError, timing.call, 'import', 'broken', fail)
+		self.assertTrue(timing.records()[-1].failed)
+
+	def test_limit(self):
+		for i in xrange(timing.LIMIT + 10):
+			timing.call('scan', str(i), lambda: None)
+
+		recs = timing.records()
+
+		self.assertEqual(len(recs), timing.LIMIT)
+		self.assertEqual(recs[0].name, '10')
+
+	def test_startup(self):
+		h = support.harness()
+
+		try:
+			h.execute('debug.startup')
+			info = h.info()
+		finally:
+			h.close()
+
+		self.assertTrue(info.startswith('Activation until first command ready: '))
+		self.assertTrue('\nScanning 2 directories: ' in info)
+
+if __name__ == '__main__':
+	unittest.main()
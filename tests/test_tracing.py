@@ -0,0 +1,70 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+import support
+
+import commander.commands.tracing as tracing
+
+class TestTracing(unittest.TestCase):
+	def setUp(self):
+		self.dirname = tempfile.mkdtemp(prefix='commander-tracing-')
+		self.harness = support.harness()
+
+	def tearDown(self):
+		tracing.stop()
+
+		self.harness.close()
+		shutil.rmtree(self.dirname, True)
+
+	def load(self, filename):
+		f = file(filename, 'r')
+		ret = json.load(f)
+		f.close()
+
+		return ret
+
+	def test_events(self):
+		filename = tracing.start(self.dirname)
+		self.assertTrue(tracing.enabled())
+
+		self.harness.execute('deep.nest 3')
+		self.harness.complete('form')
+
+		tracing.stop()
+		self.assertFalse(tracing.enabled())
+
+		events = self.load(filename)
+		names = map(lambda x: (x['cat'], x['name']), events)
+
+		self.assertTrue(('entry', 'execute') in names)
+		self.assertTrue(('entry', 'complete') in names)
+
+		# Each generator step of the command is an event
+		steps = filter(lambda x: x['cat'] == 'step', events)
+		self.assertTrue(len(steps) >= 4)
+		self.assertEqual(steps[0]['args']['command'], 'deep.nest')
+
+		for event in events:
+			self.assertEqual(event['ph'], 'X')
+			self.assertTrue(event['dur'] >= 0)
+
+	def test_rotate(self):
+		writer = tracing.Writer(self.dirname, 100, 2)
+
+		for i in xrange(20):
+			writer.add({'name': 'event', 'ph': 'i', 'ts': i})
+			writer.flush()
+
+		writer.close()
+
+		# Only the newest files are kept, each of them can be loaded
+		self.assertEqual(sorted(os.listdir(self.dirname)), ['commander.1.json', 'commander.2.json', 'commander.json'])
+
+		for name in os.listdir(self.dirname):
+			self.load(os.path.join(self.dirname, name))
+
+if __name__ == '__main__':
+	unittest.main()
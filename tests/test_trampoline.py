@@ -0,0 +1,34 @@
+import sys
+import unittest
+
+import support
+
+import commander.commands as commands
+
+class TestTrampoline(unittest.TestCase):
+	def setUp(self):
+		self.harness = support.harness()
+
+	def tearDown(self):
+		self.harness.close()
+
+	def stack(self, depth):
+		ret = commands.Commands().script(self.harness.view, 'deep.nest', [str(depth)])
+		return int(ret.info[0].split()[1])
+
+	def test_flat(self):
+		# Nesting generators far beyond the recursion limit does not grow the
+		# python stack
+		depth = 5000
+		self.assertTrue(depth > sys.getrecursionlimit())
+
+		self.assertEqual(self.stack(depth), self.stack(1))
+
+	def test_entry(self):
+		h = self.harness
+
+		h.execute('deep.nest 5000')
+		self.assertTrue(h.info().startswith('stack '))
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+import support
+
+import commander.commands.trie as trie
+
+class Item:
+	def __init__(self, name):
+		self.name = name
+
+	def __cmp__(self, other):
+		return cmp(self.name, other.name)
+
+	def __repr__(self):
+		return self.name
+
+NAMES = ['replace', 'replace-all', 'replace-all-i', 'regex', 'reload', 'goto']
+
+class TestTrie(unittest.TestCase):
+	def setUp(self):
+		self.items = map(Item, NAMES)
+		self.index = trie.Trie(self.items)
+
+	def find(self, subs):
+		return map(lambda x: x.name, self.index.find(subs))
+
+	def test_prefix(self):
+		self.assertEqual(self.find(['re']), ['regex', 'reload', 'replace', 'replace-all', 'replace-all-i'])
+		self.assertEqual(self.find(['rep']), ['replace', 'replace-all', 'replace-all-i'])
+		self.assertEqual(self.find(['x']), [])
+
+	def test_parts(self):
+		# Each part matches the start of the part at the same position
+		self.assertEqual(self.find(['r', 'a']), ['replace-all', 'replace-all-i'])
+		self.assertEqual(self.find(['r', 'a', 'i']), ['replace-all-i'])
+		self.assertEqual(self.find(['r', 'i']), [])
+
+	def test_remove(self):
+		self.assertTrue(self.index.remove(self.items[2]))
+		self.assertEqual(len(self.index), len(NAMES) - 1)
+		self.assertEqual(self.find(['r', 'a']), ['replace-all'])
+
+		# Removing goes by identity, not by name
+		self.assertFalse(self.index.remove(Item('goto')))
+		self.assertEqual(self.find(['g']), ['goto'])
+
+	def test_same_name(self):
+		other = Item('goto')
+		self.index.add(other)
+
+		self.assertEqual(self.find(['go']), ['goto', 'goto'])
+
+		self.index.remove(self.items[5])
+		self.assertTrue(self.index.find(['go'])[0] is other)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+
+import support
+
+import commander.commands as commands
+import commander.commands.warmup as warmup
+
+class TestWarmup(unittest.TestCase):
+	def setUp(self):
+		self.harness = support.harness()
+
+	def tearDown(self):
+		self.harness.close()
+
+	def modules(self, names):
+		mods = commands.Commands().modules()
+		return map(lambda name: filter(lambda x: x.name == name, mods)[0], names)
+
+	def test_order(self):
+		w = warmup.Warmup({'goto': 1, 'format.upper': 2, 'format.lower': 2, 'reload': 4})
+		w.stop()
+
+		commands.Commands().ensure()
+		self.assertEqual(map(lambda x: x.name, w._order()), ['format', 'reload', 'goto'])
+
+	def test_ambiguous(self):
+		w = warmup.Warmup({'f.upper': 5, 'fo.lower': 2, 'goto': 1})
+		w.stop()
+
+		# Both find and format start with f, only the longer abbreviation
+		# tells them apart
+		commands.Commands().ensure()
+		self.assertEqual(map(lambda x: x.name, w._order()), ['format', 'goto'])
+
+	def test_import(self):
+		format, shell = self.modules(['format', 'shell'])
+		self.assertTrue(format.cached())
+
+		w = warmup.Warmup({'format.upper': 1})
+		self.assertTrue(self.harness.wait(lambda: not w._idle, 5))
+
+		# Only the modules in the usage are imported
+		self.assertFalse(format.cached())
+		self.assertTrue(shell.cached())
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,41 @@
+import time
+import unittest
+
+import support
+
+import glib
+
+import commander.commands.watchdog as watchdog
+
+class TestWatchdog(unittest.TestCase):
+	def setUp(self):
+		self.watchdog = watchdog.start([], 0.2)
+		self.context = glib.main_context_default()
+
+	def tearDown(self):
+		watchdog.stop()
+
+	def iterate(self, condition, timeout=5):
+		end = time.time() + timeout
+
+		while not condition() and time.time() < end:
+			self.context.iteration(True)
+
+		return condition()
+
+	def test_duration(self):
+		beat = self.watchdog._beat
+
+		# Block the main loop right after a heartbeat, the next one is due an
+		# interval later and then runs 0.5 seconds late
+		self.assertTrue(self.iterate(lambda: self.watchdog._beat is not beat))
+		time.sleep(watchdog.INTERVAL / 1000.0 + 0.5)
+
+		self.assertTrue(self.iterate(lambda: self.watchdog.reports()))
+
+		stall = self.watchdog.reports()[0]
+		self.assertTrue(abs(stall.duration - 0.5) < 0.05, stall.duration)
+		self.assertTrue(stall.samples > 0)
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,69 @@
+import threading
+import unittest
+
+import support
+
+import commander.commands.exceptions as exceptions
+import commander.commands.workers as workers
+
+class TestWorkers(unittest.TestCase):
+	def setUp(self):
+		self.harness = support.harness()
+		self.pool = workers.Pool(1, 1)
+
+	def tearDown(self):
+		self.pool.stop()
+		self.harness.close()
+
+	def wait(self, job):
+		resumed = []
+		job.register(lambda: resumed.append(True))
+
+		self.assertTrue(self.harness.wait(lambda: resumed, 5))
+
+	def test_result(self):
+		job = self.pool.submit(lambda a, b=0: a + b, 1, b=2)
+		self.wait(job)
+
+		self.assertTrue(job.done())
+		self.assertEqual(job.result(), 3)
+
+	def test_error(self):
+		def fail():
+			raise ValueError('failed')
+
+		job = self.pool.submit(fail)
+		self.wait(job)
+
+		self.assertRaises(ValueError, job.result)
+
+	def test_cancel(self):
+		event = threading.Event()
+		job = self.pool.submit(event.wait, 5)
+
+		# The command continues right away, the result is dropped
+		job.cancel()
+		self.assertTrue(job.resumed())
+
+		event.set()
+		self.harness.flush()
+
+		self.assertFalse(job.done())
+		self.assertEqual(job.value, None)
+
+	def test_full(self):
+		event = threading.Event()
+		self.pool.submit(event.wait, 5)
+
+		# One job runs, one waits for the thread, there is no room for more
+		self.assertTrue(self.harness.wait(lambda: self.pool._queue.empty(), 5))
+
+		waiting = self.pool.submit(lambda: 'waited')
+		self.assertRaises(exceptions.Execute, self.pool.submit, lambda: None)
+
+		event.set()
+		self.wait(waiting)
+		self.assertEqual(waiting.result(), 'waited')
+
+if __name__ == '__main__':
+	unittest.main()